@@ -0,0 +1,162 @@
+"""
+Versioned Model Artifacts for BookRS
+------------------------------------
+Offline jobs keep writing into ART_DIR as before; publish() then freezes the
+artifact files into an immutable version directory and atomically moves the
+CURRENT pointer to it:
+
+    artifacts/
+      als_user_factors.npz, emb_store/, tfidf/, ...   working copy (writers)
+      versions/20250101T120000-ab12/                  frozen snapshot
+        manifest.json                                 files, sizes, changes
+      CURRENT                                         "20250101T120000-ab12"
+
+Snapshots are hard links (copy fallback across filesystems), so publishing
+costs no extra disk for unchanged files. This only works if writers replace
+files (write to a temp name + os.replace, a new directory + rename, or new
+file names as the embedding store does) instead of rewriting them in place;
+atomic_output() is the helper for single files.
+
+Servers load from current_dir() and watch current_version() for changes
+(see backend.ml.registry). Without a CURRENT pointer everything falls back
+to the flat ART_DIR layout.
+"""
+
+import os
+import json
+import time
+import shutil
+import secrets
+from contextlib import contextmanager
+
+from backend.core.config import (
+    ART_DIR, EMB_PATH, EMB_META, EMB_STORE_DIR, ALS_USER_FACTORS, ALS_ITEM_FACTORS,
+    POPULARITY_PATH, TFIDF_DIR, BM25_DIR, SIMILAR_DIR, COOCCUR_DIR, ARTIFACT_KEEP_VERSIONS,
+)
+
+VERSIONS_DIR = os.path.join(ART_DIR, "versions")
+CURRENT_PATH = os.path.join(ART_DIR, "CURRENT")
+
+# Top-level entries of ART_DIR that make up a servable version
+ARTIFACT_NAMES = [os.path.basename(p) for p in (
+    EMB_PATH, EMB_META, EMB_STORE_DIR, ALS_USER_FACTORS, ALS_ITEM_FACTORS, POPULARITY_PATH, TFIDF_DIR, BM25_DIR, SIMILAR_DIR,
+    COOCCUR_DIR,
+)] + ["als_uid_map.pkl", "als_iid_map.pkl"]
+
+
+@contextmanager
+def atomic_output(path):
+    """Yield a temp path next to `path`; move it over `path` on success."""
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.tmp{os.getpid()}{ext}"
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def current_version():
+    """Version id CURRENT points to, or None (flat layout)."""
+    try:
+        with open(CURRENT_PATH) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version if version and os.path.isdir(os.path.join(VERSIONS_DIR, version)) else None
+
+
+def current_dir() -> str:
+    """Directory to load artifacts from."""
+    version = current_version()
+    return os.path.join(VERSIONS_DIR, version) if version else ART_DIR
+
+
+def read_manifest(version):
+    with open(os.path.join(VERSIONS_DIR, version, "manifest.json")) as f:
+        return json.load(f)
+
+
+def list_versions():
+    """Published versions, oldest first."""
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    return sorted(v for v in os.listdir(VERSIONS_DIR)
+                  if os.path.exists(os.path.join(VERSIONS_DIR, v, "manifest.json")))
+
+
+def _file_index(root):
+    """{relative path: [size, mtime_ns]} for every file under the artifact entries."""
+    index = {}
+    for name in ARTIFACT_NAMES:
+        path = os.path.join(root, name)
+        if os.path.isfile(path):
+            st = os.stat(path)
+            index[name] = [st.st_size, st.st_mtime_ns]
+        elif os.path.isdir(path):
+            for dirpath, _, files in os.walk(path):
+                for fn in files:
+                    full = os.path.join(dirpath, fn)
+                    st = os.stat(full)
+                    index[os.path.relpath(full, root)] = [st.st_size, st.st_mtime_ns]
+    return index
+
+
+def _link_or_copy(src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def set_current(version):
+    """Atomically point CURRENT at a published version (also used for rollback)."""
+    if not os.path.isdir(os.path.join(VERSIONS_DIR, version)):
+        raise FileNotFoundError(f"Unknown artifact version: {version}")
+    tmp = f"{CURRENT_PATH}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CURRENT_PATH)
+
+
+def publish(note: str = "", force: bool = False):
+    """
+    Snapshot ART_DIR's artifacts as a new version and point CURRENT at it.
+    Returns the version id (the existing one if nothing changed).
+    """
+    files = _file_index(ART_DIR)
+    if not files:
+        raise FileNotFoundError(f"No artifacts found in {ART_DIR}")
+    previous = current_version()
+    prev_files = read_manifest(previous)["files"] if previous else {}
+    changed = sorted({rel.split(os.sep)[0] for rel in set(files) ^ set(prev_files)} |
+                     {rel.split(os.sep)[0] for rel in files if prev_files.get(rel) not in (None, files[rel])})
+    if previous and not changed and not force:
+        print(f"[INFO] Artifacts unchanged — CURRENT stays at {previous}.")
+        return previous
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(2)}"
+    tmp_dir = os.path.join(VERSIONS_DIR, f".{version}.tmp")
+    for rel in files:
+        _link_or_copy(os.path.join(ART_DIR, rel), os.path.join(tmp_dir, rel))
+    manifest = {"version": version, "created": time.time(), "parent": previous,
+                "note": note, "changed": changed, "files": files}
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_dir, os.path.join(VERSIONS_DIR, version))
+    set_current(version)
+    print(f"[OK] Published artifacts {version} (changed: {', '.join(changed) or 'none'})")
+    prune()
+    return version
+
+
+def prune(keep: int = ARTIFACT_KEEP_VERSIONS):
+    """Delete all but the newest `keep` versions (never the current one)."""
+    current = current_version()
+    for version in list_versions()[:-keep or None]:
+        if version != current:
+            shutil.rmtree(os.path.join(VERSIONS_DIR, version), ignore_errors=True)
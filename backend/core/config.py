@@ -5,15 +5,27 @@ load_dotenv()
 
 # DB
 DATABASE_URL = "sqlite:///./bookrs.db"
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)  # async routes
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", 8))   # async DB sessions open at once
 
 
 # Artifacts
 ART_DIR = os.getenv("ART_DIR", "artifacts")
 EMB_PATH = os.path.join(ART_DIR, "book_embeddings.pt")
 EMB_META = os.path.join(ART_DIR, "emb_meta.parquet")
+EMB_STORE_DIR = os.path.join(ART_DIR, "emb_store")      # sharded store (preferred over the .pt pair)
 ALS_USER_FACTORS = os.path.join(ART_DIR, "als_user_factors.npz")
 ALS_ITEM_FACTORS = os.path.join(ART_DIR, "als_item_factors.npz")
 POPULARITY_PATH = os.path.join(ART_DIR, "popularity.parquet")
+TFIDF_DIR = os.path.join(ART_DIR, "tfidf")
+BM25_DIR = os.path.join(ART_DIR, "bm25")
+SIMILAR_DIR = os.path.join(ART_DIR, "similar")          # item-to-item kNN graph
+COOCCUR_DIR = os.path.join(ART_DIR, "cooccur")          # item co-occurrence CSR (session recs)
+RATINGS_SNAPSHOT_DIR = os.path.join(ART_DIR, "ratings_snapshot")  # Parquet copy of ratings (offline jobs)
+
+# Versioned artifacts / hot reload
+ARTIFACT_POLL_SECONDS = float(os.getenv("ARTIFACT_POLL_SECONDS", 10))  # CURRENT watcher interval (0 = off)
+ARTIFACT_KEEP_VERSIONS = int(os.getenv("ARTIFACT_KEEP_VERSIONS", 3))   # published versions kept on disk
 
 # Hybrid weights (tune as needed)
 ALPHA = float(os.getenv("ALPHA", 0.6))   # semantic
@@ -21,3 +33,39 @@ BETA  = float(os.getenv("BETA", 0.35))   # CF (ALS)
 GAMMA = float(os.getenv("GAMMA", 0.05))  # popularity prior
 
 TOPK_DEFAULT = int(os.getenv("TOPK_DEFAULT", 10))
+
+# Semantic scan split over N worker processes (shared memory); 0/1 = single-process torch scan
+SEARCH_SHARDS = int(os.getenv("SEARCH_SHARDS", 0))
+
+# Lexical (BM25) candidates added to the hybrid pool; 0 disables
+HYBRID_BM25_CANDIDATES = int(os.getenv("HYBRID_BM25_CANDIDATES", 20))
+LEXICAL_WEIGHT = float(os.getenv("LEXICAL_WEIGHT", 0.0))  # weight of normalized BM25 in the fusion
+
+# Rating writes (write-behind buffer)
+RATING_FLUSH_SIZE = int(os.getenv("RATING_FLUSH_SIZE", 500))      # rows per batched transaction
+RATING_FLUSH_MS = float(os.getenv("RATING_FLUSH_MS", 50))          # max wait after the first queued row
+RATING_QUEUE_MAX = int(os.getenv("RATING_QUEUE_MAX", 50000))       # producers block beyond this
+RATING_DURABILITY = os.getenv("RATING_DURABILITY", "commit")       # commit | async
+
+# Runtime-added books (background embedding worker)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 32))              # books per encoder call
+EMBED_BATCH_MS = float(os.getenv("EMBED_BATCH_MS", 200))               # max wait after the first queued book
+EMBED_RECONCILE_SECONDS = float(os.getenv("EMBED_RECONCILE_SECONDS", 30))  # rescan DB for unindexed books (0 = off)
+
+# Observability
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"   # stage/request metrics + /metrics
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"       # add Server-Timing response header
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 1024))  # cached query embeddings (0 = off)
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "1") == "1"  # coalesce identical in-flight requests
+
+# HTTP caching
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"      # ETag / 304 / Cache-Control
+HTTP_COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", 1024))  # gzip / br above this size
+
+# Admin / profiling
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")                   # empty = admin endpoints disabled
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_NEXT_N = int(os.getenv("PROFILE_NEXT_N", 0))         # profile the first N /recommend requests
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")         # cprofile | sample
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+MEMORY_FLAG_MB = float(os.getenv("MEMORY_FLAG_MB", 64))      # /admin/memory flags components above this
@@ -20,6 +20,23 @@ def load_books(columns=None):
     df = pd.read_sql(query, ENGINE)
     return df.fillna("")
 
+# === Streaming Book Loader ===
+def iter_books(columns=None, chunk_size=10000, after_id=None):
+    """
+    Yield the books table in book_id order as DataFrame chunks.
+    Keyset pagination (WHERE book_id > last) keeps each query cheap and lets
+    callers resume from the last book_id they processed.
+    """
+    cols = "*" if columns is None else ", ".join(dict.fromkeys(["book_id", *columns]))
+    last = -1 if after_id is None else int(after_id)
+    while True:
+        query = f"SELECT {cols} FROM books WHERE book_id > {last} ORDER BY book_id LIMIT {int(chunk_size)}"
+        df = pd.read_sql(query, ENGINE)
+        if df.empty:
+            return
+        last = int(df["book_id"].iloc[-1])
+        yield df.fillna("")
+
 # === Ratings Loader ===
 def load_ratings(limit=None):
     """Load ratings table as DataFrame (optionally limited for testing)."""
@@ -0,0 +1,35 @@
+"""
+Shared FastAPI Dependencies for BookRS
+--------------------------------------
+One place for the DB session dependency the routers use:
+
+ - get_async_db  AsyncSession on the aiosqlite engine, for `async def`
+                 routes. These run on the event loop, so slow SQLite calls
+                 no longer occupy Starlette's thread pool, which stays free
+                 for the CPU-bound recommend handlers.
+
+At most DB_MAX_CONCURRENCY async sessions are open at once; further
+requests wait on a semaphore (timed as the "db_wait" stage) instead of
+piling up on SQLite's single writer.
+"""
+
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from backend.core.config import ASYNC_DATABASE_URL, DB_MAX_CONCURRENCY
+from backend.core.metrics import stage
+
+# Async engine (aiosqlite) for the routers; scripts keep the sync engine in database.py
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+DB_GATE = asyncio.Semaphore(DB_MAX_CONCURRENCY)
+
+
+async def get_async_db():
+    with stage("db_wait"):
+        await DB_GATE.acquire()
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        DB_GATE.release()
@@ -0,0 +1,181 @@
+"""
+HTTP Caching for BookRS
+-----------------------
+Conditional GET for catalog and recommendation routes, decided *before* the
+route runs:
+
+ - validators  each route policy names what its response depends on:
+               "artifacts" (loaded artifact version, MODELS) and / or tables
+               tracked in table_versions ("books", "user_feeds"), or a live
+               model's runtime additions ("model:hybrid", "model:suggest":
+               books the embedding worker made searchable without a new
+               version, counted when they are actually served, not when
+               the row is inserted)
+ - ETag        weak, hash of path + query string + validator versions
+ - 304         If-None-Match (or If-Modified-Since) matching the current
+               validators is answered without calling the route — no model
+               query, no JSON encoding, no body
+ - headers     200 responses get ETag, Last-Modified (newest validator
+               change) and the route's Cache-Control policy
+
+Table versions are cached for a second; when one has to be read from
+SQLite (which may wait on the busy timeout) validation runs in the thread
+pool, so the event loop never blocks on it.
+
+Personalized routes (user_id) are `private, no-cache`: clients and proxies
+may keep them but must revalidate, which costs one 304. Compression is
+added separately by add_compression(): brotli when brotli-asgi is installed
+(gzip fallback), Starlette's GZipMiddleware otherwise.
+
+Metrics: bookrs_cache_requests_total{cache="http_<policy>", result=hit|miss}.
+"""
+
+import re
+import hashlib
+from datetime import datetime, timezone
+from email.utils import formatdate, format_datetime, parsedate_to_datetime
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import HTTP_CACHE_ENABLED, HTTP_COMPRESS_MIN_BYTES
+from backend.core.metrics import record_cache
+from backend.core.table_versions import table_version, is_fresh
+
+
+class CachePolicy:
+    def __init__(self, name, pattern, cache_control, validators):
+        self.name, self.cache_control, self.validators = name, cache_control, validators
+        self.pattern = re.compile(pattern)
+
+
+# First match wins
+POLICIES = (
+    CachePolicy("books", r"^/books/(search)?$", "public, max-age=60", ("books",)),
+    CachePolicy("books_suggest", r"^/books/suggest$", "public, max-age=300", ("artifacts", "model:suggest")),
+    CachePolicy("books_similar", r"^/books/\d+/similar$", "public, max-age=300", ("artifacts", "books")),
+    CachePolicy("popular", r"^/recommend/popular$", "public, max-age=300", ("artifacts",)),
+    CachePolicy("tfidf", r"^/recommend/tfidf$", "public, max-age=60", ("artifacts",)),
+    CachePolicy("session", r"^/recommend/session$", "public, max-age=300", ("artifacts",)),
+    CachePolicy("hybrid", r"^/recommend/hybrid$", "private, no-cache", ("artifacts", "model:hybrid")),
+    CachePolicy("feed", r"^/recommend/feed$", "private, no-cache", ("artifacts", "model:hybrid", "user_feeds")),
+    CachePolicy("recommend", r"^/recommend/", "private, no-cache", ("artifacts",)),
+)
+
+
+def _artifacts_version():
+    from backend.ml.registry import MODELS
+    loaded = datetime.fromtimestamp(MODELS.loaded_at, timezone.utc) if MODELS.loaded_at else None
+    return f"{MODELS.version}@{MODELS.loaded_at}", loaded
+
+
+def _model_version(name):
+    """Runtime additions to a live model (delta_version), e.g. books embedded after load."""
+    from backend.ml.registry import MODELS
+    try:
+        model = MODELS.get(name)
+    except KeyError:
+        return f"{name}:-", None
+    count, updated_at = getattr(model, "delta_version", (0, None))
+    modified = datetime.fromtimestamp(updated_at, timezone.utc) if updated_at else None
+    return f"{name}:{count}", modified
+
+
+def _table_version(name):
+    version, updated_at = table_version(name)
+    modified = None
+    if updated_at:
+        modified = datetime.strptime(str(updated_at)[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    return f"{name}:{version}", modified
+
+
+def validate(policy, path: str, query: bytes):
+    """(etag, last_modified datetime or None) for a request under policy."""
+    tokens, modified = [], []
+    for v in policy.validators:
+        if v == "artifacts":
+            token, ts = _artifacts_version()
+        elif v.startswith("model:"):
+            token, ts = _model_version(v[len("model:"):])
+        else:
+            token, ts = _table_version(v)
+        tokens.append(token)
+        if ts is not None:
+            modified.append(ts)
+    digest = hashlib.blake2b(f"{path}?{query.decode('latin-1')}|{'|'.join(tokens)}".encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"', (max(modified) if modified else None)
+
+
+def _needs_db(policy) -> bool:
+    return any(not is_fresh(v) for v in policy.validators if v != "artifacts" and not v.startswith("model:"))
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    def opaque(tag):                 # weak comparison: W/"x" == "x"
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+    candidates = [opaque(t) for t in header.split(",")]
+    return "*" in candidates or opaque(etag) in candidates
+
+
+def _not_modified_since(header: str, modified) -> bool:
+    if modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return modified.replace(microsecond=0) <= since
+
+
+class HttpCacheMiddleware:
+    """Pure ASGI middleware: ETag / Last-Modified / Cache-Control and 304s."""
+
+    def __init__(self, app, policies=POLICIES, enabled=HTTP_CACHE_ENABLED):
+        self.app, self.policies, self.enabled = app, policies, enabled
+
+    def _policy(self, path):
+        return next((p for p in self.policies if p.pattern.match(path)), None)
+
+    async def __call__(self, scope, receive, send):
+        policy = None
+        if self.enabled and scope["type"] == "http" and scope["method"] == "GET":
+            policy = self._policy(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        args = (policy, scope["path"], scope.get("query_string", b""))
+        etag, modified = await run_in_threadpool(validate, *args) if _needs_db(policy) else validate(*args)
+        headers = [(b"etag", etag.encode()), (b"cache-control", policy.cache_control.encode())]
+        if modified is not None:
+            headers.append((b"last-modified", format_datetime(modified, usegmt=True).encode()))
+
+        request_headers = dict(scope.get("headers") or [])
+        inm = request_headers.get(b"if-none-match")
+        ims = request_headers.get(b"if-modified-since")
+        fresh = _etag_matches(inm.decode(), etag) if inm else bool(ims) and _not_modified_since(ims.decode(), modified)
+        record_cache(f"http_{policy.name}", fresh)
+        if fresh:
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": headers + [(b"date", formatdate(usegmt=True).encode())]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                present = {k.lower() for k, _ in message.get("headers", [])}
+                message["headers"] = list(message.get("headers", [])) + [h for h in headers if h[0] not in present]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def add_compression(app, minimum_size=HTTP_COMPRESS_MIN_BYTES):
+    """br (brotli-asgi, optional) or gzip for responses above minimum_size."""
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        from starlette.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=minimum_size)
+        return "gzip"
+    app.add_middleware(BrotliMiddleware, minimum_size=minimum_size, gzip_fallback=True)
+    return "br"
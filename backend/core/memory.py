@@ -0,0 +1,230 @@
+"""
+Memory Accounting for BookRS
+----------------------------
+Where a worker's resident memory goes, per loaded component:
+
+ - components  every model in the registry (MODELS) plus anything passed to
+               track() — e.g. Gradio's popularity / cover DataFrames — broken
+               down by attribute ("hybrid.semantic.emb", "hybrid.uid_map", ...)
+ - sizing      numpy / torch buffers by storage (a tensor made with
+               torch.from_numpy and its array count once), DataFrames with
+               deep object sizes, nn.Modules by parameters + buffers, Python
+               containers recursively. Memory-mapped / shared-memory buffers
+               are reported as `mapped` — the OS shares them between workers
+ - process     RSS / PSS and shared vs private pages from
+               /proc/self/smaps_rollup (Linux; VmRSS / ru_maxrss elsewhere)
+
+Flags point at likely savings: components over MEMORY_FLAG_MB, long free-
+text DataFrame columns (combined_text, description) held at serving time,
+and large Python dicts used as id maps.
+
+    memory_report()          # dict, served by GET /admin/memory
+    python -m backend.scripts.memory_report --host-mb 16384
+"""
+
+import sys
+import mmap
+import types
+import threading
+import numpy as np
+import pandas as pd
+
+from backend.core.config import MEMORY_FLAG_MB
+
+TEXT_COLUMN_AVG_CHARS = 64     # object columns averaging more than this are "free text"
+DICT_FLAG_ENTRIES = 10_000     # Python dicts at least this large get an id-map note
+MIN_COMPONENT_BYTES = 64 * 1024  # smaller attributes are folded into "<model>.(other)"
+MAX_EXPAND_DEPTH = 2           # model.attr.attr
+
+_TRACKED = {}
+_SKIP_TYPES = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, type,
+               threading.Thread)
+
+try:
+    import torch
+except ImportError:  # torch-less tools still get numpy / pandas accounting
+    torch = None
+
+
+def track(name: str, obj):
+    """Include a non-registry object (module-level DataFrame, model, ...) in the report."""
+    _TRACKED[name] = obj
+
+
+# -------------------------------------------------------------------
+# Object sizing
+# -------------------------------------------------------------------
+class _Sizer:
+    """Deep sizes with shared-buffer dedupe across one whole report."""
+
+    def __init__(self):
+        self.seen = set()        # id()s of visited Python objects
+        self.buffers = set()     # data pointers of counted array / tensor storages
+
+    def _buffer(self, key, nbytes):
+        if key in self.buffers:
+            return 0
+        self.buffers.add(key)
+        return int(nbytes)
+
+    def size(self, obj, depth=0):
+        """(private_bytes, mapped_bytes) of obj and everything it references."""
+        if id(obj) in self.seen or isinstance(obj, _SKIP_TYPES):
+            return 0, 0
+        self.seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            root = obj
+            while isinstance(root.base, np.ndarray):
+                root = root.base
+            mapped = isinstance(root, np.memmap) or isinstance(root.base, (mmap.mmap, memoryview))
+            n = self._buffer(root.__array_interface__["data"][0], root.nbytes)
+            return (0, n) if mapped else (n, 0)
+        if torch is not None and isinstance(obj, torch.Tensor):
+            storage = obj.untyped_storage()
+            return self._buffer(storage.data_ptr(), storage.nbytes()), 0
+        if torch is not None and isinstance(obj, torch.nn.Module):
+            total = 0
+            for t in list(obj.parameters()) + list(obj.buffers()):
+                total += self.size(t.data)[0]
+            return total, 0
+        if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+            usage = obj.memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage), 0
+        if hasattr(obj, "indptr") and hasattr(obj, "indices") and hasattr(obj, "data"):   # scipy sparse
+            parts = [self.size(getattr(obj, a)) for a in ("data", "indices", "indptr")]
+            return sum(p[0] for p in parts), sum(p[1] for p in parts)
+
+        private, mapped = sys.getsizeof(obj), 0
+        if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+            return private, 0
+        # Containers are copied in C (under the GIL) first: request threads may be mutating
+        # live caches (e.g. the query-embedding LRU) while the report runs
+        if isinstance(obj, dict):
+            children = [c for kv in list(obj.items()) for c in kv]
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            children = list(obj)
+        elif depth < 8 and (hasattr(obj, "__dict__") or hasattr(obj, "__slots__")):
+            children = list(getattr(obj, "__dict__", {}).values())
+            children += [getattr(obj, s) for s in getattr(obj, "__slots__", ()) if hasattr(obj, s)]
+        else:
+            children = ()
+        for child in children:
+            p, m = self.size(child, depth + 1)
+            private, mapped = private + p, mapped + m
+        return private, mapped
+
+
+def _is_leaf(obj):
+    """Data structures reported as one component (not expanded by attribute)."""
+    leaf = (np.ndarray, pd.DataFrame, pd.Series, pd.Index, dict, list, tuple, set, str, bytes)
+    if torch is not None:
+        leaf += (torch.Tensor, torch.nn.Module)
+    return isinstance(obj, leaf) or not hasattr(obj, "__dict__")
+
+
+def _flags(obj, nbytes):
+    flags = []
+    if nbytes >= MEMORY_FLAG_MB * 1024 * 1024:
+        flags.append(f"oversized: {nbytes / 1e6:,.1f} MB (>= MEMORY_FLAG_MB={MEMORY_FLAG_MB})")
+    if isinstance(obj, pd.DataFrame):
+        for col in obj.columns:
+            s = obj[col]
+            if (s.dtype == object or pd.api.types.is_string_dtype(s)) and len(s):
+                avg = s.astype(str).str.len().mean()
+                if avg > TEXT_COLUMN_AVG_CHARS:
+                    col_mb = s.memory_usage(deep=True) / 1e6
+                    flags.append(f"free-text column '{col}' ({col_mb:,.1f} MB, ~{avg:,.0f} chars/row) "
+                                 "— drop it if serving does not read it")
+    if isinstance(obj, dict) and len(obj) >= DICT_FLAG_ENTRIES:
+        flags.append(f"Python dict with {len(obj):,} entries — a numpy array / pd.Index lookup "
+                     "is several times smaller")
+    return flags
+
+
+def _components(sizer, prefix, obj, depth, out):
+    if depth < MAX_EXPAND_DEPTH and not _is_leaf(obj):
+        other = [0, 0]
+        sizer.seen.add(id(obj))
+        for attr, value in list(vars(obj).items()):
+            if isinstance(value, _SKIP_TYPES):
+                continue
+            before = len(out)
+            _components(sizer, f"{prefix}.{attr}", value, depth + 1, out)
+            if len(out) > before and out[-1]["bytes"] + out[-1]["mapped_bytes"] < MIN_COMPONENT_BYTES \
+                    and _is_leaf(value):
+                small = out.pop()
+                other[0] += small["bytes"]
+                other[1] += small["mapped_bytes"]
+        if other[0] or other[1]:
+            out.append({"name": f"{prefix}.(other)", "type": "", "bytes": other[0], "mapped_bytes": other[1],
+                        "flags": []})
+        return
+    private, mapped = sizer.size(obj)
+    if private or mapped:
+        out.append({"name": prefix, "type": type(obj).__name__, "bytes": private, "mapped_bytes": mapped,
+                    "flags": _flags(obj, private + mapped)})
+
+
+# -------------------------------------------------------------------
+# Process memory
+# -------------------------------------------------------------------
+def process_memory():
+    """RSS / PSS and shared vs private pages of this process, in bytes."""
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        pass
+    if fields:
+        shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+        private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+        return {"source": "smaps_rollup", "rss": fields.get("Rss", 0), "pss": fields.get("Pss", 0),
+                "shared": shared, "private": private, "anonymous": fields.get("Anonymous", 0),
+                "file_backed": fields.get("Pss_File", 0), "swap": fields.get("Swap", 0)}
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss *= 1 if sys.platform == "darwin" else 1024
+    except ImportError:
+        rss = 0
+    return {"source": "ru_maxrss (peak)", "rss": rss}
+
+
+# -------------------------------------------------------------------
+# Report
+# -------------------------------------------------------------------
+def memory_report(models=None, host_mb: float = None):
+    """Per-component bytes, process totals and worker-density estimate."""
+    if models is None:
+        from backend.ml.registry import MODELS
+        models = MODELS.items()
+    sizer = _Sizer()
+    components = []
+    for name, obj in list(models) + list(_TRACKED.items()):
+        if obj is not None:
+            _components(sizer, name, obj, 0, components)
+    components.sort(key=lambda c: -(c["bytes"] + c["mapped_bytes"]))
+
+    proc = process_memory()
+    accounted = sum(c["bytes"] + c["mapped_bytes"] for c in components)
+    report = {
+        "process": proc,
+        "accounted_bytes": accounted,
+        "unaccounted_bytes": max(proc["rss"] - accounted, 0),   # interpreter, libraries, allocator slack
+        "components": components,
+        "flags": [f"{c['name']}: {flag}" for c in components for flag in c["flags"]],
+    }
+    if "private" in proc:
+        # Extra workers on a host share file-backed / mmapped pages; each adds its private pages
+        density = {"private_per_worker": proc["private"], "shared": proc["shared"]}
+        if host_mb:
+            budget = host_mb * 1024 * 1024 - proc["shared"]
+            density["host_mb"] = host_mb
+            density["max_workers"] = int(budget // max(proc["private"], 1))
+        report["density"] = density
+    return report
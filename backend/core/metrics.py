@@ -0,0 +1,193 @@
+"""
+Lightweight Metrics for BookRS
+------------------------------
+In-process counters and histograms with Prometheus text exposition.
+
+- stage("encode")         context manager timing one pipeline stage into
+                          bookrs_stage_seconds{stage=...} and into the
+                          current request's Server-Timing header
+- record_cache(name, hit) cache hit / miss counters
+- MetricsMiddleware       request counts + latency per route, Server-Timing
+- render_prometheus()     text for the /metrics endpoint
+
+Overhead is two perf_counter() calls and one locked list update per stage.
+Set METRICS_ENABLED=0 to turn every call into a no-op, SERVER_TIMING=0 to
+keep the metrics but drop the response header.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from backend.core.config import METRICS_ENABLED, SERVER_TIMING
+
+# Latency buckets (seconds): 0.1ms … 10s
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request list of (stage, seconds); None outside an HTTP request
+_request_stages: ContextVar = ContextVar("bookrs_request_stages", default=None)
+
+
+def _fmt_labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, val in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labels, key)} {val}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lbl = _fmt_labels(self.labels + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{lbl} {cumulative}")
+            lbl = _fmt_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{lbl} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{lbl} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        m = Counter(name, help_text, labels)
+        self._metrics.append(m)
+        return m
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        m = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(m)
+        return m
+
+    def render(self) -> str:
+        lines = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram("bookrs_stage_seconds", "Time spent per pipeline stage", ("stage",))
+REQUEST_SECONDS = REGISTRY.histogram("bookrs_request_seconds", "HTTP request latency", ("method", "route"))
+REQUESTS_TOTAL = REGISTRY.counter("bookrs_requests_total", "HTTP requests served", ("method", "route", "status"))
+CACHE_TOTAL = REGISTRY.counter("bookrs_cache_requests_total", "Cache lookups by result", ("cache", "result"))
+
+
+@contextmanager
+def _timed_stage(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, name)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, dt))
+
+
+_NOOP = nullcontext()
+
+
+def stage(name: str):
+    """Time a pipeline stage (no-op when METRICS_ENABLED=0)."""
+    return _timed_stage(name) if METRICS_ENABLED else _NOOP
+
+
+def record_cache(cache: str, hit: bool):
+    if METRICS_ENABLED:
+        CACHE_TOTAL.inc(cache, "hit" if hit else "miss")
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+def server_timing_header(stages, total_seconds) -> str:
+    """Aggregate repeated stage names and format a Server-Timing value."""
+    agg = {}
+    for name, dt in stages:
+        agg[name] = agg.get(name, 0.0) + dt
+    parts = [f"{name};dur={dt * 1000:.2f}" for name, dt in agg.items()]
+    parts.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route counters/latency and Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stages = []
+        token = _request_stages.set(stages)
+        t0 = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if SERVER_TIMING:
+                    header = server_timing_header(stages, time.perf_counter() - t0)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, scope["method"], route)
+            REQUESTS_TOTAL.inc(scope["method"], route, status["code"])
@@ -0,0 +1,187 @@
+"""
+On-demand Request Profiling for BookRS
+--------------------------------------
+Profiles the next N requests to /recommend/* without redeploying.
+
+Arming:
+ - env       PROFILE_NEXT_N=5 (optionally PROFILE_MODE=sample) at startup
+ - admin     POST /admin/profiling/arm?n=5&mode=cprofile   (X-Admin-Token)
+ - header    X-Profile: 1 on a single request              (X-Admin-Token)
+
+Modes:
+ - cprofile  deterministic; writes <PROFILE_DIR>/<ts>_<route>.pstats
+ - sample    wall-clock stack sampler; writes collapsed stacks
+             (<ts>_<route>.collapsed, flamegraph.pl / speedscope format)
+
+Sync routes run in Starlette's thread pool, so profiling wraps the route
+function itself (the @profiled decorator) rather than the event loop.
+
+cProfile is process-wide (on 3.12 it takes the single sys.monitoring tool
+slot), so a .pstats also contains whatever other threads ran meanwhile, and
+only one cprofile session runs at a time: a request that finds it busy is
+sampled instead.
+"""
+
+import os
+import re
+import sys
+import time
+import uuid
+import cProfile
+import threading
+import functools
+from collections import Counter
+from contextvars import ContextVar
+
+from backend.core.config import PROFILE_DIR, PROFILE_NEXT_N, PROFILE_MODE, PROFILE_SAMPLE_INTERVAL, ADMIN_TOKEN
+
+MODES = ("cprofile", "sample")
+
+# One cProfile session per process (a second enable() raises on 3.12)
+_CPROFILE_LOCK = threading.Lock()
+
+# Set by ProfilingMiddleware when a request carries a valid X-Profile header
+_force_profile: ContextVar = ContextVar("bookrs_force_profile", default=None)
+
+
+class ProfileController:
+    """Thread-safe budget of requests left to profile."""
+
+    def __init__(self, remaining=0, mode="cprofile"):
+        self._lock = threading.Lock()
+        self.remaining = 0
+        self.mode = "cprofile"
+        self.arm(remaining, mode)
+
+    def arm(self, n: int, mode: str = "cprofile"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        with self._lock:
+            self.remaining = max(0, int(n))
+            self.mode = mode
+
+    def take(self):
+        """Return the mode to profile this request with, or None."""
+        forced = _force_profile.get()
+        if forced:
+            return forced
+        with self._lock:
+            if self.remaining <= 0:
+                return None
+            self.remaining -= 1
+            return self.mode
+
+    def status(self):
+        return {"remaining": self.remaining, "mode": self.mode, "dir": PROFILE_DIR}
+
+
+CONTROLLER = ProfileController(PROFILE_NEXT_N, PROFILE_MODE)
+
+
+class StackSampler:
+    """Samples one thread's stack every `interval` seconds into collapsed form."""
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_id, self.interval = thread_id, interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _out_path(label, ext):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "request"
+    stamp = f"{time.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000) % 1000:03d}_{uuid.uuid4().hex[:6]}"
+    return os.path.join(PROFILE_DIR, f"{stamp}_{safe}.{ext}")
+
+
+def profiled(label: str):
+    """Decorator for route functions: profile the call when the controller says so."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            mode = CONTROLLER.take()
+            if mode is None:
+                return fn(*args, **kwargs)
+            if mode == "cprofile" and not _CPROFILE_LOCK.acquire(blocking=False):
+                mode = "sample"                  # another request holds the profiler
+            if mode == "sample":
+                with StackSampler(threading.get_ident()) as sampler:
+                    result = fn(*args, **kwargs)
+                path = _out_path(label, "collapsed")
+                sampler.dump(path)
+            else:
+                try:
+                    prof = cProfile.Profile()
+                    result = prof.runcall(fn, *args, **kwargs)
+                finally:
+                    _CPROFILE_LOCK.release()
+                path = _out_path(label, "pstats")
+                prof.dump_stats(path)
+            print(f"[PROFILE] {label} → {path}")
+            return result
+        return wrapper
+    return decorator
+
+
+def list_profiles():
+    """Profiles on disk, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith((".pstats", ".collapsed")):
+            st = os.stat(os.path.join(PROFILE_DIR, name))
+            out.append({"name": name, "bytes": st.st_size, "modified": st.st_mtime})
+    return sorted(out, key=lambda p: p["modified"], reverse=True)
+
+
+def admin_token_ok(token) -> bool:
+    return bool(ADMIN_TOKEN) and token == ADMIN_TOKEN
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware honouring `X-Profile: 1|cprofile|sample` from admins."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        flag = headers.get(b"x-profile", b"").decode("latin-1").strip().lower()
+        mode = "cprofile" if flag == "1" else flag
+        if mode not in MODES or not admin_token_ok(headers.get(b"x-admin-token", b"").decode()):
+            await self.app(scope, receive, send)
+            return
+        token = _force_profile.set(mode)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _force_profile.reset(token)
@@ -0,0 +1,162 @@
+"""
+Write-behind Rating Buffer for BookRS
+-------------------------------------
+Rating writes (POST /ratings and the bulk import) go into one in-process
+queue; a background thread drains it in batched transactions, flushing when
+RATING_FLUSH_SIZE rows are waiting or RATING_FLUSH_MS after the first one,
+whichever comes first. One SQLite commit (one fsync) then covers hundreds
+of ratings instead of one.
+
+Durability (RATING_DURABILITY):
+ - commit  the caller's future resolves once its batch is committed, so a
+           successful response still means "on disk" (group commit)
+ - async   callers are acknowledged on enqueue; rows still queued are lost
+           if the process dies before the next flush
+
+Each flush upserts: (user_id, book_id) pairs that already exist are updated
+(rating + timestamp), the rest inserted; within a batch the last write to a
+pair wins. The queue is bounded, so producers (the bulk import) block
+instead of growing memory without limit.
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import Future
+
+from sqlalchemy import text, insert, update, bindparam
+
+from backend.core.config import RATING_FLUSH_SIZE, RATING_FLUSH_MS, RATING_QUEUE_MAX, RATING_DURABILITY
+from backend.core.database import engine
+from backend.core.metrics import REGISTRY, stage
+from backend.models.rating_model import Rating
+
+DURABILITY_MODES = ("commit", "async")
+
+RATINGS_WRITTEN = REGISTRY.counter("bookrs_ratings_written_total", "Ratings flushed to the DB", ("op",))
+FLUSH_ROWS = REGISTRY.histogram("bookrs_rating_flush_rows", "Ratings per flushed transaction", (),
+                                buckets=(1, 5, 10, 50, 100, 250, 500, 1000, 5000))
+
+_STOP = object()
+
+
+class RatingBuffer:
+    def __init__(self, engine=engine, flush_size=RATING_FLUSH_SIZE, flush_ms=RATING_FLUSH_MS,
+                 max_queue=RATING_QUEUE_MAX, durability=RATING_DURABILITY):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}")
+        self.engine, self.durability = engine, durability
+        self.flush_size, self.flush_s = flush_size, flush_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.flushed_rows = 0
+        self.failed_rows = 0
+
+    # -------------------------------------------------------------------
+    # Producers
+    # -------------------------------------------------------------------
+    def submit(self, user_id: int, book_id: int, rating: float) -> Future:
+        """Queue one rating; the future resolves to "added" / "updated" after its flush."""
+        self._ensure_started()
+        fut = Future()
+        self._queue.put((int(user_id), int(book_id), float(rating), fut))
+        return fut
+
+    def submit_many(self, rows) -> list:
+        """Queue (user_id, book_id, rating) rows; blocks while the queue is full."""
+        return [self.submit(u, b, r) for u, b, r in rows]
+
+    def status(self):
+        return {"durability": self.durability, "queued": self._queue.qsize(),
+                "flushed_rows": self.flushed_rows, "failed_rows": self.failed_rows,
+                "running": self._thread is not None and self._thread.is_alive()}
+
+    # -------------------------------------------------------------------
+    # Flusher
+    # -------------------------------------------------------------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                with self.engine.begin() as conn:
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ratings_user_book ON ratings (user_id, book_id)"))
+                self._thread = threading.Thread(target=self._run, daemon=True, name="rating-flusher")
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch, deadline = [item], time.monotonic() + self.flush_s
+            stop = False
+            while len(batch) < self.flush_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        latest = {}                                   # (user, book) -> rating; last write wins
+        for u, b, r, _ in batch:
+            latest[(u, b)] = r
+        now = datetime.utcnow()
+        try:
+            with stage("rating_flush"), self.engine.begin() as conn:
+                users = sorted({u for u, _ in latest})
+                existing = set()
+                for i in range(0, len(users), 500):      # stay under SQLite's bound-parameter limit
+                    chunk = users[i:i + 500]
+                    rows = conn.execute(
+                        text(f"SELECT user_id, book_id FROM ratings WHERE user_id IN ({','.join(map(str, chunk))})")
+                    )
+                    existing.update((int(u), int(b)) for u, b in rows if (int(u), int(b)) in latest)
+                updates = [{"u": u, "b": b, "r": r, "ts": now} for (u, b), r in latest.items() if (u, b) in existing]
+                inserts = [{"user_id": u, "book_id": b, "rating": r, "timestamp": now}
+                           for (u, b), r in latest.items() if (u, b) not in existing]
+                table = Rating.__table__
+                if updates:
+                    conn.execute(
+                        update(table)
+                        .where(table.c.user_id == bindparam("u"), table.c.book_id == bindparam("b"))
+                        .values(rating=bindparam("r"), timestamp=bindparam("ts")),
+                        updates,
+                    )
+                if inserts:
+                    conn.execute(insert(table), inserts)
+        except Exception as e:
+            self.failed_rows += len(batch)
+            print(f"[WARN] Rating flush of {len(batch)} rows failed: {e}")
+            for *_, fut in batch:
+                fut.set_exception(e)
+            return
+        RATINGS_WRITTEN.inc("update", amount=len(updates))
+        RATINGS_WRITTEN.inc("insert", amount=len(inserts))
+        FLUSH_ROWS.observe(len(batch))
+        self.flushed_rows += len(batch)
+        for u, b, _, fut in batch:
+            fut.set_result("updated" if (u, b) in existing else "added")
+
+    def close(self, timeout: float = 10.0):
+        """Flush everything queued and stop the flusher."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+BUFFER = RatingBuffer()
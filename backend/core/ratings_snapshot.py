@@ -0,0 +1,204 @@
+"""
+Columnar Ratings Snapshot for BookRS
+------------------------------------
+Offline jobs read ratings from Parquet instead of pulling the whole table
+through SQLAlchemy on every run.
+
+Layout (artifacts/ratings_snapshot/):
+ - part-XXXXX.parquet   id, user_id, book_id, rating, timestamp
+ - manifest.json        watermarks (max id, max timestamp), part list
+
+Change capture on sync():
+ - inserts  rows with id > the id watermark (ids are autoincrement)
+ - updates  rows at or below the id watermark whose timestamp moved past
+            the timestamp watermark (rating writes refresh the timestamp)
+Both are read in one transaction against watermarks taken at its start,
+so a row changed mid-sync is picked up by the next one. Each sync appends
+one part; readers keep the newest version of every id. If the table's row
+count no longer matches (deletes), the snapshot is rebuilt from scratch.
+Parts are compacted once there are more than COMPACT_PARTS of them.
+
+Writers (sync, compact) hold an exclusive flock on <dir>/.lock and readers a
+shared one, so concurrent jobs never race on part numbers or read parts a
+compaction / rebuild is deleting. Only offline jobs sync; serving code reads
+the snapshot as it is (sync_first=False).
+
+    read_ratings(["user_id", "book_id"])   # sync, then column-projected read
+"""
+
+import os
+import json
+import glob
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.config import RATINGS_SNAPSHOT_DIR
+from backend.core.db_utils import ENGINE
+
+try:
+    import fcntl
+except ImportError:      # Windows: no advisory locks, run one snapshot job at a time
+    fcntl = None
+
+COLUMNS = ["id", "user_id", "book_id", "rating", "timestamp"]
+DTYPES = {"id": np.int64, "user_id": np.int32, "book_id": np.int32, "rating": np.float32}
+CHUNK_ROWS = 500_000
+COMPACT_PARTS = 32
+
+
+@contextmanager
+def _locked(path, exclusive=True):
+    """flock on the snapshot directory: exclusive for writers, shared for readers."""
+    if fcntl is None or not os.path.isdir(path):
+        yield
+        return
+    with open(os.path.join(path, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _manifest_path(path):
+    return os.path.join(path, "manifest.json")
+
+
+def read_manifest(path=RATINGS_SNAPSHOT_DIR):
+    try:
+        with open(_manifest_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(path, manifest):
+    tmp = _manifest_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, _manifest_path(path))
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.astype(DTYPES)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+def _write_part(path, manifest, df, updates=False):
+    n = manifest["next_part"]
+    name = f"part-{n:05d}.parquet"
+    tmp = os.path.join(path, name + ".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, os.path.join(path, name))
+    manifest["parts"].append({"name": name, "rows": int(len(df)), "updates": bool(updates)})
+    manifest["next_part"] = n + 1
+
+
+def _full_build(path, chunk_rows):
+    for old in glob.glob(os.path.join(path, "part-*.parquet")):
+        os.remove(old)
+    manifest = {"max_id": 0, "max_ts": None, "rows": 0, "parts": [], "next_part": 0}
+    with ENGINE.connect() as conn:
+        max_id, max_ts = conn.execute(text("SELECT MAX(id), MAX(timestamp) FROM ratings")).first()
+        query = text("SELECT id, user_id, book_id, rating, timestamp FROM ratings WHERE id <= :w ORDER BY id")
+        for chunk in pd.read_sql(query, conn, params={"w": max_id or 0}, chunksize=chunk_rows):
+            _write_part(path, manifest, _normalize(chunk))
+    manifest.update(max_id=int(max_id or 0), max_ts=max_ts, rows=sum(p["rows"] for p in manifest["parts"]))
+    return manifest
+
+
+def sync(path=RATINGS_SNAPSHOT_DIR, full=False, chunk_rows=CHUNK_ROWS, verbose=True):
+    """Bring the snapshot up to date with the ratings table; returns the manifest."""
+    os.makedirs(path, exist_ok=True)
+    with _locked(path):
+        return _sync(path, full, chunk_rows, verbose)
+
+
+def _sync(path, full, chunk_rows, verbose):
+    manifest = None if full else read_manifest(path)
+    if manifest is None:
+        manifest = _full_build(path, chunk_rows)
+        _write_manifest(path, manifest)
+        if verbose:
+            print(f"[OK] Ratings snapshot built: {manifest['rows']:,} rows in {len(manifest['parts'])} parts.")
+        return manifest
+
+    with ENGINE.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ratings_timestamp ON ratings (timestamp)"))
+    with ENGINE.connect() as conn:
+        with conn.begin():
+            conn.exec_driver_sql("BEGIN")   # pysqlite emits no BEGIN for SELECTs; the three reads share one snapshot
+            new_max_id, new_max_ts, count = conn.execute(
+                text("SELECT MAX(id), MAX(timestamp), COUNT(*) FROM ratings")).first()
+            new_max_id = int(new_max_id or 0)
+            inserts = pd.read_sql(text(
+                "SELECT id, user_id, book_id, rating, timestamp FROM ratings WHERE id > :w AND id <= :nw"
+            ), conn, params={"w": manifest["max_id"], "nw": new_max_id})
+            updates = pd.read_sql(text(
+                "SELECT id, user_id, book_id, rating, timestamp FROM ratings "
+                "WHERE id <= :w AND timestamp > :ts AND timestamp <= :nts"
+            ), conn, params={"w": manifest["max_id"], "ts": manifest["max_ts"] or "", "nts": new_max_ts or ""})
+
+    if manifest["rows"] + len(inserts) != count:
+        if verbose:
+            print("[WARN] Ratings were deleted since the last snapshot — rebuilding.")
+        return _sync(path, True, chunk_rows, verbose)
+
+    if len(inserts) or len(updates):
+        delta = pd.concat([d for d in (updates, inserts) if len(d)], ignore_index=True)
+        _write_part(path, manifest, _normalize(delta), updates=len(updates) > 0)
+    manifest.update(max_id=new_max_id, max_ts=new_max_ts or manifest["max_ts"], rows=int(count))
+    _write_manifest(path, manifest)
+    if verbose:
+        print(f"[OK] Ratings snapshot synced: +{len(inserts):,} new, {len(updates):,} updated "
+              f"({manifest['rows']:,} rows, {len(manifest['parts'])} parts).")
+    if len(manifest["parts"]) > COMPACT_PARTS:
+        _compact(path, chunk_rows)
+        manifest = read_manifest(path)
+    return manifest
+
+
+def _read_parts(path, manifest, columns):
+    dedupe = any(p["updates"] for p in manifest["parts"])
+    cols = list(dict.fromkeys((["id"] if dedupe else []) + list(columns)))
+    frames = [pd.read_parquet(os.path.join(path, p["name"]), columns=cols) for p in manifest["parts"]]
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype=DTYPES.get(c, "datetime64[ns]")) for c in columns})
+    df = pd.concat(frames, ignore_index=True)
+    if dedupe:   # later parts hold newer versions of an id
+        df = df.drop_duplicates("id", keep="last").sort_values("id", kind="stable")
+    return df[list(columns)].reset_index(drop=True)
+
+
+def compact(path=RATINGS_SNAPSHOT_DIR, chunk_rows=CHUNK_ROWS):
+    """Rewrite the snapshot as deduplicated, id-ordered parts."""
+    with _locked(path):
+        _compact(path, chunk_rows)
+
+
+def _compact(path, chunk_rows):
+    manifest = read_manifest(path)
+    df = _read_parts(path, manifest, COLUMNS)
+    old = [p["name"] for p in manifest["parts"]]
+    manifest["parts"] = []
+    for start in range(0, len(df), chunk_rows):
+        _write_part(path, manifest, df.iloc[start:start + chunk_rows])
+    _write_manifest(path, manifest)
+    for name in old:
+        os.remove(os.path.join(path, name))
+    print(f"[OK] Compacted ratings snapshot: {len(old)} → {len(manifest['parts'])} parts.")
+
+
+def read_ratings(columns=("user_id", "book_id", "rating"), path=RATINGS_SNAPSHOT_DIR, sync_first=True):
+    """Ratings from the snapshot with column projection (ids as int64)."""
+    if sync_first:
+        sync(path, verbose=False)
+    with _locked(path, exclusive=False):
+        manifest = read_manifest(path)
+        if manifest is None:
+            raise FileNotFoundError(f"No ratings snapshot in {path} (run backend.scripts.snapshot_ratings)")
+        df = _read_parts(path, manifest, columns)
+    return df.astype({c: np.int64 for c in ("id", "user_id", "book_id") if c in df.columns})
@@ -0,0 +1,74 @@
+"""
+Single-flight Request Coalescing for BookRS
+-------------------------------------------
+Concurrent calls with the same key share one computation: the first caller
+(leader) runs it, callers arriving while it is in flight wait and receive
+the same result (or the same exception). Nothing is cached afterwards —
+the key is forgotten as soon as the leader finishes.
+
+    HYBRID_FLIGHT.do(("q", user_id, top_k), lambda: model.recommend(...))
+
+Routes run in Starlette's thread pool, so this is thread-based. Results are
+shared objects: callers must treat them as read-only.
+
+Metrics: bookrs_singleflight_total{flight, role="leader"|"collapsed"}.
+"""
+
+import threading
+
+from backend.core.config import SINGLEFLIGHT_ENABLED
+from backend.core.metrics import REGISTRY, stage
+
+SINGLEFLIGHT_TOTAL = REGISTRY.counter(
+    "bookrs_singleflight_total", "Coalesced calls by role (collapsed = served by another request)", ("flight", "role"),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result, self.error, self.waiters = None, None, 0
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = SINGLEFLIGHT_ENABLED):
+        self.name, self.enabled = name, enabled
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run fn() once per key among concurrent callers; everyone gets its result."""
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            SINGLEFLIGHT_TOTAL.inc(self.name, "collapsed")
+            with stage("coalesced_wait"):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_TOTAL.inc(self.name, "leader")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
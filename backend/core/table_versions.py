@@ -0,0 +1,81 @@
+"""
+Table Versions for BookRS
+-------------------------
+A tiny `table_versions` table (name, version, updated_at) whose rows are
+bumped by SQLite triggers on every INSERT / UPDATE / DELETE of a tracked
+table, so any writer — API, seed scripts, sqlite3 shell — moves the
+version. Tables that are rebuilt by swapping (user_feeds) call bump()
+inside their swap transaction instead, since a recreated table has no
+triggers.
+
+Used as a cheap change detector (HTTP ETags / Last-Modified):
+
+    table_version("books")  -> (version, "2026-10-19 06:05:12")
+"""
+
+import time
+import threading
+from sqlalchemy import text
+
+from backend.core.db_utils import ENGINE
+
+TRACKED_TABLES = ("books",)
+CACHE_SECONDS = 1.0     # lookups are served from memory for this long
+
+_DDL = ("CREATE TABLE IF NOT EXISTS table_versions ("
+        "name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, "
+        "updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)")
+
+_cache = {}
+_lock = threading.Lock()
+_ready = False
+
+
+def ensure_table_versions(engine=ENGINE, tables=TRACKED_TABLES):
+    """Create the versions table and the per-table triggers (idempotent)."""
+    global _ready
+    with engine.begin() as conn:
+        conn.execute(text(_DDL))
+        for table in tables:
+            conn.execute(text("INSERT OR IGNORE INTO table_versions (name) VALUES (:t)"), {"t": table})
+            for op in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_version "
+                    f"AFTER {op} ON {table} BEGIN "
+                    f"UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP "
+                    f"WHERE name = '{table}'; END"
+                ))
+    _ready = True
+
+
+def bump(conn, table: str):
+    """Advance a table's version inside the caller's transaction."""
+    conn.execute(text(_DDL))
+    conn.execute(text(
+        "INSERT INTO table_versions (name, version) VALUES (:t, 1) "
+        "ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP"
+    ), {"t": table})
+
+
+def is_fresh(table: str) -> bool:
+    """True when table_version(table) would be answered from memory (no DB access)."""
+    hit = _cache.get(table)
+    return _ready and hit is not None and time.monotonic() - hit[0] < CACHE_SECONDS
+
+
+def table_version(table: str):
+    """(version, updated_at) of a table; (0, None) if it was never tracked."""
+    if not _ready:
+        ensure_table_versions()
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(table)
+        if hit is not None and now - hit[0] < CACHE_SECONDS:
+            return hit[1]
+    with ENGINE.connect() as conn:
+        row = conn.execute(text("SELECT version, updated_at FROM table_versions WHERE name = :t"),
+                           {"t": table}).first()
+    value = (int(row[0]), row[1]) if row else (0, None)
+    with _lock:
+        _cache[table] = (now, value)
+    return value
@@ -1,20 +1,51 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import users, books, ratings, recommend
+from fastapi.responses import PlainTextResponse
+from backend.core.metrics import MetricsMiddleware, render_prometheus
+from backend.core.http_cache import HttpCacheMiddleware, add_compression
+from backend.core.table_versions import ensure_table_versions
+from backend.core.profiling import ProfilingMiddleware
+from backend.ml.registry import MODELS
+from backend.core.rating_buffer import BUFFER
+from backend.ml.embedding_worker import EMBEDDER
+from backend.routers import users, books, ratings, recommend, admin
 
-app = FastAPI(title="BookRS - AI-Powered Recommendation System")
+@asynccontextmanager
+async def lifespan(app):
+    ensure_table_versions()   # triggers behind the HTTP ETags
+    # Pick up newly published artifact versions without a restart
+    MODELS.start_watcher()
+    EMBEDDER.start()   # embeds books added at runtime (and any the index is missing)
+    yield
+    MODELS.stop_watcher()
+    EMBEDDER.close()
+    MODELS.close()   # shard worker pools / shared memory
+    BUFFER.close()   # flush queued rating writes
 
+app = FastAPI(title="BookRS - AI-Powered Recommendation System", lifespan=lifespan)
+
+app.add_middleware(HttpCacheMiddleware)   # ETag / 304 / Cache-Control
+add_compression(app)                      # br (if brotli-asgi is installed) or gzip
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 app.include_router(users.router)
 app.include_router(books.router)
 app.include_router(ratings.router)
 app.include_router(recommend.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
     return {"message": "Welcome to BookRS API"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of stage/request/cache metrics."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,266 @@
+"""
+Append-only Sharded Embedding Store for BookRS
+----------------------------------------------
+Replaces the single book_embeddings.pt + emb_meta.parquet pair, which had to
+be rewritten in full whenever one book changed.
+
+Layout (artifacts/emb_store/):
+ - manifest.json             dim, shard list, tombstone file, generation
+ - shard_XXXXX.npy           float32 vectors (rows x dim), written once
+ - shard_XXXXX.parquet       book_id, text_hash, title, authors per row
+ - tombstones_XXXXX.npy      int64 global row ids that are no longer live
+
+A global row id is the shard's starting offset + row inside the shard.
+Re-embedding a changed book appends a new row and tombstones the old one;
+deleting a book only tombstones. compact() rewrites the live rows into one
+shard once tombstones or shard count grow past a threshold.
+
+Every manifest / tombstone write goes to a new file and is swapped in with
+os.replace, and shard files are never modified once written, so a reader
+never sees a half-written store. Files a new manifest stops referencing are
+listed under "garbage" and deleted by the next compaction, not right away,
+so a reader still holding the previous manifest can open everything it
+names.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from backend.core.config import ART_DIR, EMB_STORE_DIR, EMB_PATH, EMB_META
+
+META_COLUMNS = ["book_id", "text_hash", "title", "authors"]
+COMPACT_DEAD_RATIO = 0.2
+COMPACT_MAX_SHARDS = 32
+
+
+def combined_text(df: pd.DataFrame) -> pd.Series:
+    """Text fed to the encoder (title repeated for stronger weight)."""
+    return (
+        df["title"].fillna("") + " " +
+        df["title"].fillna("") + " " +
+        df["authors"].fillna("") + " " +
+        df["description"].fillna("")
+    )
+
+
+def text_hash(texts) -> list:
+    """Stable 64-bit content hash (hex) per text."""
+    return [hashlib.blake2b(t.encode("utf-8"), digest_size=8).hexdigest() for t in texts]
+
+
+def _atomic_write_json(path, obj):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class EmbeddingStore:
+    def __init__(self, path=EMB_STORE_DIR):
+        self.path = path
+        self.manifest_path = os.path.join(path, "manifest.json")
+        with open(self.manifest_path) as f:
+            self.manifest = json.load(f)
+        self._meta_cache = None     # (generation, all_meta()) — shard parquets are read once per generation
+
+    # -------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------
+    @staticmethod
+    def exists(path=EMB_STORE_DIR) -> bool:
+        return os.path.exists(os.path.join(path, "manifest.json"))
+
+    @classmethod
+    def create(cls, dim: int, path=EMB_STORE_DIR):
+        os.makedirs(path, exist_ok=True)
+        _atomic_write_json(os.path.join(path, "manifest.json"),
+                           {"dim": int(dim), "shards": [], "tombstones": None, "generation": 0})
+        return cls(path)
+
+    @classmethod
+    def import_legacy(cls, path=EMB_STORE_DIR, emb_path=EMB_PATH, meta_path=EMB_META):
+        """One-time migration of book_embeddings.pt + emb_meta.parquet into a store."""
+        import torch
+        emb = torch.load(emb_path, map_location="cpu")
+        emb = emb.numpy() if isinstance(emb, torch.Tensor) else np.asarray(emb)
+        meta = read_legacy_meta(meta_path)
+        store = cls.create(emb.shape[1], path)
+        store.append(emb, meta, replace=False)
+        print(f"[OK] Imported {len(meta):,} legacy embeddings into {path}")
+        return store
+
+    # -------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _tombstones(self) -> np.ndarray:
+        name = self.manifest.get("tombstones")
+        return np.load(self._file(name)) if name else np.zeros(0, dtype=np.int64)
+
+    def _commit(self, shards=None, tombstones=None, retire=(), collect=False):
+        """
+        Write a new manifest generation (new tombstone file if given). Files it no
+        longer references (retire, a replaced tombstone file) become garbage;
+        collect=True deletes the garbage of earlier generations after the swap.
+        """
+        m = dict(self.manifest)
+        m["generation"] = m.get("generation", 0) + 1
+        if shards is not None:
+            m["shards"] = shards
+        old_tomb = m.get("tombstones")
+        if tombstones is not None:
+            if len(tombstones):
+                name = f"tombstones_{m['generation']:05d}.npy"
+                np.save(self._file(name), np.unique(tombstones).astype(np.int64))
+                m["tombstones"] = name
+            else:
+                m["tombstones"] = None
+        retired = list(retire) + ([old_tomb] if old_tomb and old_tomb != m["tombstones"] else [])
+        earlier = list(self.manifest.get("garbage", []))
+        m["garbage"] = retired if collect else earlier + retired
+        _atomic_write_json(self.manifest_path, m)
+        self.manifest = m
+        if collect:
+            for name in earlier:
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+
+    def _next_shard_name(self):
+        return f"shard_{self.manifest.get('generation', 0) + 1:05d}"
+
+    @property
+    def total_rows(self) -> int:
+        return sum(s["rows"] for s in self.manifest["shards"])
+
+    # -------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------
+    def all_meta(self) -> pd.DataFrame:
+        """Metadata of every row ever written (live or not) with its global row id."""
+        generation = self.manifest.get("generation", 0)
+        if self._meta_cache is not None and self._meta_cache[0] == generation:
+            return self._meta_cache[1]
+        parts, offset = [], 0
+        for s in self.manifest["shards"]:
+            df = pd.read_parquet(self._file(f"{s['name']}.parquet"))
+            df["row"] = np.arange(offset, offset + len(df))
+            parts.append(df)
+            offset += s["rows"]
+        meta = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=META_COLUMNS + ["row"])
+        self._meta_cache = (generation, meta)
+        return meta
+
+    def live_meta(self) -> pd.DataFrame:
+        meta = self.all_meta()
+        return meta[~meta["row"].isin(self._tombstones())].reset_index(drop=True)
+
+    def load(self):
+        """(float32 matrix, meta) of live rows, in global row order."""
+        meta = self.live_meta()
+        dim = self.manifest["dim"]
+        out = np.empty((len(meta), dim), dtype=np.float32)
+        rows = meta["row"].to_numpy()
+        pos, offset = 0, 0
+        for s in self.manifest["shards"]:
+            lo, hi = np.searchsorted(rows, [offset, offset + s["rows"]])
+            if hi > lo:
+                shard = np.load(self._file(f"{s['name']}.npy"), mmap_mode="r")
+                out[pos:pos + hi - lo] = shard[rows[lo:hi] - offset]
+                pos += hi - lo
+            offset += s["rows"]
+        return out, meta.drop(columns=["row"])
+
+    # -------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------
+    def append(self, vectors: np.ndarray, meta: pd.DataFrame, replace: bool = True):
+        """
+        Append one shard; older live rows of the same book_ids are tombstoned.
+        replace=False skips that lookup when the caller knows the ids are new
+        (bulk builds into a fresh store).
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            return
+        if vectors.shape[1] != self.manifest["dim"]:
+            raise ValueError(f"Expected dim {self.manifest['dim']}, got {vectors.shape[1]}")
+        replaced = np.zeros(0, dtype=np.int64)
+        if replace:
+            live = self.live_meta()
+            replaced = live.loc[live["book_id"].isin(meta["book_id"]), "row"].to_numpy()
+
+        name = self._next_shard_name()
+        shard_meta = meta[META_COLUMNS].reset_index(drop=True)
+        np.save(self._file(f"{name}.npy"), vectors)
+        shard_meta.to_parquet(self._file(f"{name}.parquet"), index=False)
+        offset = self.total_rows
+        shards = self.manifest["shards"] + [{"name": name, "rows": int(len(vectors))}]
+        tomb = np.concatenate([self._tombstones(), replaced]) if len(replaced) else None
+        cached = self._meta_cache
+        self._commit(shards=shards, tombstones=tomb)
+        if replace and cached is not None:    # extend the cached meta instead of re-reading every shard
+            shard_meta["row"] = np.arange(offset, offset + len(shard_meta))
+            self._meta_cache = (self.manifest["generation"], pd.concat([cached[1], shard_meta], ignore_index=True))
+
+    def delete(self, book_ids):
+        live = self.live_meta()
+        rows = live.loc[live["book_id"].isin(list(book_ids)), "row"].to_numpy()
+        if len(rows):
+            self._commit(tombstones=np.concatenate([self._tombstones(), rows]))
+
+    def needs_compaction(self, dead_ratio=COMPACT_DEAD_RATIO, max_shards=COMPACT_MAX_SHARDS) -> bool:
+        total = self.total_rows
+        dead = len(self._tombstones())
+        return len(self.manifest["shards"]) > max_shards or bool(total and dead / total > dead_ratio)
+
+    def compact(self):
+        """Rewrite live rows into a single shard and drop tombstones (old shards are deleted next time)."""
+        vectors, meta = self.load()
+        old = [s["name"] for s in self.manifest["shards"]]
+        name = self._next_shard_name()
+        np.save(self._file(f"{name}.npy"), vectors)
+        meta[META_COLUMNS].to_parquet(self._file(f"{name}.parquet"), index=False)
+        self._commit(shards=[{"name": name, "rows": int(len(vectors))}], tombstones=np.zeros(0, dtype=np.int64),
+                     retire=[n + ext for n in old for ext in (".npy", ".parquet")], collect=True)
+        print(f"[OK] Compacted {len(old)} shards → {name} ({len(meta):,} live rows)")
+
+
+def read_legacy_meta(meta_path=EMB_META) -> pd.DataFrame:
+    """Legacy emb_meta.parquet with the text hashes the store keeps (read-only)."""
+    meta = pd.read_parquet(meta_path)
+    meta["text_hash"] = text_hash(meta["combined_text"].fillna(""))
+    return meta
+
+
+def _paths(art_dir):
+    """(store dir, legacy .pt, legacy meta) inside an artifact directory."""
+    return tuple(os.path.join(art_dir, os.path.basename(p)) for p in (EMB_STORE_DIR, EMB_PATH, EMB_META))
+
+
+def embeddings_version(art_dir=ART_DIR) -> str:
+    """Cheap change marker for caches keyed on the embeddings."""
+    store_dir, emb_path, _ = _paths(art_dir)
+    if EmbeddingStore.exists(store_dir):
+        return f"store-{EmbeddingStore(store_dir).manifest.get('generation', 0)}"
+    return f"pt-{os.path.getmtime(emb_path)}" if os.path.exists(emb_path) else "none"
+
+
+def load_embeddings(art_dir=ART_DIR):
+    """
+    Embedding matrix (float32 numpy) + meta for serving / offline jobs.
+    Prefers the sharded store; falls back to the legacy .pt + parquet pair.
+    """
+    store_dir, emb_path, meta_path = _paths(art_dir)
+    if EmbeddingStore.exists(store_dir):
+        return EmbeddingStore(store_dir).load()
+    import torch
+    emb = torch.load(emb_path, map_location="cpu")
+    emb = emb.numpy() if isinstance(emb, torch.Tensor) else np.asarray(emb)
+    meta = pd.read_parquet(meta_path)
+    return emb.astype(np.float32, copy=False), meta
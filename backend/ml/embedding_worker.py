@@ -0,0 +1,187 @@
+"""
+Background Embedding Worker for BookRS
+--------------------------------------
+Makes books created at runtime (POST /books) searchable without running
+update_embeddings and without a reload:
+
+ - POST /books commits the row and submit()s its id
+ - a daemon thread micro-batches ids (EMBED_BATCH_SIZE, or EMBED_BATCH_MS
+   after the first one), encodes them with the live hybrid model's encoder
+   (same combined_text recipe as the offline builders) and appends the
+   vectors to the semantic delta segment (SemanticRecommender.add_books)
+ - every EMBED_RECONCILE_SECONDS, and after a hot reload swapped the model,
+   books present in the DB but missing from the live index are picked up
+   too (rows inserted by other processes, or a batch that raced a reload)
+
+The same batch is added to the autocomplete index (SuggestIndex.add_books)
+when that model is loaded. The delta lives in memory only; the next
+update_embeddings + publish makes the books part of a versioned artifact,
+and the reload keeps any runtime books that version does not contain yet.
+
+Ingestion lag (submit → searchable) is exposed by status() / GET
+/books/ingestion and as bookrs_embedding_ingest_lag_seconds.
+"""
+
+import queue
+import threading
+import time
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.config import EMBED_BATCH_SIZE, EMBED_BATCH_MS, EMBED_RECONCILE_SECONDS
+from backend.core.db_utils import ENGINE
+from backend.core.metrics import REGISTRY, stage
+from backend.ml.embedding_store import combined_text
+from backend.ml.registry import MODELS
+
+INGEST_LAG = REGISTRY.histogram("bookrs_embedding_ingest_lag_seconds", "Book created → searchable", (),
+                                buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+BOOKS_EMBEDDED = REGISTRY.counter("bookrs_books_embedded_total", "Runtime-added books embedded", ("result",))
+
+BOOK_COLUMNS = ["book_id", "title", "authors", "description", "avg_rating", "image_url"]
+_STOP = object()
+
+
+class EmbeddingWorker:
+    def __init__(self, models=MODELS, batch_size=EMBED_BATCH_SIZE, batch_ms=EMBED_BATCH_MS,
+                 reconcile_s=EMBED_RECONCILE_SECONDS):
+        self.models = models
+        self.batch_size, self.batch_s, self.reconcile_s = batch_size, batch_ms / 1000.0, reconcile_s
+        self._queue = queue.Queue()
+        self._pending = {}                   # book_id -> submit time
+        self._lock = threading.Lock()
+        self._thread = None
+        self._model = None                   # hybrid instance last ingested into
+        self.embedded = 0
+        self.failed = 0
+        self.last_batch = None
+
+    # -------------------------------------------------------------------
+    # Producers / status
+    # -------------------------------------------------------------------
+    def submit(self, book_id: int):
+        """Queue a committed book for embedding."""
+        self.start()
+        with self._lock:
+            self._pending.setdefault(int(book_id), time.time())
+        self._queue.put(int(book_id))
+
+    def status(self):
+        now = time.time()
+        with self._lock:
+            oldest = min(self._pending.values(), default=None)
+            pending = len(self._pending)
+        try:
+            delta_rows = len(self.models.get("hybrid").semantic.delta)
+        except KeyError:
+            delta_rows = 0
+        return {
+            "pending": pending,
+            "lag_seconds": round(now - oldest, 3) if oldest is not None else 0.0,   # oldest unsearchable book
+            "last_batch": self.last_batch,
+            "embedded": self.embedded, "failed": self.failed,
+            "delta_rows": delta_rows,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+    # -------------------------------------------------------------------
+    # Worker thread
+    # -------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="embedding-worker")
+                self._thread.start()
+
+    def _run(self):
+        self._reconcile()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.reconcile_s if self.reconcile_s > 0 else None)
+            except queue.Empty:
+                self._reconcile()
+                continue
+            if item is _STOP:
+                return
+            batch, deadline, stop = [item], time.monotonic() + self.batch_s, False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._ingest(batch)
+            if self._model is not None and dict(self.models.items()).get("hybrid") is not self._model:
+                self._reconcile()            # a reload swapped the model while we encoded
+            if stop:
+                return
+
+    def _reconcile(self):
+        """Embed DB books the live index does not know (other writers, reload races)."""
+        try:
+            semantic = self.models.get("hybrid").semantic
+        except KeyError:
+            return
+        try:
+            with ENGINE.connect() as conn:
+                ids = pd.Index([r[0] for r in conn.execute(text("SELECT book_id FROM books"))])
+            missing = ids.difference(semantic.known_ids()).tolist()
+        except Exception as e:
+            print(f"[WARN] Embedding reconcile failed, retrying in {self.reconcile_s:g}s: {e}")
+            return
+        for i in range(0, len(missing), self.batch_size):
+            self._ingest(missing[i:i + self.batch_size])
+
+    def _ingest(self, book_ids):
+        t0 = time.time()
+        try:
+            hybrid = self.models.get("hybrid")
+            ids = ",".join(str(int(b)) for b in dict.fromkeys(book_ids))
+            books = pd.read_sql(f"SELECT {', '.join(BOOK_COLUMNS)} FROM books WHERE book_id IN ({ids})", ENGINE)
+            books[["title", "authors", "description", "image_url"]] = \
+                books[["title", "authors", "description", "image_url"]].fillna("")
+            added = 0
+            if len(books):
+                with stage("embed_batch"):
+                    vectors = hybrid.semantic.model.encode(combined_text(books).tolist(), convert_to_numpy=True,
+                                                           show_progress_bar=False)
+                added = hybrid.semantic.add_books(books, vectors, books[["book_id", "authors", "avg_rating", "image_url"]])
+                try:
+                    self.models.get("suggest").add_books(books[["book_id", "title", "authors", "avg_rating"]])
+                except KeyError:
+                    pass                     # autocomplete not served by this process
+            self._model = hybrid
+        except Exception as e:
+            self.failed += len(book_ids)
+            BOOKS_EMBEDDED.inc("error", amount=len(book_ids))
+            print(f"[WARN] Embedding batch of {len(book_ids)} books failed: {e}")
+            return   # still pending; the next reconcile retries
+
+        done = time.time()
+        with self._lock:
+            lags = [done - self._pending.pop(int(b), t0) for b in book_ids]
+        for lag in lags:
+            INGEST_LAG.observe(lag)
+        BOOKS_EMBEDDED.inc("ok", amount=added)
+        self.embedded += added
+        self.last_batch = {"books": len(book_ids), "added": added, "encode_seconds": round(done - t0, 3),
+                           "max_lag_seconds": round(max(lags), 3), "at": done}
+
+    def close(self, timeout: float = 10.0):
+        """Finish the queued books and stop the worker."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+EMBEDDER = EmbeddingWorker()
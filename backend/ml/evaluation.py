@@ -0,0 +1,108 @@
+"""
+Offline Evaluation Helpers for BookRS
+-------------------------------------
+Vectorized building blocks shared by the offline evaluators:
+ - per-user train/test split without a Python groupby loop
+ - ID-map → index-array conversion for ALS lookups
+ - blocked top-k selection with argpartition
+ - Precision / Recall / NDCG / MAP @K from a sparse relevance matrix
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+
+def split_per_user(ratings: pd.DataFrame, train_frac: float = 0.8, seed: int = 42):
+    """
+    Per-user random split, fully vectorized.
+
+    Every row gets a random key; rows are ordered by (user_id, key) and the
+    first max(1, int(train_frac * n_user)) rows of each user go to train.
+    """
+    rng = np.random.default_rng(seed)
+    keys = rng.random(len(ratings))
+    order = np.lexsort((keys, ratings["user_id"].to_numpy()))
+    df = ratings.iloc[order]
+
+    users = df["user_id"].to_numpy()
+    # Position of each row inside its user's run (rows are grouped by user)
+    starts = np.r_[0, np.flatnonzero(users[1:] != users[:-1]) + 1]
+    sizes = np.diff(np.r_[starts, len(users)])
+    rank = np.arange(len(users)) - np.repeat(starts, sizes)
+    cut = np.maximum(1, (train_frac * sizes).astype(int))
+
+    is_train = rank < np.repeat(cut, sizes)
+    return df[is_train].reset_index(drop=True), df[~is_train].reset_index(drop=True)
+
+
+def map_ids(ids, id_map: dict) -> np.ndarray:
+    """Map raw ids to ALS row indices (−1 where unknown)."""
+    lookup = pd.Series(list(id_map.values()), index=list(id_map.keys()), dtype=np.int64)
+    return lookup.reindex(np.asarray(ids)).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def interactions_csr(rows: np.ndarray, cols: np.ndarray, shape) -> csr_matrix:
+    """Binary (rows x cols) CSR matrix; duplicate pairs collapse to 1."""
+    data = np.ones(len(rows), dtype=np.float32)
+    mat = csr_matrix((data, (rows, cols)), shape=shape)
+    mat.data[:] = 1.0
+    return mat
+
+
+def topk_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Row-wise indices of the k largest scores, sorted descending."""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+def mask_seen(scores: np.ndarray, seen: csr_matrix):
+    """Set scores of seen (row, item) pairs to −inf in place."""
+    r, c = seen.nonzero()
+    scores[r, c] = -np.inf
+
+
+def ranking_metrics(topk: np.ndarray, relevant: csr_matrix, k: int) -> dict:
+    """
+    Per-user ranking metrics for one block.
+
+    topk:     (B x K) recommended item indices, best first
+    relevant: (B x I) binary CSR of held-out positives for the same users
+    Returns arrays of length B for precision, recall, ndcg and ap.
+    """
+    b = topk.shape[0]
+    rows = np.repeat(np.arange(b), topk.shape[1])
+    hits = np.asarray(relevant[rows, topk.ravel()]).reshape(topk.shape) > 0
+    n_rel = np.diff(relevant.indptr).astype(np.float64)
+
+    hit_count = hits.sum(axis=1)
+    precision = hit_count / k
+    recall = np.divide(hit_count, n_rel, out=np.zeros(b), where=n_rel > 0)
+
+    discounts = 1.0 / np.log2(np.arange(2, topk.shape[1] + 2))
+    dcg = (hits * discounts).sum(axis=1)
+    ideal_len = np.minimum(n_rel, topk.shape[1]).astype(int)
+    idcg = np.r_[0.0, np.cumsum(discounts)][ideal_len]
+    ndcg = np.divide(dcg, idcg, out=np.zeros(b), where=idcg > 0)
+
+    cum_hits = np.cumsum(hits, axis=1)
+    prec_at_i = cum_hits / np.arange(1, topk.shape[1] + 1)
+    denom = np.minimum(n_rel, k)
+    ap = np.divide((prec_at_i * hits).sum(axis=1), denom, out=np.zeros(b), where=denom > 0)
+
+    return {"precision": precision, "recall": recall, "ndcg": ndcg, "ap": ap}
+
+
+def summarize(per_user: dict, recommended_items: np.ndarray, n_items: int, k: int) -> dict:
+    """Macro-average per-user metrics and add catalog coverage."""
+    out = {f"{name}@{k}": float(np.mean(vals)) if len(vals) else 0.0
+           for name, vals in (("precision", per_user["precision"]),
+                              ("recall", per_user["recall"]),
+                              ("ndcg", per_user["ndcg"]),
+                              ("map", per_user["ap"]))}
+    out["coverage"] = float(len(np.unique(recommended_items)) / n_items) if n_items else 0.0
+    out["users"] = int(len(per_user["precision"]))
+    return out
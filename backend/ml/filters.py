@@ -0,0 +1,81 @@
+"""
+Pre-filter Masks for BookRS Search
+----------------------------------
+Per-attribute indexes over the books table, aligned to one index's row
+order (embedding rows, BM25 rows, ...), that turn request filters into a
+boolean row mask applied *inside* the scan:
+
+ - min_rating  float32 avg_rating per row, compared in one vectorized pass
+ - author      inverted index: lower-cased author name → row ids
+               (multi-author strings are split on commas)
+ - has_cover   precomputed boolean array (book has an image_url) — the books
+               table has no stock / availability column, so this is the
+               availability signal we can filter on
+
+Masked-out rows score −inf, so a filtered top-k is as cheap as an
+unfiltered one and never comes back short because of post-filtering.
+Recently used filter combinations are cached.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from backend.core.db_utils import load_books
+from backend.core.metrics import record_cache
+
+MASK_CACHE_SIZE = 64
+
+
+def load_filter_attributes() -> pd.DataFrame:
+    """book_id, authors, avg_rating, image_url from the books table."""
+    return load_books(columns=["book_id", "authors", "avg_rating", "image_url"])
+
+
+class BookFilters:
+    def __init__(self, book_ids, books: pd.DataFrame):
+        books = books.drop_duplicates("book_id").set_index("book_id")
+        attrs = books.reindex(np.asarray(book_ids, dtype=np.int64))
+        self.n = len(attrs)
+        self.avg_rating = pd.to_numeric(attrs["avg_rating"], errors="coerce").fillna(0).to_numpy(np.float32)
+        self.has_cover = attrs["image_url"].fillna("").astype(str).str.strip().ne("").to_numpy()
+
+        names = attrs["authors"].fillna("").astype(str).str.lower().str.split(",")
+        exploded = names.explode().str.strip()
+        rows = np.repeat(np.arange(self.n), names.str.len().to_numpy())
+        self.author_rows = {
+            name: grp.to_numpy(dtype=np.int64)
+            for name, grp in pd.Series(rows, index=exploded.to_numpy()).groupby(level=0) if name
+        }
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mask(self, min_rating=None, author=None, has_cover=None):
+        """Boolean row mask for the given filters, or None when no filter is set."""
+        if min_rating is None and not author and has_cover is None:
+            return None
+        key = (min_rating, author.strip().lower() if author else None, has_cover)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        record_cache("filter_mask", cached is not None)
+        if cached is not None:
+            return cached
+
+        mask = np.ones(self.n, dtype=bool)
+        if min_rating is not None:
+            mask &= self.avg_rating >= min_rating
+        if key[1]:
+            by_author = np.zeros(self.n, dtype=bool)
+            by_author[self.author_rows.get(key[1], np.zeros(0, dtype=np.int64))] = True
+            mask &= by_author
+        if has_cover is not None:
+            mask &= self.has_cover if has_cover else ~self.has_cover
+        mask.flags.writeable = False
+        with self._lock:
+            self._cache[key] = mask
+            if len(self._cache) > MASK_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return mask
@@ -0,0 +1,270 @@
+"""
+BM25 Lexical Retrieval for BookRS
+---------------------------------
+In-memory inverted index over title, authors and description with BM25
+scoring and MaxScore-style top-k early termination.
+
+Index layout (all flat numpy arrays, persisted as .npy under artifacts/bm25):
+ - postings per term are sorted doc ids stored as d-gaps, bit-packed to the
+   narrowest of uint8 / uint16 / uint32 that fits the term's largest gap
+ - term frequencies are uint8 (clipped at 255)
+ - every BLOCK postings form a block with its first / last doc id and the
+   block's maximum BM25 contribution (skip pointers)
+ - per-term upper bound = max contribution over the whole list
+
+Query (MaxScore):
+ - terms are processed by decreasing upper bound
+ - while the sum of the remaining upper bounds can still beat the current
+   k-th best score θ, a term is *essential*: its full list is decoded and
+   merged into the candidate set
+ - once it cannot, new documents can no longer reach the top-k, so the
+   remaining terms only score existing candidates, decoding just the
+   blocks that contain them, and candidates whose score + remaining bound
+   falls below θ (using the per-block maxima) are dropped
+Query cost therefore follows posting-list length, not catalog size.
+
+Build:
+    python -m backend.scripts.build_bm25
+"""
+
+import os
+import re
+import json
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+from backend.core.config import BM25_DIR
+from backend.core.metrics import stage
+
+K1 = 1.2
+B = 0.75
+BLOCK = 128
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+GAP_DTYPES = (np.uint8, np.uint16, np.uint32)
+
+
+def tokenize(text: str):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in ENGLISH_STOP_WORDS]
+
+
+def combined_text(df: pd.DataFrame) -> pd.Series:
+    """Title and authors are repeated to weight them above the description."""
+    title, authors = df["title"].fillna(""), df["authors"].fillna("")
+    return title + " " + title + " " + authors + " " + authors + " " + df["description"].fillna("")
+
+
+class BM25Index:
+    def __init__(self, arrays: dict, vocab: dict, meta: pd.DataFrame, avgdl: float):
+        self.vocab = vocab
+        self.meta = meta.reset_index(drop=True)
+        self.avgdl = avgdl
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+        self.gaps = (self.gaps8, self.gaps16, self.gaps32)
+
+    # -------------------------------------------------------------------
+    # Build / persist
+    # -------------------------------------------------------------------
+    @classmethod
+    def build(cls, books: pd.DataFrame):
+        """Build from a books frame (book_id, title, authors, description)."""
+        books = books.reset_index(drop=True)
+        cv = CountVectorizer(tokenizer=tokenize, lowercase=False, token_pattern=None, dtype=np.int32)
+        doc_term = cv.fit_transform(combined_text(books))          # (docs x terms)
+        doc_len = np.asarray(doc_term.sum(axis=1)).ravel().astype(np.float32)
+        avgdl = float(doc_len.mean()) if len(doc_len) else 1.0
+
+        term_docs = doc_term.T.tocsr()                              # postings, doc ids ascending
+        term_docs.sort_indices()
+        n_terms = term_docs.shape[0]
+        docs = term_docs.indices.astype(np.int64)
+        tf = term_docs.data.astype(np.float32)
+        post_ptr = term_docs.indptr.astype(np.int64)
+        df_t = np.diff(post_ptr)
+
+        n_docs = len(books)
+        idf = np.log1p((n_docs - df_t + 0.5) / (df_t + 0.5)).astype(np.float32)
+        term_of_post = np.repeat(np.arange(n_terms), df_t)
+        norm = K1 * (1 - B + B * doc_len[docs] / avgdl)
+        contrib = idf[term_of_post] * tf * (K1 + 1) / (tf + norm)
+
+        # d-gaps (first posting of each term stores 0; its doc is term_first)
+        gaps = np.diff(docs, prepend=0)
+        starts = post_ptr[:-1][df_t > 0]
+        gaps[starts] = 0
+        term_first = np.zeros(n_terms, dtype=np.int32)
+        term_first[df_t > 0] = docs[starts]
+
+        # Per-term width selection + packing into three typed buffers
+        term_max_gap = np.zeros(n_terms, dtype=np.int64)
+        nz = df_t > 0
+        term_max_gap[nz] = np.maximum.reduceat(gaps, post_ptr[:-1][nz])
+        gap_code = np.select([term_max_gap < 2**8, term_max_gap < 2**16], [0, 1], 2).astype(np.uint8)
+        gap_off = np.zeros(n_terms, dtype=np.int64)
+        buffers = []
+        for code, dtype in enumerate(GAP_DTYPES):
+            sel = gap_code == code
+            lens = np.where(sel, df_t, 0)
+            gap_off[sel] = (np.cumsum(lens) - lens)[sel]
+            mask = np.repeat(sel, df_t)
+            buffers.append(gaps[mask].astype(dtype))
+
+        # Blocks of BLOCK postings inside each term
+        blocks_per_term = -(-df_t // BLOCK)
+        blk_ptr = np.r_[0, np.cumsum(blocks_per_term)].astype(np.int64)
+        blk_term = np.repeat(np.arange(n_terms), blocks_per_term)
+        blk_rank = np.arange(blk_ptr[-1]) - np.repeat(blk_ptr[:-1], blocks_per_term)
+        blk_start = post_ptr[blk_term] + blk_rank * BLOCK                   # global posting index
+        blk_end = np.minimum(blk_start + BLOCK, post_ptr[blk_term + 1])
+        blk_first = docs[blk_start].astype(np.int32)
+        blk_last = docs[blk_end - 1].astype(np.int32)
+        blk_max = np.maximum.reduceat(contrib, blk_start).astype(np.float32) if len(blk_start) else np.zeros(0, np.float32)
+        term_ub = np.zeros(n_terms, dtype=np.float32)
+        term_ub[nz] = np.maximum.reduceat(contrib, post_ptr[:-1][nz])
+
+        arrays = {
+            "post_ptr": post_ptr, "idf": idf, "term_ub": term_ub, "term_first": term_first,
+            "gap_code": gap_code, "gap_off": gap_off,
+            "gaps8": buffers[0], "gaps16": buffers[1], "gaps32": buffers[2],
+            "tf": np.minimum(tf, 255).astype(np.uint8),
+            "doc_len": doc_len.astype(np.uint32),
+            "blk_ptr": blk_ptr, "blk_first": blk_first, "blk_last": blk_last, "blk_max": blk_max,
+        }
+        return cls(arrays, cv.vocabulary_, books[["book_id", "title", "authors"]], avgdl)
+
+    def save(self, art_dir=BM25_DIR):
+        os.makedirs(art_dir, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(art_dir, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(art_dir, "vocab.pkl"), "wb") as f:
+            pickle.dump(self.vocab, f)
+        self.meta.to_parquet(os.path.join(art_dir, "meta.parquet"), index=False)
+        with open(os.path.join(art_dir, "manifest.json"), "w") as f:
+            json.dump({"avgdl": self.avgdl, "n_docs": len(self.meta), "n_terms": len(self.vocab),
+                       "postings": int(self.post_ptr[-1]), "block": BLOCK}, f)
+
+    @classmethod
+    def load(cls, art_dir=BM25_DIR):
+        """Load a persisted index (memory-mapped), or None when absent."""
+        manifest_path = os.path.join(art_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        arrays = {n: np.load(os.path.join(art_dir, f"{n}.npy"), mmap_mode="r") for n in ARRAY_NAMES}
+        with open(os.path.join(art_dir, "vocab.pkl"), "rb") as f:
+            vocab = pickle.load(f)
+        meta = pd.read_parquet(os.path.join(art_dir, "meta.parquet"))
+        print(f"[OK] BM25 index: {manifest['n_docs']:,} books, {manifest['n_terms']:,} terms, "
+              f"{manifest['postings']:,} postings.")
+        return cls(arrays, vocab, meta, manifest["avgdl"])
+
+    # -------------------------------------------------------------------
+    # Decoding
+    # -------------------------------------------------------------------
+    def _gap_slice(self, t, start, stop):
+        """Gaps for postings [start, stop) of term t (term-relative positions)."""
+        off = self.gap_off[t]
+        return self.gaps[self.gap_code[t]][off + start:off + stop].astype(np.int64)
+
+    def _decode_term(self, t):
+        """All (doc ids, contributions) of term t."""
+        s, e = self.post_ptr[t], self.post_ptr[t + 1]
+        docs = self.term_first[t] + np.cumsum(self._gap_slice(t, 0, e - s))
+        return docs, self._contrib(t, docs, s, e)
+
+    def _decode_blocks(self, t, blocks):
+        """(doc ids, contributions) for the selected blocks (term-relative block numbers)."""
+        n = self.post_ptr[t + 1] - self.post_ptr[t]
+        starts = blocks * BLOCK
+        lens = np.minimum(starts + BLOCK, n) - starts
+        pos = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        gaps = self.gaps[self.gap_code[t]][self.gap_off[t] + pos].astype(np.int64)
+        seg_start = np.cumsum(lens) - lens
+        gaps[seg_start] = 0
+        cs = np.cumsum(gaps)
+        docs = np.repeat(self.blk_first[self.blk_ptr[t] + blocks].astype(np.int64), lens) \
+            + cs - np.repeat(cs[seg_start], lens)
+        glob = self.post_ptr[t] + pos
+        return docs, self._contrib_at(t, docs, glob)
+
+    def _contrib(self, t, docs, s, e):
+        tf = self.tf[s:e].astype(np.float32)
+        return self._bm25(t, tf, docs)
+
+    def _contrib_at(self, t, docs, glob_pos):
+        tf = self.tf[glob_pos].astype(np.float32)
+        return self._bm25(t, tf, docs)
+
+    def _bm25(self, t, tf, docs):
+        norm = K1 * (1 - B + B * self.doc_len[docs].astype(np.float32) / self.avgdl)
+        return self.idf[t] * tf * (K1 + 1) / (tf + norm)
+
+    # -------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------
+    def search(self, query: str, top_k: int = 10, mask=None):
+        """
+        Top-k (row indices, scores) for a query.
+        mask: optional boolean array over rows; False rows are never returned.
+        """
+        terms = {self.vocab[w] for w in tokenize(query) if w in self.vocab}
+        if not terms:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        terms = sorted(terms, key=lambda t: -self.term_ub[t])
+        remaining = np.cumsum([self.term_ub[t] for t in terms][::-1])[::-1]
+
+        cand = np.zeros(0, dtype=np.int64)
+        score = np.zeros(0, dtype=np.float32)
+        for j, t in enumerate(terms):
+            theta = np.partition(score, len(score) - top_k)[len(score) - top_k] if len(score) >= top_k else 0.0
+            if remaining[j] > theta:
+                # Essential: merge the whole list
+                docs, contrib = self._decode_term(t)
+                if mask is not None:
+                    keep = mask[docs]
+                    docs, contrib = docs[keep], contrib[keep]
+                all_docs = np.concatenate([cand, docs])
+                all_sc = np.concatenate([score, contrib])
+                cand, inv = np.unique(all_docs, return_inverse=True)
+                score = np.bincount(inv, weights=all_sc).astype(np.float32)
+            else:
+                # Non-essential: score existing candidates only, via skip blocks.
+                # A candidate survives if score + this block's max + later bounds can reach θ.
+                lo, hi = self.blk_ptr[t], self.blk_ptr[t + 1]
+                blk = np.searchsorted(self.blk_last[lo:hi], cand)
+                inside = blk < hi - lo
+                bmax = np.where(inside, self.blk_max[lo + np.minimum(blk, hi - lo - 1)], 0.0)
+                rest = remaining[j + 1] if j + 1 < len(terms) else 0.0
+                alive = score + bmax + rest >= theta
+                cand, score, blk, inside = cand[alive], score[alive], blk[alive], inside[alive]
+                blocks = np.unique(blk[inside])
+                if len(blocks) == 0:
+                    continue
+                docs, contrib = self._decode_blocks(t, blocks)
+                pos = np.searchsorted(docs, cand)
+                pos = np.minimum(pos, len(docs) - 1)
+                hit = docs[pos] == cand
+                score[hit] += contrib[pos[hit]]
+
+        if len(score) > top_k:
+            part = np.argpartition(-score, top_k - 1)[:top_k]
+            cand, score = cand[part], score[part]
+        order = np.argsort(-score, kind="stable")
+        return cand[order], score[order]
+
+    def recommend(self, query: str, top_k: int = 10, mask=None):
+        """Top-k books as a frame (book_id, title, authors, bm25_score)."""
+        if not query or not query.strip():
+            return pd.DataFrame(columns=["book_id", "title", "authors", "bm25_score"])
+        with stage("bm25"):
+            idx, sc = self.search(query, top_k=top_k, mask=mask)
+        out = self.meta.iloc[idx][["book_id", "title", "authors"]].copy()
+        out["bm25_score"] = np.round(sc, 4)
+        return out.reset_index(drop=True)
+
+
+ARRAY_NAMES = ("post_ptr", "idf", "term_ub", "term_first", "gap_code", "gap_off",
+               "gaps8", "gaps16", "gaps32", "tf", "doc_len",
+               "blk_ptr", "blk_first", "blk_last", "blk_max")
@@ -0,0 +1,49 @@
+"""
+Materialized Feed Recommender for BookRS
+----------------------------------------
+Serves the per-user home feed precomputed by
+`python -m backend.scripts.build_user_feeds`: one primary-key lookup on
+user_feeds plus one book_id IN (...) lookup for titles / authors.
+Returns an empty frame for users without a feed (new or non-ALS users) so
+callers can fall back to the hybrid / popularity models.
+"""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from backend.core.db_utils import ENGINE
+from backend.core.metrics import stage, record_cache
+
+COLUMNS = ["book_id", "title", "authors", "feed_score"]
+
+
+class FeedRecommender:
+    def __init__(self, engine=ENGINE):
+        self.engine = engine
+
+    def feed(self, user_id: int):
+        """(book_ids, scores) best first, or None when the user has no feed."""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(text("SELECT book_ids, scores FROM user_feeds WHERE user_id = :uid"),
+                                   {"uid": int(user_id)}).first()
+        except OperationalError:   # table not built yet
+            row = None
+        record_cache("user_feed", row is not None)
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.int32), np.frombuffer(row[1], dtype=np.float32)
+
+    def recommend(self, user_id: int, top_k: int = 10):
+        with stage("feed_lookup"):
+            found = self.feed(user_id)
+        if found is None or len(found[0]) == 0:
+            return pd.DataFrame(columns=COLUMNS)
+        book_ids, scores = found[0][:top_k], found[1][:top_k]
+        with stage("metadata"):
+            ids = ",".join(str(int(b)) for b in book_ids)
+            meta = pd.read_sql(f"SELECT book_id, title, authors FROM books WHERE book_id IN ({ids})", self.engine)
+            out = pd.DataFrame({"book_id": book_ids.astype(int), "feed_score": np.round(scores, 4)})
+            out = out.merge(meta, on="book_id", how="inner")   # keeps feed order; drops deleted books
+        return out[COLUMNS]
@@ -55,21 +55,24 @@ import pandas as pd
 import pickle, os
 from scipy.spatial.distance import cosine
 from backend.ml.recommender_semantic import SemanticRecommender
-from backend.core.config import ART_DIR
+from backend.ml.recommender_bm25 import BM25Index
+from backend.ml.filters import BookFilters, load_filter_attributes
+from backend.core.config import ART_DIR, BM25_DIR, HYBRID_BM25_CANDIDATES, LEXICAL_WEIGHT
+from backend.core.metrics import stage
 
 class HybridRecommender:
-    def __init__(self):
+    def __init__(self, art_dir=ART_DIR, semantic_model=None):
         print("[INFO] Initializing Hybrid Recommender (Semantic + CF) ...")
-        self.semantic = SemanticRecommender()
+        self.semantic = SemanticRecommender(art_dir=art_dir, model=semantic_model)
 
         # Load ALS artifacts
-        self.user_factors = np.load(os.path.join(ART_DIR, "als_user_factors.npz"))["data"]
-        self.item_factors = np.load(os.path.join(ART_DIR, "als_item_factors.npz"))["data"]
+        self.user_factors = np.load(os.path.join(art_dir, "als_user_factors.npz"))["data"]
+        self.item_factors = np.load(os.path.join(art_dir, "als_item_factors.npz"))["data"]
 
         # Load mapping dictionaries
-        with open(os.path.join(ART_DIR, "als_uid_map.pkl"), "rb") as f:
+        with open(os.path.join(art_dir, "als_uid_map.pkl"), "rb") as f:
             self.uid_map = pickle.load(f)
-        with open(os.path.join(ART_DIR, "als_iid_map.pkl"), "rb") as f:
+        with open(os.path.join(art_dir, "als_iid_map.pkl"), "rb") as f:
             self.iid_map = pickle.load(f)
 
         # Also build reverse map for safety
@@ -78,27 +81,71 @@ class HybridRecommender:
 
         print(f"[OK] ALS model loaded: {len(self.uid_map):,} users, {len(self.iid_map):,} items")
 
-    def recommend(self, query: str, user_id: int = 1, top_k: int = 10):
-        # Step 1 — Semantic matches
-        sem_df = self.semantic.recommend(query, top_k=max(top_k, 50))
+        # Optional lexical candidate source (exact title / author matches)
+        bm25_dir = os.path.join(art_dir, os.path.basename(BM25_DIR))
+        self.lexical = BM25Index.load(bm25_dir) if HYBRID_BM25_CANDIDATES > 0 else None
+
+        # Filter indexes (rating / author / cover), one per candidate source's row order
+        attrs = load_filter_attributes()
+        self.filters = BookFilters(self.semantic.meta["book_id"], attrs)
+        self.lexical_filters = BookFilters(self.lexical.meta["book_id"], attrs) if self.lexical is not None else None
+
+    def _add_lexical_candidates(self, query: str, sem_df: pd.DataFrame, mask=None) -> pd.DataFrame:
+        """Union BM25 hits into the semantic pool; missing ones get an exact semantic score."""
+        lex = self.lexical.recommend(query, top_k=HYBRID_BM25_CANDIDATES, mask=mask)
+        if lex.empty:
+            sem_df["lexical_score"] = 0.0
+            return sem_df
+        lex["lexical_score"] = lex["bm25_score"] / lex["bm25_score"].max()
+        missing = lex[~lex["book_id"].isin(sem_df["book_id"])]
+        if len(missing):
+            extra = missing[["book_id", "title", "authors"]].copy()
+            extra["semantic_score"] = self.semantic.score_books(query, extra["book_id"]).round(4)
+            sem_df = pd.concat([sem_df, extra], ignore_index=True)
+        sem_df = sem_df.merge(lex[["book_id", "lexical_score"]], on="book_id", how="left")
+        sem_df["lexical_score"] = sem_df["lexical_score"].fillna(0.0)
+        return sem_df
+
+    def recommend(self, query: str, user_id: int = 1, top_k: int = 10,
+                  min_rating: float = None, author: str = None, has_cover: bool = None):
+        # Step 0 — Filters become row masks applied inside each candidate scan
+        filters = dict(min_rating=min_rating, author=author, has_cover=has_cover)
+        with stage("filter_mask"):
+            sem_mask = self.filters.mask(**filters)
+            lex_mask = self.lexical_filters.mask(**filters) if self.lexical is not None else None
+
+        # Step 1 — Semantic matches (main index + runtime-added books)
+        sem_df = self.semantic.recommend(query, top_k=max(top_k, 50), mask=sem_mask, filters=filters)
+        if self.lexical is not None and query and query.strip():
+            sem_df = self._add_lexical_candidates(query, sem_df, mask=lex_mask)
 
         # Step 2 — Collaborative personalization
-        sem_df["cf_score"] = 0.0
-        if user_id in self.uid_map:
-            uidx = self.uid_map[user_id]
-            user_vec = self.user_factors[uidx]
-
-            for i, row in sem_df.iterrows():
-                book_id = int(row["book_id"])
-                if book_id in self.iid_map:
-                    iidx = self.iid_map[book_id]
-                    item_vec = self.item_factors[iidx]
-                    sim = 1 - cosine(user_vec, item_vec)
-                    sem_df.at[i, "cf_score"] = sim if not np.isnan(sim) else 0
-        else:
-            print(f"[WARN] User {user_id} not found in ALS model — using semantic only.")
+        with stage("cf_gather"):
+            sem_df["cf_score"] = 0.0
+            if user_id in self.uid_map:
+                uidx = self.uid_map[user_id]
+                user_vec = self.user_factors[uidx]
+
+                for i, row in sem_df.iterrows():
+                    book_id = int(row["book_id"])
+                    if book_id in self.iid_map:
+                        iidx = self.iid_map[book_id]
+                        item_vec = self.item_factors[iidx]
+                        sim = 1 - cosine(user_vec, item_vec)
+                        sem_df.at[i, "cf_score"] = sim if not np.isnan(sim) else 0
+            else:
+                print(f"[WARN] User {user_id} not found in ALS model — using semantic only.")
 
         # Step 3 — Weighted fusion
-        sem_df["hybrid_score"] = 0.7 * sem_df["semantic_score"] + 0.3 * sem_df["cf_score"]
+        with stage("fusion"):
+            sem_df["hybrid_score"] = 0.7 * sem_df["semantic_score"] + 0.3 * sem_df["cf_score"]
+            if LEXICAL_WEIGHT and "lexical_score" in sem_df:
+                sem_df["hybrid_score"] += LEXICAL_WEIGHT * sem_df["lexical_score"]
+            return sem_df.sort_values("hybrid_score", ascending=False).reset_index(drop=True).head(top_k)
+
+    @property
+    def delta_version(self):
+        return self.semantic.delta_version
 
-        return sem_df.sort_values("hybrid_score", ascending=False).reset_index(drop=True).head(top_k)
+    def close(self):
+        self.semantic.close()
@@ -9,6 +9,7 @@ Now fully integrated with the BookRS database.
 
 import pandas as pd
 from backend.core.db_utils import load_books, load_ratings
+from backend.core.ratings_snapshot import read_ratings
 
 
 class PopularityRecommender:
@@ -17,7 +18,11 @@ class PopularityRecommender:
 
         # Load books and ratings from DB
         books = load_books(columns=["book_id", "title", "authors"])
-        ratings = load_ratings()
+        # Serving processes only read the snapshot (offline jobs keep it in sync)
+        try:
+            ratings = read_ratings(["book_id", "rating"], sync_first=False)
+        except FileNotFoundError:
+            ratings = load_ratings()
 
         # Rename for consistency
         books = books.rename(columns={"id": "book_id"})
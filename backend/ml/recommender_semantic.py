@@ -1,30 +1,183 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
 import torch
 import pandas as pd
 from sentence_transformers import SentenceTransformer, util
-from backend.core.config import EMB_PATH, EMB_META
+from backend.core.config import ART_DIR, QUERY_CACHE_SIZE, SEARCH_SHARDS
+from backend.ml.embedding_store import load_embeddings
+from backend.ml.sharded_search import ShardedIndex
+from backend.ml.filters import BookFilters
+from backend.core.metrics import stage, record_cache
+
+RESULT_COLUMNS = ["book_id", "title", "authors", "semantic_score"]
+
+
+class DeltaSegment:
+    """
+    Books embedded at runtime (backend.ml.embedding_worker), searched next to
+    the main index until the next published version contains them.
+    Immutable: add_books() swaps in an extended copy, so a request keeps a
+    consistent snapshot while the worker appends.
+    """
+
+    def __init__(self, emb, meta: pd.DataFrame, attrs: pd.DataFrame):
+        self.emb, self.meta, self.attrs = emb, meta.reset_index(drop=True), attrs.reset_index(drop=True)
+        self.row_index = pd.Index(self.meta["book_id"].astype(int))
+        self.filters = BookFilters(self.meta["book_id"], self.attrs)
+
+    @classmethod
+    def empty(cls, dim, device):
+        return cls(torch.zeros((0, dim), device=device),
+                   pd.DataFrame({"book_id": pd.Series(dtype=int), "title": [], "authors": []}),
+                   pd.DataFrame(columns=["book_id", "authors", "avg_rating", "image_url"]))
+
+    def __len__(self):
+        return len(self.meta)
+
+    def extended(self, vectors, meta: pd.DataFrame, attrs: pd.DataFrame):
+        emb = torch.cat([self.emb, torch.as_tensor(vectors, dtype=self.emb.dtype, device=self.emb.device)])
+        return DeltaSegment(emb, pd.concat([self.meta, meta[["book_id", "title", "authors"]]], ignore_index=True),
+                            pd.concat([self.attrs, attrs], ignore_index=True))
+
+    def subset(self, keep: np.ndarray):
+        rows = np.flatnonzero(keep)
+        return DeltaSegment(self.emb[torch.as_tensor(rows, device=self.emb.device)],
+                            self.meta.iloc[rows], self.attrs.iloc[rows])
 
 
 class SemanticRecommender:
-    def __init__(self):
+    def __init__(self, art_dir=ART_DIR, model=None):
         print("[INFO] Loading semantic model and embeddings...")
         # force CPU for consistency
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = SentenceTransformer("all-MiniLM-L6-v2", device=str(self.device))
-        self.emb = torch.load(EMB_PATH, map_location=self.device).to(self.device)
-
-        self.meta = pd.read_parquet(EMB_META)
+        # An already-loaded encoder can be passed in (hot reload only swaps embeddings)
+        self.model = model or SentenceTransformer("all-MiniLM-L6-v2", device=str(self.device))
+        # Sharded embedding store if built, else the legacy .pt + parquet pair
+        emb, self.meta = load_embeddings(art_dir)
+        # Scatter-gather over SEARCH_SHARDS worker processes (CPU only)
+        self.sharded = None
+        if SEARCH_SHARDS > 1 and self.device.type == "cpu":
+            self.sharded = ShardedIndex(emb, SEARCH_SHARDS)
+            emb = self.sharded.matrix          # share the normalized copy instead of holding two
+        self.emb = torch.from_numpy(emb).to(self.device)
+        self.row_index = pd.Index(self.meta["book_id"].astype(int))
         print(f"[OK] Loaded {len(self.meta):,} book embeddings on {self.device}.")
 
-    def recommend(self, query: str, top_k: int = 10):
-        if not query or not query.strip():
-            return pd.DataFrame(columns=["book_id", "title", "authors", "semantic_score"])
+        # Runtime-added books (EmbeddingWorker); replaced wholesale on append
+        self.delta = DeltaSegment.empty(self.emb.shape[1], self.device)
+        self._delta_lock = threading.Lock()
+        self.delta_version = (0, None)     # (appends, time of the last one) for HTTP validators
+
+        # Small LRU of query embeddings (trending queries skip the encoder)
+        self._query_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def encode_query(self, query: str):
+        """Encode a query, reusing the cached vector for repeated queries."""
+        if QUERY_CACHE_SIZE > 0:
+            with self._cache_lock:
+                q = self._query_cache.get(query)
+                if q is not None:
+                    self._query_cache.move_to_end(query)
+            record_cache("query_embedding", q is not None)
+            if q is not None:
+                return q
         q = self.model.encode(query, convert_to_tensor=True, device=str(self.device))
-        scores = util.pytorch_cos_sim(q, self.emb)[0]
-        topk = torch.topk(scores, k=min(top_k, len(self.meta)))
-        idx = topk.indices.cpu().numpy()
-        sc = topk.values.cpu().numpy()
+        if QUERY_CACHE_SIZE > 0:
+            with self._cache_lock:
+                self._query_cache[query] = q
+                if len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        return q
+
+    # -------------------------------------------------------------------
+    # Runtime additions
+    # -------------------------------------------------------------------
+    def add_books(self, meta: pd.DataFrame, vectors: np.ndarray, attrs: pd.DataFrame):
+        """Make new books searchable: append to the delta segment (no reload)."""
+        with self._delta_lock:
+            fresh = ~meta["book_id"].astype(int).isin(self.row_index) & \
+                    ~meta["book_id"].astype(int).isin(self.delta.row_index)
+            if fresh.any():
+                keep = fresh.to_numpy()
+                self.delta = self.delta.extended(np.asarray(vectors)[keep], meta[keep],
+                                                 attrs[attrs["book_id"].isin(meta["book_id"][keep])])
+                self.delta_version = (self.delta_version[0] + 1, time.time())
+        return int(fresh.sum())
+
+    def carry_delta(self, delta: DeltaSegment):
+        """Keep a previous version's runtime books that this version does not contain yet."""
+        keep = ~delta.row_index.isin(self.row_index)
+        if keep.any() and delta.emb.shape[1] == self.emb.shape[1]:
+            with self._delta_lock:
+                moved = delta.subset(keep)
+                self.delta = DeltaSegment(moved.emb.to(self.device), moved.meta, moved.attrs)
+
+    def known_ids(self) -> pd.Index:
+        return self.row_index.append(self.delta.row_index)
+
+    def close(self):
+        """Stop the shard workers and release the shared matrix."""
+        if self.sharded is not None:
+            self.sharded.close()
+
+    def score_books(self, query: str, book_ids) -> np.ndarray:
+        """Cosine similarity of the query to specific books (0 for unknown ids)."""
+        book_ids = np.asarray(book_ids, dtype=int)
+        out = np.zeros(len(book_ids), dtype=np.float32)
+        delta = self.delta
+        for index, emb in ((self.row_index, self.emb), (delta.row_index, delta.emb)):
+            rows = index.get_indexer(book_ids)
+            known = rows >= 0
+            if known.any():
+                q = self.encode_query(query)
+                idx = torch.as_tensor(rows[known], device=emb.device)
+                out[known] = util.pytorch_cos_sim(q, emb[idx])[0].cpu().numpy()
+        return out
+
+    def _search_delta(self, delta: DeltaSegment, q, top_k: int, filters=None) -> pd.DataFrame:
+        with stage("delta_scan"):
+            mask = delta.filters.mask(**filters) if filters else None
+            scores = util.pytorch_cos_sim(q, delta.emb)[0]
+            if mask is not None:
+                scores[torch.from_numpy(~mask).to(scores.device)] = float("-inf")
+            topk = torch.topk(scores, k=min(top_k, len(delta)))
+            idx, sc = topk.indices.cpu().numpy(), topk.values.cpu().numpy()
+            keep = np.isfinite(sc)
+            out = delta.meta.iloc[idx[keep]][["book_id", "title", "authors"]].copy()
+            out["semantic_score"] = sc[keep].round(4)
+        return out
+
+    def recommend(self, query: str, top_k: int = 10, mask=None, filters=None):
+        """
+        Top-k books by cosine; mask = optional boolean row filter applied in the
+        scan. Runtime-added rows (self.delta) are filtered by `filters`
+        (min_rating / author / has_cover), matched against their own snapshot.
+        """
+        if not query or not query.strip():
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        delta = self.delta
+        with stage("encode"):
+            q = self.encode_query(query)
+        if self.sharded is not None:
+            idx, sc = self.sharded.search(q.cpu().numpy(), top_k, mask)
+        else:
+            with stage("similarity"):
+                scores = util.pytorch_cos_sim(q, self.emb)[0]
+                if mask is not None:
+                    scores[torch.from_numpy(~mask).to(scores.device)] = float("-inf")
+            with stage("topk"):
+                topk = torch.topk(scores, k=min(top_k, len(self.meta)))
+                idx = topk.indices.cpu().numpy()
+                sc = topk.values.cpu().numpy()
+        if mask is not None:
+            keep = np.isfinite(sc)                 # fewer matches than top_k
+            idx, sc = idx[keep], sc[keep]
 
-        out = self.meta.iloc[idx][["book_id", "title", "authors"]].copy()
+        with stage("metadata"):
+            out = self.meta.iloc[idx][["book_id", "title", "authors"]].copy()
 
         # cols = [c for c in ["book_id", "id", "title", "authors"] if c in self.meta.columns]
         # out = self.meta.iloc[idx][cols].copy()
@@ -32,4 +185,7 @@ class SemanticRecommender:
         #     out = out.rename(columns={"id": "book_id"})
 
         out["semantic_score"] = sc.round(4)
+        if len(delta):
+            out = pd.concat([out, self._search_delta(delta, q, top_k, filters)], ignore_index=True)
+            out = out.sort_values("semantic_score", ascending=False, kind="stable").head(top_k)
         return out.reset_index(drop=True)
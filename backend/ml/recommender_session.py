@@ -0,0 +1,98 @@
+"""
+Session Recommender (Item Co-occurrence) for BookRS
+---------------------------------------------------
+Recommends from the books viewed in the current session — no user id, no
+user factors. Reads the item-item graph written by
+`python -m backend.scripts.build_cooccurrence`:
+
+ - cooccur/book_ids.npy   int32 (N,)   sorted book ids (rows)
+ - cooccur/indptr.npy     int64 (N+1,) CSR row pointers
+ - cooccur/indices.npy    int32        neighbour rows, best first per row
+ - cooccur/data.npy       float32      co-occurrence cosine
+ - cooccur/manifest.json  top_m, min_count, users, ...
+
+Scoring a session: the neighbour rows of the session books (at most top_m
+each) are concatenated, weighted by recency (the last book viewed counts
+most) and summed per neighbour — a few hundred numbers, so it takes
+microseconds. Books already in the session are excluded.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from backend.core.config import COOCCUR_DIR
+from backend.core.db_utils import ENGINE
+from backend.core.metrics import stage
+
+SESSION_DECAY = 0.85   # weight of a view relative to the next one
+COLUMNS = ["book_id", "title", "authors", "session_score"]
+ARRAYS = ("book_ids", "indptr", "indices", "data")
+
+
+class SessionRecommender:
+    def __init__(self, book_ids, indptr, indices, data, manifest, engine=ENGINE):
+        self.book_ids, self.indptr, self.indices, self.data = book_ids, indptr, indices, data
+        self.manifest = manifest
+        self.engine = engine
+
+    @staticmethod
+    def save(art_dir, book_ids, indptr, indices, data, manifest):
+        os.makedirs(art_dir, exist_ok=True)
+        dtypes = {"book_ids": np.int32, "indptr": np.int64, "indices": np.int32, "data": np.float32}
+        for name, arr in zip(ARRAYS, (book_ids, indptr, indices, data)):
+            np.save(os.path.join(art_dir, f"{name}.npy"), np.asarray(arr, dtype=dtypes[name]))
+        with open(os.path.join(art_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, art_dir=COOCCUR_DIR):
+        """Load the persisted graph into memory (small: ~8 bytes per edge), or None when absent."""
+        manifest_path = os.path.join(art_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        arrays = [np.load(os.path.join(art_dir, f"{n}.npy")) for n in ARRAYS]
+        print(f"[OK] Co-occurrence graph: {len(arrays[0]):,} books, {len(arrays[2]):,} edges "
+              f"(top-{manifest['top_m']}).")
+        return cls(*arrays, manifest)
+
+    def score(self, session_book_ids, top_k: int = 10):
+        """(book ids, scores) best first for a session (oldest → newest view)."""
+        ids = np.asarray(session_book_ids, dtype=np.int64)
+        rows = np.searchsorted(self.book_ids, ids)
+        rows = np.minimum(rows, len(self.book_ids) - 1)
+        known = self.book_ids[rows] == ids
+        weights = SESSION_DECAY ** np.arange(len(ids) - 1, -1, -1, dtype=np.float32)
+        rows, weights = rows[known], weights[known]
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        starts, stops = self.indptr[rows], self.indptr[rows + 1]
+        nbrs = np.concatenate([self.indices[a:b] for a, b in zip(starts, stops)])
+        vals = np.concatenate([self.data[a:b] * w for a, b, w in zip(starts, stops, weights)])
+        cand, inverse = np.unique(nbrs, return_inverse=True)
+        if len(cand) == 0:                                    # only neighbourless books
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        totals = np.bincount(inverse, weights=vals).astype(np.float32)
+        pos = np.minimum(np.searchsorted(cand, rows), len(cand) - 1)
+        totals[pos[cand[pos] == rows]] = -np.inf              # already viewed
+        k = min(top_k, int(np.isfinite(totals).sum()))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-totals, k - 1)[:k] if len(totals) > k else np.arange(len(totals))
+        top = top[np.lexsort((cand[top], -totals[top]))][:k]
+        return self.book_ids[cand[top]].astype(np.int64), totals[top]
+
+    def recommend(self, session_book_ids, top_k: int = 10):
+        with stage("session_score"):
+            book_ids, scores = self.score(session_book_ids, top_k)
+        if len(book_ids) == 0:
+            return pd.DataFrame(columns=COLUMNS)
+        with stage("metadata"):
+            ids = ",".join(str(int(b)) for b in book_ids)
+            meta = pd.read_sql(f"SELECT book_id, title, authors FROM books WHERE book_id IN ({ids})", self.engine)
+            out = pd.DataFrame({"book_id": book_ids, "session_score": np.round(scores, 4)})
+            out = out.merge(meta, on="book_id", how="inner")   # keeps score order; drops deleted books
+        return out[COLUMNS]
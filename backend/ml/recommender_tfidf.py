@@ -4,16 +4,36 @@ TF-IDF Based Recommender for BookRS
 Uses keyword frequency (TF-IDF) to compute similarity
 between books based on title, authors, and description.
 Now fully integrated with the SQLite database.
+
+The fitted vectorizer and the L2-normalized TF-IDF matrix are persisted
+(build with `python -m backend.scripts.build_tfidf`) and memory-mapped on
+load, so construction no longer refits over the whole books table. The
+matrix is stored term-major (vocab x books CSR, i.e. an inverted index):
+a query only touches the rows of its own terms, and because both sides are
+L2-normalized the sparse dot product *is* the cosine similarity. Top-k uses
+argpartition over the matching books only.
 """
 
+import os
+import json
+import pickle
+import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from backend.core.db_utils import load_books
+from backend.core.config import TFIDF_DIR
+from backend.core.metrics import stage
+
+COLUMNS = ["book_id", "title", "authors", "tfidf_score"]
 
 
 class TFIDFRecommender:
-    def __init__(self, max_features=5000):
+    def __init__(self, max_features=5000, art_dir=TFIDF_DIR):
+        if os.path.exists(os.path.join(art_dir, "manifest.json")):
+            self._load(art_dir)
+            return
+
         print("[INFO] Loading books data from database for TF-IDF model ...")
         # Load only relevant columns from DB
         self.df = load_books(columns=["book_id", "title", "authors", "description"])
@@ -27,19 +47,73 @@ class TFIDFRecommender:
         )
 
         print("[INFO] Building TF-IDF matrix ...")
-        self.vectorizer = TfidfVectorizer(stop_words="english", max_features=max_features)
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.df["combined_text"])
-        print(f"[OK] TF-IDF model trained with {self.tfidf_matrix.shape[1]} features.")
+        self.vectorizer = TfidfVectorizer(stop_words="english", max_features=max_features, dtype=np.float32)
+        tfidf_matrix = self.vectorizer.fit_transform(self.df["combined_text"])
+        self.term_docs = tfidf_matrix.T.tocsr()      # (vocab x books)
+        self.df = self.df[["book_id", "title", "authors"]].reset_index(drop=True)
+        print(f"[OK] TF-IDF model trained with {tfidf_matrix.shape[1]} features.")
+
+    # -------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------
+    def save(self, art_dir=TFIDF_DIR):
+        """Write vectorizer + term-major CSR arrays + book metadata."""
+        os.makedirs(art_dir, exist_ok=True)
+        vec = self.vectorizer
+        if hasattr(vec, "stop_words_"):
+            del vec.stop_words_  # only needed for introspection; can be large
+        with open(os.path.join(art_dir, "vectorizer.pkl"), "wb") as f:
+            pickle.dump(vec, f)
+        m = self.term_docs
+        np.save(os.path.join(art_dir, "data.npy"), m.data.astype(np.float32))
+        np.save(os.path.join(art_dir, "indices.npy"), m.indices.astype(np.int32))
+        np.save(os.path.join(art_dir, "indptr.npy"), m.indptr.astype(np.int64))
+        self.df.to_parquet(os.path.join(art_dir, "meta.parquet"), index=False)
+        with open(os.path.join(art_dir, "manifest.json"), "w") as f:
+            json.dump({"n_books": int(m.shape[1]), "n_terms": int(m.shape[0]), "nnz": int(m.nnz)}, f)
+
+    def _load(self, art_dir):
+        print(f"[INFO] Loading persisted TF-IDF index from {art_dir} ...")
+        with open(os.path.join(art_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        with open(os.path.join(art_dir, "vectorizer.pkl"), "rb") as f:
+            self.vectorizer = pickle.load(f)
+        arrays = [np.load(os.path.join(art_dir, f"{n}.npy"), mmap_mode="r") for n in ("data", "indices", "indptr")]
+        self.term_docs = csr_matrix(tuple(arrays), shape=(manifest["n_terms"], manifest["n_books"]), copy=False)
+        self.df = pd.read_parquet(os.path.join(art_dir, "meta.parquet"))
+        print(f"[OK] TF-IDF index: {manifest['n_books']:,} books, {manifest['n_terms']:,} terms (mmap).")
+
+    # -------------------------------------------------------------------
+    # Scoring
+    # -------------------------------------------------------------------
+    def _topk(self, row, top_k):
+        """Top-k (indices, scores) from one sparse score row."""
+        idx, sc = row.indices, row.data
+        if len(sc) > top_k:
+            part = np.argpartition(-sc, top_k - 1)[:top_k]
+            idx, sc = idx[part], sc[part]
+        order = np.argsort(-sc, kind="stable")
+        return idx[order], sc[order]
+
+    def recommend_batch(self, queries, top_k: int = 10):
+        """Return one result frame per query (only books sharing a term)."""
+        queries = [q if q and q.strip() else "" for q in queries]
+        with stage("tfidf_encode"):
+            q_vecs = self.vectorizer.transform(queries)        # (n_q x vocab), L2-normalized
+        with stage("tfidf_scan"):
+            scores = (q_vecs @ self.term_docs).tocsr()          # (n_q x books) cosine
+        results = []
+        for i in range(len(queries)):
+            with stage("topk"):
+                idx, sc = self._topk(scores.getrow(i), top_k)
+            with stage("metadata"):
+                out = self.df.iloc[idx][["book_id", "title", "authors"]].copy()
+                out["tfidf_score"] = np.round(sc, 4)
+            results.append(out.reset_index(drop=True))
+        return results
 
     def recommend(self, query: str, top_k: int = 10):
         """Return top_k similar books for a given query."""
         if not query or not query.strip():
-            return pd.DataFrame(columns=["book_id", "title", "authors", "tfidf_score"])
-
-        query_vec = self.vectorizer.transform([query])
-        sim_scores = cosine_similarity(query_vec, self.tfidf_matrix).flatten()
-        top_indices = sim_scores.argsort()[-top_k:][::-1]
-
-        results = self.df.iloc[top_indices][["book_id", "title", "authors"]].copy()
-        results["tfidf_score"] = sim_scores[top_indices].round(4)
-        return results.reset_index(drop=True)
+            return pd.DataFrame(columns=COLUMNS)
+        return self.recommend_batch([query], top_k=top_k)[0]
@@ -0,0 +1,187 @@
+"""
+Hot-reloadable Model Registry for BookRS
+----------------------------------------
+Holds the serving models and swaps them when a new artifact version is
+published (see backend.core.artifacts):
+
+    MODELS.register("hybrid", load_hybrid)   # loads from current_dir()
+    MODELS.get("hybrid").recommend(...)      # per request
+    MODELS.reload()                          # /admin/reload or the watcher
+
+A reload builds every model from the new version *alongside* the old ones
+(without holding the swap lock), then replaces the name → model dict in one
+assignment. Requests already running keep the object they fetched and
+finish on the old version; nothing waits on the load. A failed load keeps
+the old models and is not retried until CURRENT moves again. Retired models
+that hold resources (close(): shard worker pools, shared memory) are closed
+RETIRE_GRACE_SECONDS after the swap, once in-flight requests are done.
+
+Loaders receive the previous instance so expensive, version-independent
+pieces (the SentenceTransformer encoder) are reused across reloads.
+"""
+
+import os
+import time
+import threading
+
+from backend.core.artifacts import current_version, current_dir
+from backend.core.config import ARTIFACT_POLL_SECONDS, TFIDF_DIR, SIMILAR_DIR, COOCCUR_DIR
+from backend.core.metrics import REGISTRY
+
+RETIRE_GRACE_SECONDS = 30.0   # in-flight requests finish on retired models before close()
+RELOADS_TOTAL = REGISTRY.counter("bookrs_artifact_reloads_total", "Artifact hot reloads by result", ("result",))
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._swap_lock = threading.Lock()     # guards the dict swap
+        self._reload_lock = threading.Lock()   # one load at a time
+        self.version = None
+        self.art_dir = None
+        self.loaded_at = None
+        self._failed_version = None
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def register(self, name, loader):
+        """Add a model; loader(art_dir, previous) is called now and on every reload."""
+        with self._reload_lock:
+            if self.art_dir is None:
+                self.version, self.art_dir, self.loaded_at = current_version(), current_dir(), time.time()
+            model = loader(self.art_dir, None)
+            with self._swap_lock:
+                self._loaders[name] = loader
+                self._models = {**self._models, name: model}
+        return model
+
+    def get(self, name):
+        return self._models[name]
+
+    def items(self):
+        return list(self._models.items())
+
+    def status(self):
+        return {
+            "loaded_version": self.version,
+            "current_version": current_version(),
+            "art_dir": self.art_dir,
+            "loaded_at": self.loaded_at,
+            "models": sorted(self._models),
+            "watcher": self._watcher is not None and self._watcher.is_alive(),
+        }
+
+    def reload(self, force: bool = False):
+        """Load the CURRENT version next to the live one and swap it in."""
+        with self._reload_lock:
+            version = current_version()
+            if version == self.version and not force:
+                return {**self.status(), "reloaded": False}
+            art_dir = current_dir()
+            print(f"[INFO] Loading artifacts {version or art_dir} ...")
+            t0 = time.perf_counter()
+            try:
+                new = {name: loader(art_dir, self._models.get(name)) for name, loader in self._loaders.items()}
+            except Exception as e:
+                self._failed_version = version
+                RELOADS_TOTAL.inc("error")
+                print(f"[WARN] Reload of {version} failed, keeping {self.version}: {e}")
+                raise
+            with self._swap_lock:
+                old, self._models = self._models, new
+                self.version, self.art_dir, self.loaded_at = version, art_dir, time.time()
+            self._retire(old.values(), RETIRE_GRACE_SECONDS)
+            self._failed_version = None
+            RELOADS_TOTAL.inc("ok")
+            print(f"[OK] Swapped in artifacts {version} in {time.perf_counter() - t0:.1f}s")
+            return {**self.status(), "reloaded": True, "seconds": round(time.perf_counter() - t0, 3)}
+
+    @staticmethod
+    def _retire(models, delay=0.0):
+        """close() swapped-out models (after delay seconds, off the caller's thread)."""
+        closable = [m for m in models if callable(getattr(m, "close", None))]
+        if not closable:
+            return
+
+        def close_all():
+            for m in closable:
+                try:
+                    m.close()
+                except Exception as e:
+                    print(f"[WARN] Closing retired {type(m).__name__} failed: {e}")
+
+        if delay <= 0:
+            close_all()
+            return
+        timer = threading.Timer(delay, close_all)
+        timer.daemon = True
+        timer.start()
+
+    def close(self):
+        """Close every live model (process shutdown)."""
+        with self._swap_lock:
+            models, self._models = self._models, {}
+        self._retire(models.values())
+
+    # -------------------------------------------------------------------
+    # Background watcher
+    # -------------------------------------------------------------------
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            version = current_version()
+            if version != self.version and version != self._failed_version:
+                try:
+                    self.reload()
+                except Exception:
+                    pass  # logged in reload(); old models stay live
+
+    def start_watcher(self, interval=ARTIFACT_POLL_SECONDS):
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True, name="artifact-watcher")
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+
+MODELS = ModelRegistry()
+
+
+# -------------------------------------------------------------------
+# Loaders
+# -------------------------------------------------------------------
+def load_hybrid(art_dir, previous=None):
+    from backend.ml.recommender_hybrid import HybridRecommender
+    encoder = previous.semantic.model if previous is not None else None
+    model = HybridRecommender(art_dir=art_dir, semantic_model=encoder)
+    if previous is not None:
+        model.semantic.carry_delta(previous.semantic.delta)   # runtime books not yet in this version
+    return model
+
+
+def load_tfidf(art_dir, previous=None):
+    from backend.ml.recommender_tfidf import TFIDFRecommender
+    return TFIDFRecommender(art_dir=os.path.join(art_dir, os.path.basename(TFIDF_DIR)))
+
+
+def load_similar(art_dir, previous=None):
+    from backend.ml.similar_books import SimilarBooks
+    return SimilarBooks.load(os.path.join(art_dir, os.path.basename(SIMILAR_DIR)))
+
+
+def load_session(art_dir, previous=None):
+    from backend.ml.recommender_session import SessionRecommender
+    return SessionRecommender.load(os.path.join(art_dir, os.path.basename(COOCCUR_DIR)))
+
+
+def load_popular(art_dir, previous=None):
+    from backend.ml.recommender_popularity import PopularityRecommender
+    return PopularityRecommender()
+
+
+def load_suggest(art_dir, previous=None):
+    from backend.ml.suggest import SuggestIndex
+    return SuggestIndex.load(art_dir)
@@ -0,0 +1,149 @@
+"""
+Scatter-gather Semantic Search for BookRS
+-----------------------------------------
+Splits the (normalized) embedding matrix into SEARCH_SHARDS row ranges and
+scans them in parallel worker processes:
+
+ - the matrix lives once in POSIX shared memory; workers attach to it by
+   name (no copy, no pickling of the catalog)
+ - a query is scattered as one task per shard; each worker returns its
+   local top-k, and the parent merges them
+ - ties are broken by (-score, row), both per shard and in the merge, so the
+   result is identical to exact_topk() over the whole matrix in one process
+
+Workers are spawned (not forked) so they never inherit torch / BLAS thread
+state from the serving process. The segment is unlinked as soon as every
+worker has attached, so nothing is left behind in /dev/shm whatever happens
+later; its memory is freed when the last mapping goes away. close() (called
+by the registry once a hot reload retired the model, or by GC as a
+fallback) stops the workers; the parent unmaps its copy only when the matrix
+itself is collected, since SemanticRecommender's torch tensor (and any
+in-flight request) still reads it.
+
+If a worker dies (e.g. the OOM killer) the pool is broken for good: the
+name is already unlinked, so no replacement could attach. search() then
+answers in-process from the parent's matrix until the next reload.
+"""
+
+import weakref
+import numpy as np
+from multiprocessing import get_context, shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.core.metrics import stage
+
+ATTACH_TIMEOUT = 120.0   # seconds for the spawned workers to import and attach
+
+# Per-process view of the shared matrix (set once per worker by _attach)
+_SHARED = {}
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return (x / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _topk_rows(scores: np.ndarray, k: int, offset: int = 0):
+    """Top-k (rows, scores) ordered by (-score, row); exact under ties."""
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        cand = np.flatnonzero(scores >= kth)        # every row that can make the cut
+    else:
+        cand = np.arange(len(scores))
+    order = np.lexsort((cand, -scores[cand]))[:k]
+    rows = cand[order]
+    return rows + offset, scores[rows]
+
+
+def exact_topk(matrix: np.ndarray, q: np.ndarray, k: int, mask=None):
+    """Single-process reference: same kernel over all rows."""
+    scores = matrix @ q
+    if mask is not None:
+        scores[~mask] = -np.inf
+    return _topk_rows(scores, k)
+
+
+def _attach(name, shape, attached=None):
+    shm = shared_memory.SharedMemory(name=name)
+    _SHARED["shm"] = shm
+    _SHARED["matrix"] = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    if attached is not None:
+        attached.wait()          # parent unlinks the name once every worker is here
+
+
+def _search_shard(lo, hi, q, k, mask=None):
+    scores = _SHARED["matrix"][lo:hi] @ q
+    if mask is not None:
+        scores[~mask] = -np.inf
+    return _topk_rows(scores, k, offset=lo)
+
+
+def _unmap(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+class ShardedIndex:
+    def __init__(self, embeddings: np.ndarray, n_shards: int):
+        matrix = _normalize(np.asarray(embeddings))
+        self.shape = matrix.shape
+        self._shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        self.matrix = np.ndarray(self.shape, dtype=np.float32, buffer=self._shm.buf)
+        self.matrix[:] = matrix
+        # Unmapping under a live view segfaults: keep the mapping until the matrix (and the
+        # tensors / slices built on it) are gone
+        weakref.finalize(self.matrix, _unmap, self._shm)
+        bounds = np.linspace(0, self.shape[0], n_shards + 1).astype(int)
+        self.shards = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+        self.broken = False
+        ctx = get_context("spawn")
+        attached = ctx.Barrier(len(self.shards) + 1)
+        self._pool = ProcessPoolExecutor(
+            max_workers=len(self.shards), mp_context=ctx,
+            initializer=_attach, initargs=(self._shm.name, self.shape, attached),
+        )
+        self._finalizer = weakref.finalize(self, self._pool.shutdown, wait=False, cancel_futures=True)
+        warmup = [self._pool.submit(int) for _ in self.shards]   # one worker is spawned per pending task
+        try:
+            attached.wait(ATTACH_TIMEOUT)
+        finally:
+            self._shm.unlink()
+        for f in warmup:
+            f.result()
+        print(f"[OK] Sharded search: {self.shape[0]:,} rows in {len(self.shards)} shards "
+              f"({self.matrix.nbytes / 1e6:,.1f} MB shared).")
+
+    def search(self, q: np.ndarray, k: int, mask=None):
+        """Top-k (rows, cosine scores) for one query vector; mask = boolean row filter."""
+        q = np.asarray(q, dtype=np.float32).ravel()
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        k = min(k, self.shape[0])
+        if self.broken:
+            return exact_topk(self.matrix, q, k, mask)
+        try:
+            with stage("shard_scatter"):
+                futures = [self._pool.submit(_search_shard, lo, hi, q, k, None if mask is None else mask[lo:hi])
+                           for lo, hi in self.shards]
+                parts = [f.result() for f in futures]
+        except BrokenProcessPool as e:
+            if not self.broken:
+                self.broken = True
+                print(f"[WARN] Shard worker pool is broken ({e}); searching in-process until the next reload.")
+            return exact_topk(self.matrix, q, k, mask)
+        with stage("shard_merge"):
+            rows = np.concatenate([p[0] for p in parts])
+            scores = np.concatenate([p[1] for p in parts])
+            order = np.lexsort((rows, -scores))[:k]
+        return rows[order], scores[order]
+
+    def exact(self, q: np.ndarray, k: int, mask=None):
+        """Same query answered in-process (reference for search())."""
+        q = np.asarray(q, dtype=np.float32).ravel()
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        return exact_topk(self.matrix, q, min(k, self.shape[0]), mask)
+
+    def close(self):
+        self._finalizer()
@@ -0,0 +1,56 @@
+"""
+Item-to-item "Similar Books" Graph for BookRS
+---------------------------------------------
+Reads the kNN graph written by `python -m backend.scripts.build_similar`:
+
+ - similar/book_ids.npy    int32 (N,)     sorted book ids (graph rows)
+ - similar/neighbors.npy   int32 (N x K)  neighbour book ids, best first
+ - similar/scores.npy      float16 (N x K) fused similarity
+ - similar/manifest.json   k, weights, sources
+
+Arrays are memory-mapped; a lookup is one searchsorted + two row slices,
+no encoder and no similarity scan.
+"""
+
+import os
+import json
+import numpy as np
+from backend.core.config import SIMILAR_DIR
+
+
+class SimilarBooks:
+    def __init__(self, book_ids, neighbors, scores, manifest):
+        self.book_ids, self.neighbors, self.scores = book_ids, neighbors, scores
+        self.manifest = manifest
+
+    @staticmethod
+    def save(art_dir, book_ids, neighbors, scores, manifest):
+        os.makedirs(art_dir, exist_ok=True)
+        np.save(os.path.join(art_dir, "book_ids.npy"), np.asarray(book_ids, dtype=np.int32))
+        np.save(os.path.join(art_dir, "neighbors.npy"), np.asarray(neighbors, dtype=np.int32))
+        np.save(os.path.join(art_dir, "scores.npy"), np.asarray(scores, dtype=np.float16))
+        with open(os.path.join(art_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, art_dir=SIMILAR_DIR):
+        """Load the persisted graph (memory-mapped), or None when absent."""
+        manifest_path = os.path.join(art_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        arrays = [np.load(os.path.join(art_dir, f"{n}.npy"), mmap_mode="r")
+                  for n in ("book_ids", "neighbors", "scores")]
+        print(f"[OK] Similar-books graph: {len(arrays[0]):,} books x {manifest['k']} neighbours.")
+        return cls(*arrays, manifest)
+
+    def similar(self, book_id: int, top_k: int = 10):
+        """(neighbour book ids, scores) best first, or None for unknown books."""
+        row = int(np.searchsorted(self.book_ids, book_id))
+        if row >= len(self.book_ids) or self.book_ids[row] != book_id:
+            return None
+        ids = np.asarray(self.neighbors[row, :top_k])
+        sc = np.asarray(self.scores[row, :top_k], dtype=np.float32)
+        keep = ids >= 0                                  # padding for tiny catalogs
+        return ids[keep], sc[keep]
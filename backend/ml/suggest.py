@@ -0,0 +1,161 @@
+"""
+Prefix Autocomplete for BookRS
+------------------------------
+Suggest-as-you-type over book titles and authors, answered from memory:
+
+ - keys      normalized text (lower-case, accents stripped, punctuation →
+             space) of every title and author, plus each later word start
+             ("crown journey" for "War Crown Journey"), so mid-title words
+             match too
+ - lookup    keys live in one sorted list; a prefix is the contiguous range
+             [bisect_left(p), bisect_left(p + "\\uffff")) — two binary searches
+ - ranking   every key carries its entry's popularity (popularity.parquet
+             pop_score, avg_rating as tie-break; authors sum their books).
+             Ranges for 1–2 character prefixes can be large, so their top
+             entries are precomputed; longer prefixes select top-k over the
+             (small) range with argpartition
+
+Built from the books table when the registry loads a version, i.e. again
+whenever a new artifact version is published after catalog changes. Books
+added at runtime (POST /books/) are fed in by the embedding worker through
+add_books(): they go to a small delta index (rebuilt per batch) whose
+suggestions are merged with the main ones until the next reload.
+"""
+
+import os
+import re
+import time
+import bisect
+import threading
+import unicodedata
+import numpy as np
+import pandas as pd
+
+from backend.core.config import POPULARITY_PATH
+from backend.core.db_utils import load_books
+
+SHORT_PREFIX = 2        # prefixes up to this length are precomputed
+SHORT_TOP = 50          # entries kept per precomputed prefix
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _word_starts(norm: str):
+    """The normalized string from each word on ("a b c" → "a b c", "b c", "c")."""
+    words = norm.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class SuggestIndex:
+    def __init__(self, books: pd.DataFrame, popularity: pd.DataFrame = None, verbose: bool = True):
+        books = books.drop_duplicates("book_id").reset_index(drop=True)
+        score = pd.to_numeric(books["avg_rating"], errors="coerce").fillna(0).to_numpy(np.float64) / 5 * 0.01
+        if popularity is not None and len(popularity):
+            pop = books["book_id"].map(popularity.set_index("book_id")["pop_score"]).fillna(0)
+            score = score + pop.to_numpy(np.float64)
+
+        # Entries: books first (by row), then distinct authors
+        authors = {}
+        for row, names in enumerate(books["authors"].fillna("").astype(str)):
+            for name in (n.strip() for n in names.split(",")):
+                if name:
+                    entry = authors.setdefault(name.lower(), [name, 0.0])
+                    entry[1] += score[row]
+        n_books = len(books)
+        self.kind = np.array(["title"] * n_books + ["author"] * len(authors))
+        self.text = books["title"].fillna("").astype(str).tolist() + [a[0] for a in authors.values()]
+        self.book_id = np.concatenate([books["book_id"].to_numpy(np.int64), np.full(len(authors), -1)])
+        self.score = np.concatenate([score, np.array([a[1] for a in authors.values()], dtype=np.float64)])
+
+        keys, entries = [], []
+        for e, text in enumerate(self.text):
+            for key in _word_starts(normalize(text)):
+                keys.append(key)
+                entries.append(e)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.entries = np.asarray(entries, dtype=np.int64)[order]
+        self.key_score = self.score[self.entries]
+
+        self.short = {}
+        for prefix in {k[:n] for k in self.keys for n in range(1, SHORT_PREFIX + 1)}:
+            lo, hi = self._range(prefix)
+            self.short[prefix] = self._top_rows(lo, hi, SHORT_TOP)
+
+        # Runtime-added books (EmbeddingWorker); replaced wholesale on append
+        self.delta = None
+        self._delta_books = books.iloc[:0]
+        self._delta_lock = threading.Lock()
+        self.delta_version = (0, None)     # (appends, time of the last one) for HTTP validators
+        if verbose:
+            print(f"[OK] Suggest index: {len(self.keys):,} keys over {n_books:,} titles / {len(authors):,} authors.")
+
+    def add_books(self, books: pd.DataFrame) -> int:
+        """Make new books (book_id, title, authors, avg_rating) suggestible; returns the number added."""
+        with self._delta_lock:
+            known = np.concatenate([self.book_id[self.book_id >= 0], self._delta_books["book_id"].to_numpy(np.int64)])
+            fresh = books[~books["book_id"].isin(known)]
+            if len(fresh) == 0:
+                return 0
+            self._delta_books = pd.concat([self._delta_books, fresh[self._delta_books.columns]], ignore_index=True)
+            self.delta = SuggestIndex(self._delta_books, verbose=False)
+            self.delta_version = (self.delta_version[0] + 1, time.time())
+            return len(fresh)
+
+    def _range(self, prefix):
+        return bisect.bisect_left(self.keys, prefix), bisect.bisect_left(self.keys, prefix + "\uffff")
+
+    def _top_rows(self, lo, hi, k):
+        """Key rows in [lo, hi) by descending score (entries may repeat)."""
+        scores = self.key_score[lo:hi]
+        if len(scores) > k:
+            cand = np.argpartition(-scores, k)[:k]
+        else:
+            cand = np.arange(len(scores))
+        return lo + cand[np.argsort(-scores[cand], kind="stable")]
+
+    def suggest(self, prefix: str, limit: int = 10):
+        """Top suggestions whose title / author (or a later word of it) starts with prefix."""
+        out = self._suggest(prefix, limit)
+        delta = self.delta
+        if delta is None:
+            return out
+        merged, seen = [], set()
+        for item in sorted(out + delta._suggest(prefix, limit), key=lambda i: -i["score"]):
+            key = (item["type"], item.get("book_id"), item["text"].lower())
+            if key not in seen:       # an author in both indexes is listed once
+                seen.add(key)
+                merged.append(item)
+        return merged[:limit]
+
+    def _suggest(self, prefix: str, limit: int):
+        p = normalize(prefix)
+        if not p:
+            return []
+        rows = self.short.get(p)
+        if rows is None or len(p) > SHORT_PREFIX:
+            lo, hi = self._range(p)
+            rows = self._top_rows(lo, hi, limit * 4)     # headroom for duplicate entries
+        out, seen = [], set()
+        for e in self.entries[rows]:
+            if e in seen:
+                continue
+            seen.add(e)
+            item = {"type": str(self.kind[e]), "text": self.text[e], "score": round(float(self.score[e]), 4)}
+            if self.book_id[e] >= 0:
+                item["book_id"] = int(self.book_id[e])
+            out.append(item)
+            if len(out) == limit:
+                break
+        return out
+
+    @classmethod
+    def load(cls, art_dir):
+        books = load_books(columns=["book_id", "title", "authors", "avg_rating"])
+        pop_path = os.path.join(art_dir, os.path.basename(POPULARITY_PATH))
+        popularity = pd.read_parquet(pop_path, columns=["book_id", "pop_score"]) if os.path.exists(pop_path) else None
+        return cls(books, popularity)
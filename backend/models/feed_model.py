@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime
+from datetime import datetime
+from backend.core.database import Base
+
+class UserFeed(Base):
+    __tablename__ = "user_feeds"
+    user_id = Column(Integer, primary_key=True)     # one row per ALS user
+    book_ids = Column(LargeBinary, nullable=False)  # int32 array, best first
+    scores = Column(LargeBinary, nullable=False)    # float32 array, same order
+    model_version = Column(String)
+    built_at = Column(DateTime, default=datetime.utcnow)
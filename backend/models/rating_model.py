@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index
 from datetime import datetime
 from backend.core.database import Base
 
@@ -9,3 +9,8 @@ class Rating(Base):
     book_id = Column(Integer, ForeignKey("books.book_id"))
     rating = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_ratings_user_book", "user_id", "book_id"),
+        Index("ix_ratings_timestamp", "timestamp"),
+    )
@@ -0,0 +1,48 @@
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+from backend.core.config import PROFILE_DIR
+from backend.core.profiling import CONTROLLER, MODES, list_profiles, admin_token_ok
+from backend.core.artifacts import list_versions, read_manifest
+from backend.core.memory import memory_report
+from backend.ml.registry import MODELS
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# Dependency: every admin route needs X-Admin-Token == ADMIN_TOKEN
+def require_admin(x_admin_token: str = Header(None)):
+    if not admin_token_ok(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+@router.get("/profiling", summary="Profiler status and saved profiles", dependencies=[Depends(require_admin)])
+def profiling_status():
+    return {**CONTROLLER.status(), "profiles": list_profiles()}
+
+@router.post("/profiling/arm", summary="Profile the next N /recommend requests", dependencies=[Depends(require_admin)])
+def arm_profiler(n: int = Query(1, ge=0, le=1000), mode: str = Query("cprofile", enum=list(MODES))):
+    CONTROLLER.arm(n, mode)
+    return CONTROLLER.status()
+
+@router.get("/profiling/{name}", summary="Download one profile", dependencies=[Depends(require_admin)])
+def download_profile(name: str):
+    path = os.path.join(PROFILE_DIR, os.path.basename(name))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return FileResponse(path, filename=os.path.basename(path))
+
+@router.get("/artifacts", summary="Loaded / published artifact versions", dependencies=[Depends(require_admin)])
+def artifacts_status():
+    versions = [{k: m[k] for k in ("version", "created", "parent", "note", "changed")}
+                for m in map(read_manifest, list_versions())]
+    return {**MODELS.status(), "versions": versions}
+
+@router.post("/reload", summary="Load the CURRENT artifact version and swap it in", dependencies=[Depends(require_admin)])
+def reload_artifacts(force: bool = False):
+    try:
+        return MODELS.reload(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous version still serving: {e}")
+
+@router.get("/memory", summary="Per-component memory, RSS and shared vs private pages", dependencies=[Depends(require_admin)])
+def memory_status(host_mb: float = Query(None, gt=0, description="Host memory for the worker-density estimate")):
+    return memory_report(host_mb=host_mb)
@@ -1,23 +1,72 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from backend.core.database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.deps import get_async_db
+from backend.core.metrics import stage
 from backend.models.book_model import Book
+from backend.ml.registry import MODELS, load_similar, load_suggest
+from backend.ml.embedding_worker import EMBEDDER
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Precomputed kNN graph (build_similar); None until built
+MODELS.register("similar", load_similar)
+# Prefix autocomplete over titles / authors; rebuilt with every artifact version
+MODELS.register("suggest", load_suggest)
+
+class BookCreate(BaseModel):
+    title: str = Field(..., min_length=1)
+    authors: str = ""
+    description: str = ""
+    avg_rating: float | None = Field(None, ge=0, le=5)
+    image_url: str | None = None
+
+@router.post("/", summary="Add a book (searchable once the embedding worker has encoded it)", status_code=201)
+async def create_book(book: BookCreate, db: AsyncSession = Depends(get_async_db)):
+    new_book = Book(**book.model_dump())
+    db.add(new_book)
+    await db.commit()
+    await db.refresh(new_book)
+    EMBEDDER.submit(new_book.book_id)
+    return {"book_id": new_book.book_id, "title": new_book.title, "searchable": False,
+            "ingestion": EMBEDDER.status()}
+
+@router.get("/ingestion", summary="Embedding worker status and ingestion lag")
+async def ingestion_status():
+    return EMBEDDER.status()
 
 @router.get("/", summary="List all books")
-def list_books(skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
-    books = db.query(Book).offset(skip).limit(limit).all()
+async def list_books(skip: int = 0, limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    books = (await db.scalars(select(Book).offset(skip).limit(limit))).all()
     return books
 
 @router.get("/search", summary="Search books by keyword")
-def search_books(q: str = Query(..., min_length=2), db: Session = Depends(get_db)):
-    results = db.query(Book).filter(Book.title.ilike(f"%{q}%")).limit(10).all()
+async def search_books(q: str = Query(..., min_length=2), db: AsyncSession = Depends(get_async_db)):
+    results = (await db.scalars(select(Book).where(Book.title.ilike(f"%{q}%")).limit(10))).all()
     return {"query": q, "results": results}
+
+@router.get("/suggest", summary="Autocomplete titles and authors by prefix")
+async def suggest_books(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(8, ge=1, le=20)):
+    with stage("suggest_lookup"):
+        suggestions = MODELS.get("suggest").suggest(q, limit)
+    return {"query": q, "suggestions": suggestions}
+
+@router.get("/{book_id}/similar", summary="Books similar to this one (precomputed kNN graph)")
+async def similar_books(book_id: int, top_k: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_async_db)):
+    graph = MODELS.get("similar")
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Similar-books graph not built (run build_similar).")
+    with stage("similar_lookup"):
+        found = graph.similar(book_id, top_k)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Book not in similar-books graph.")
+    ids, scores = found
+    with stage("metadata"):
+        rows = await db.scalars(select(Book).where(Book.book_id.in_(ids.tolist())))
+        books = {b.book_id: b for b in rows}
+    return [
+        {"book_id": int(b), "title": books[b].title, "authors": books[b].authors,
+         "image_url": books[b].image_url, "similarity": round(float(s), 4)}
+        for b, s in zip(ids.tolist(), scores) if b in books
+    ]
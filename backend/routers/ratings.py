@@ -1,34 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.core.database import SessionLocal
+import csv
+import json
+import asyncio
+import threading
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.deps import get_async_db
+from backend.core.rating_buffer import BUFFER
 from backend.models.rating_model import Rating
 
-router = APIRouter(prefix="/ratings", tags=["Ratings"])
+BULK_CHUNK = 1000       # rows parsed before handing off to the buffer
+BULK_MAX_ERRORS = 20    # rejected lines echoed back
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/ratings", tags=["Ratings"])
 
 @router.post("/", summary="Add or update a rating")
-def rate_book(user_id: int, book_id: int, rating: float, db: Session = Depends(get_db)):
+async def rate_book(user_id: int, book_id: int, rating: float):
     if rating < 0 or rating > 5:
         raise HTTPException(status_code=400, detail="Rating must be between 0 and 5.")
-    existing = db.query(Rating).filter(
-        Rating.user_id == user_id, Rating.book_id == book_id
-    ).first()
-    if existing:
-        existing.rating = rating
-        db.commit()
-        return {"message": "Rating updated."}
-    new_rating = Rating(user_id=user_id, book_id=book_id, rating=rating)
-    db.add(new_rating)
-    db.commit()
-    return {"message": "Rating added successfully."}
+    # Batched with other writes by the write-behind buffer
+    fut = await run_in_threadpool(BUFFER.submit, user_id, book_id, rating)   # may block on a full queue
+    if BUFFER.durability == "async":
+        return {"message": "Rating accepted."}
+    try:
+        outcome = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout=30)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Rating could not be saved: {e}")
+    return {"message": "Rating updated." if outcome == "updated" else "Rating added successfully."}
+
+def _parse_line(line: str, fmt: str, header):
+    """(user_id, book_id, rating) from one NDJSON / CSV line; raises ValueError."""
+    if fmt == "ndjson":
+        obj = json.loads(line)
+        u, b, r = obj["user_id"], obj["book_id"], obj["rating"]
+    else:
+        values = next(csv.reader([line]))
+        row = dict(zip(header, values)) if header else dict(zip(("user_id", "book_id", "rating"), values))
+        u, b, r = row["user_id"], row["book_id"], row["rating"]
+    u, b, r = int(u), int(b), float(r)
+    if not 0 <= r <= 5:
+        raise ValueError("rating must be between 0 and 5")
+    return u, b, r
+
+@router.post("/bulk", summary="Stream ratings in (NDJSON or CSV: user_id,book_id,rating)")
+async def bulk_import(request: Request):
+    """
+    The body is parsed as it arrives and handed to the same write-behind
+    buffer as POST /ratings in chunks, so memory stays flat for any size.
+    CSV is detected from Content-Type text/csv; a header row is optional.
+    """
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    header, pending, futures = None, [], []
+    accepted, rejected, errors, line_no = 0, 0, [], 0
+    counts = {"written": 0, "failed": 0}
+    counts_lock = threading.Lock()   # callbacks run on the flusher thread, or inline here if already done
+
+    def on_done(fut):
+        key = "failed" if fut.exception() else "written"
+        with counts_lock:
+            counts[key] += 1
+
+    async def hand_off():
+        nonlocal pending
+        if pending:
+            futs = await run_in_threadpool(BUFFER.submit_many, pending)   # may block on a full queue
+            for f in futs:
+                f.add_done_callback(on_done)
+            futures[:] = futs[-1:]
+            pending = []
+
+    def take(raw: bytes):
+        nonlocal header, accepted, rejected, line_no
+        line_no += 1
+        line = raw.decode("utf-8-sig").strip()
+        if not line:
+            return
+        if fmt == "csv" and line_no == 1 and "user_id" in line:
+            header = [h.strip() for h in next(csv.reader([line]))]
+            return
+        try:
+            pending.append(_parse_line(line, fmt, header))
+            accepted += 1
+        except (ValueError, KeyError, TypeError, StopIteration) as e:
+            rejected += 1
+            if len(errors) < BULK_MAX_ERRORS:
+                errors.append({"line": line_no, "error": str(e)})
+
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for raw in lines:
+            take(raw)
+        if len(pending) >= BULK_CHUNK:
+            await hand_off()
+    if buf:
+        take(buf)
+    await hand_off()
+
+    result = {"format": fmt, "accepted": accepted, "rejected": rejected,
+              "errors": errors, "durability": BUFFER.durability}
+    if futures and BUFFER.durability == "commit":
+        # FIFO flushes: the last row resolving means every earlier batch has resolved
+        try:
+            await asyncio.wrap_future(futures[-1])
+        except Exception:
+            pass
+        result.update(counts)
+    return result
 
 @router.get("/{user_id}", summary="Get all ratings by user")
-def get_user_ratings(user_id: int, db: Session = Depends(get_db)):
-    ratings = db.query(Rating).filter(Rating.user_id == user_id).all()
+async def get_user_ratings(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    ratings = (await db.scalars(select(Rating).where(Rating.user_id == user_id))).all()
     return ratings
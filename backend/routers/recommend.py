@@ -1,23 +1,87 @@
 from fastapi import APIRouter, Query
-from backend.ml.recommender_hybrid import HybridRecommender
+from pydantic import BaseModel, Field
+from backend.ml.registry import MODELS, load_hybrid, load_tfidf, load_popular, load_session
+from backend.ml.recommender_feed import FeedRecommender
 from backend.core.config import TOPK_DEFAULT
+from backend.core.memory import track
+from backend.core.metrics import stage
+from backend.core.profiling import profiled
+from backend.core.singleflight import SingleFlight
 
 router = APIRouter(prefix="/recommend", tags=["Recommendations"])
 
-# Load once at startup
-hybrid = HybridRecommender()
+# Load once at startup; MODELS swaps in new artifact versions (hot reload)
+MODELS.register("hybrid", load_hybrid)
+MODELS.register("tfidf", load_tfidf)
+MODELS.register("popular", load_popular)
+MODELS.register("session", load_session)   # None until build_cooccurrence has run
+feed = FeedRecommender()
+track("feed", feed)
+
+# Identical concurrent hybrid requests share one computation
+hybrid_flight = SingleFlight("recommend_hybrid")
+
+class TFIDFBatchRequest(BaseModel):
+    queries: list[str] = Field(..., min_length=1, max_length=256)
+    top_k: int = TOPK_DEFAULT
 
 @router.get("/hybrid", summary="Hybrid recommendations (semantic + CF + popularity)")
+@profiled("recommend_hybrid")
 def recommend_hybrid(
     query: str = Query(..., min_length=2),
     user_id: int | None = Query(None, description="Known ALS user; fallback if None"),
-    top_k: int = TOPK_DEFAULT
+    top_k: int = TOPK_DEFAULT,
+    min_rating: float | None = Query(None, ge=0, le=5, description="Only books with avg_rating >= this"),
+    author: str | None = Query(None, description="Only books by this author (exact name, case-insensitive)"),
+    has_cover: bool | None = Query(None, description="Only books with (true) / without (false) a cover image"),
 ):
-    df = hybrid.recommend(query=query, user_id=user_id, top_k=top_k)
-    return df.to_dict(orient="records")
-
+    model = MODELS.get("hybrid")
+    filters = dict(min_rating=min_rating, author=author, has_cover=has_cover)
+    # Keyed on the fetched model, not MODELS.version: during a swap the two can disagree
+    key = (id(model), query, user_id, top_k, min_rating, author, has_cover)
+    df = hybrid_flight.do(key, lambda: model.recommend(query=query, user_id=user_id, top_k=top_k, **filters))
+    with stage("serialize"):
+        return df.to_dict(orient="records")
 
+@router.get("/feed", summary="Materialized home feed for a user (hybrid fallback)")
+@profiled("recommend_feed")
+def recommend_feed(user_id: int = Query(..., ge=1), top_k: int = Query(TOPK_DEFAULT, ge=1, le=200)):
+    df = feed.recommend(user_id, top_k=top_k)
+    if df.empty:
+        df = MODELS.get("hybrid").recommend(query="recommended", user_id=user_id, top_k=top_k)
+    with stage("serialize"):
+        return df.to_dict(orient="records")
 
+@router.get("/popular", summary="Most popular books (weighted rating)")
+@profiled("recommend_popular")
+def recommend_popular(top_k: int = Query(TOPK_DEFAULT, ge=1, le=200)):
+    df = MODELS.get("popular").recommend(top_k=top_k)
+    with stage("serialize"):
+        return df.to_dict(orient="records")
 
+@router.get("/session", summary="Recommendations from the books viewed in this session (no user id)")
+@profiled("recommend_session")
+def recommend_session(
+    book_ids: list[int] = Query(..., min_length=1, max_length=100, description="Viewed books, oldest first"),
+    top_k: int = Query(TOPK_DEFAULT, ge=1, le=200),
+):
+    model = MODELS.get("session")
+    df = model.recommend(book_ids, top_k=top_k) if model is not None else None
+    if df is None or df.empty:
+        df = MODELS.get("popular").recommend(top_k=top_k)
+    with stage("serialize"):
+        return df.to_dict(orient="records")
 
+@router.get("/tfidf", summary="Keyword (TF-IDF) recommendations")
+@profiled("recommend_tfidf")
+def recommend_tfidf(query: str = Query(..., min_length=2), top_k: int = TOPK_DEFAULT):
+    df = MODELS.get("tfidf").recommend(query=query, top_k=top_k)
+    with stage("serialize"):
+        return df.to_dict(orient="records")
 
+@router.post("/tfidf/batch", summary="Keyword (TF-IDF) recommendations for many queries")
+@profiled("recommend_tfidf_batch")
+def recommend_tfidf_batch(req: TFIDFBatchRequest):
+    frames = MODELS.get("tfidf").recommend_batch(req.queries, top_k=req.top_k)
+    with stage("serialize"):
+        return [{"query": q, "results": df.to_dict(orient="records")} for q, df in zip(req.queries, frames)]
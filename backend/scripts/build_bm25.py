@@ -0,0 +1,41 @@
+"""
+Build BM25 Inverted Index (Database-driven)
+-------------------------------------------
+Builds the compressed BM25 index over title + authors + description and
+saves it under artifacts/bm25 (memory-mapped by BM25Index.load).
+
+Usage:
+    python -m backend.scripts.build_bm25
+"""
+
+import os
+import time
+import shutil
+from backend.core.db_utils import load_books
+from backend.core.config import BM25_DIR
+from backend.core.artifacts import publish
+from backend.ml.recommender_bm25 import BM25Index
+
+
+def main():
+    print("[INFO] Loading books data from database ...")
+    books = load_books(columns=["book_id", "title", "authors", "description"])
+    print(f"[OK] Loaded {len(books):,} books from DB.")
+
+    t0 = time.perf_counter()
+    index = BM25Index.build(books)
+    print(f"[OK] Index built in {time.perf_counter() - t0:.1f}s "
+          f"({len(index.vocab):,} terms, {int(index.post_ptr[-1]):,} postings).")
+
+    tmp_dir = BM25_DIR + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    index.save(tmp_dir)
+    shutil.rmtree(BM25_DIR, ignore_errors=True)
+    os.replace(tmp_dir, BM25_DIR)
+    print(f"[OK] Saved BM25 index → {BM25_DIR}")
+    publish(note="build_bm25")
+    print("[DONE] BM25 build completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Build the Item Co-occurrence Graph (Session Recommendations)
+------------------------------------------------------------
+Item-item co-occurrence from the ratings: two books co-occur once per
+user who rated both. With X the binary (users x books) matrix,
+
+    C = Xᵀ X          cos(a, b) = C[a, b] / sqrt(n_a * n_b)
+
+C is computed in row blocks of books (sparse Xᵀ[block] @ X), so only one
+block x N slice exists at a time. Each row keeps its top-M neighbours
+(pairs seen fewer than --min-count times are dropped as noise) and the
+result is stored as CSR in artifacts/cooccur (see
+backend.ml.recommender_session), then published as a new artifact version.
+
+Ratings come from the Parquet snapshot (backend.core.ratings_snapshot).
+
+Run:
+  python -m backend.scripts.build_cooccurrence
+  python -m backend.scripts.build_cooccurrence --top-m 100 --min-rating 4
+"""
+
+import os
+import time
+import shutil
+import argparse
+import numpy as np
+
+from backend.core.config import COOCCUR_DIR
+from backend.core.artifacts import publish
+from backend.core.ratings_snapshot import read_ratings
+from backend.ml.evaluation import interactions_csr
+from backend.ml.recommender_session import SessionRecommender
+
+TOP_M = 50
+MIN_COUNT = 2
+BLOCK_SIZE = 2048
+
+
+def prune_block(block, start, counts, top_m, min_count):
+    """Top-M (rows, neighbour cols, cosine) of one C block, self-pairs removed."""
+    coo = block.tocoo()
+    rows, cols, co = coo.row + start, coo.col, coo.data
+    keep = (rows != cols) & (co >= min_count)
+    rows, cols, co = rows[keep], cols[keep], co[keep]
+    cos = (co / np.sqrt(counts[rows] * counts[cols])).astype(np.float32)
+    order = np.lexsort((cols, -cos, rows))              # per row: best first, ties by column
+    rows, cols, cos = rows[order], cols[order], cos[order]
+    first = np.searchsorted(rows, rows, side="left")    # rank within the row
+    keep = (np.arange(len(rows)) - first) < top_m
+    return rows[keep], cols[keep], cos[keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the item co-occurrence graph")
+    parser.add_argument("--top-m", type=int, default=TOP_M, help="neighbours kept per book")
+    parser.add_argument("--min-count", type=int, default=MIN_COUNT, help="min users sharing a pair")
+    parser.add_argument("--min-rating", type=float, default=0.0, help="only ratings >= this count as views")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    ratings = read_ratings(["user_id", "book_id", "rating"])
+    ratings = ratings[ratings["rating"] >= args.min_rating]
+    users, user_rows = np.unique(ratings["user_id"].to_numpy(), return_inverse=True)
+    book_ids, book_rows = np.unique(ratings["book_id"].to_numpy(), return_inverse=True)
+    X = interactions_csr(user_rows, book_rows, (len(users), len(book_ids)))
+    Xt = X.T.tocsr()
+    counts = np.asarray(X.sum(axis=0)).ravel().astype(np.float64)
+    print(f"[OK] {X.nnz:,} interactions | users: {X.shape[0]:,} | books: {len(book_ids):,}")
+
+    parts = []
+    for start in range(0, len(book_ids), args.block_size):
+        block = Xt[start:start + args.block_size] @ X          # (block x N) co-occurrence counts
+        parts.append(prune_block(block, start, counts, args.top_m, args.min_count))
+    rows = np.concatenate([p[0] for p in parts])
+    indices = np.concatenate([p[1] for p in parts])
+    data = np.concatenate([p[2] for p in parts])
+    indptr = np.zeros(len(book_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(book_ids)), out=indptr[1:])
+    print(f"[OK] Co-occurrence graph built in {time.perf_counter() - t0:.1f}s "
+          f"({len(indices):,} edges, avg {len(indices) / max(len(book_ids), 1):.1f} per book).")
+
+    tmp_dir = COOCCUR_DIR + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    SessionRecommender.save(tmp_dir, book_ids, indptr, indices, data, {
+        "top_m": args.top_m, "min_count": args.min_count, "min_rating": args.min_rating,
+        "n_books": int(len(book_ids)), "n_users": int(X.shape[0]), "edges": int(len(indices)),
+    })
+    shutil.rmtree(COOCCUR_DIR, ignore_errors=True)
+    os.replace(tmp_dir, COOCCUR_DIR)
+    print(f"[OK] Saved co-occurrence graph → {COOCCUR_DIR}")
+
+    publish(note="build_cooccurrence")
+    print("[DONE] Co-occurrence build completed.")
+
+
+if __name__ == "__main__":
+    main()
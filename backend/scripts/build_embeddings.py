@@ -1,50 +1,131 @@
 """
 Build Semantic Embeddings for Books (Database-driven)
 -----------------------------------------------------
-Generates and saves:
- - book_embeddings.pt  (torch tensor of semantic vectors)
- - emb_meta.parquet    (book_id, title, authors, combined_text in same order)
+Full rebuild of the sharded embedding store (artifacts/emb_store), built
+for catalogs of hundreds of thousands of descriptions:
+
+ - books are streamed from the DB in book_id order (keyset chunks), never
+   loaded all at once
+ - each chunk is sorted by text length before encoding, so the batches the
+   workers see hold similarly sized texts and waste little on padding
+ - encoding runs on a sentence-transformers multi-process pool
+   (one process per GPU, or --workers CPU processes)
+ - every finished chunk is appended as a shard to a staging store
+   (emb_store.building); a crashed or interrupted run resumes after the
+   last checkpointed book_id
+ - when all chunks are done the staging store replaces emb_store
+
+Usage:
+  python -m backend.scripts.build_embeddings [--chunk-size 20000] [--workers 4] [--restart]
 """
 
 import os
-import torch
-import pandas as pd
-from sentence_transformers import SentenceTransformer
-from backend.core.db_utils import load_books
-from backend.core.config import ART_DIR, EMB_PATH, EMB_META
+import time
+import shutil
+import argparse
+import numpy as np
+from backend.core.db_utils import iter_books, count_records
+from backend.core.config import ART_DIR, EMB_STORE_DIR
+from backend.core.artifacts import publish
+from backend.ml.embedding_store import EmbeddingStore, combined_text, text_hash, COMPACT_MAX_SHARDS
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+STAGING_DIR = f"{EMB_STORE_DIR}.building"
+
+
+def open_staging(restart: bool):
+    """Staging store + last book_id already checkpointed (None = fresh start)."""
+    if restart and os.path.exists(STAGING_DIR):
+        shutil.rmtree(STAGING_DIR)
+    if not EmbeddingStore.exists(STAGING_DIR):
+        return None, None
+    store = EmbeddingStore(STAGING_DIR)
+    live = store.live_meta()
+    last = int(live["book_id"].max()) if len(live) else None
+    print(f"[INFO] Resuming: {len(live):,} books already checkpointed (last book_id={last}).")
+    return store, last
+
+
+def encode_chunk(model, pool, texts, batch_size):
+    """Encode one chunk longest-first; returns vectors in the original order."""
+    order = np.argsort([-len(t) for t in texts], kind="stable")
+    sorted_texts = [texts[i] for i in order]
+    if pool is not None:
+        vecs = model.encode_multi_process(sorted_texts, pool, batch_size=batch_size)
+    else:
+        vecs = model.encode(sorted_texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    out = np.empty_like(vecs, dtype=np.float32)
+    out[order] = vecs
+    return out
+
+
+def swap_in(staging_dir, target_dir):
+    """Replace the live store with the finished staging store."""
+    old = f"{target_dir}.old"
+    if os.path.exists(old):
+        shutil.rmtree(old)
+    if os.path.exists(target_dir):
+        os.replace(target_dir, old)
+    os.replace(staging_dir, target_dir)
+    if os.path.exists(old):
+        shutil.rmtree(old)
 
 
 def main():
+    ap = argparse.ArgumentParser(description="Parallel, resumable build of the book embedding store")
+    ap.add_argument("--chunk-size", type=int, default=20000, help="Books per DB chunk / checkpoint")
+    ap.add_argument("--batch-size", type=int, default=64, help="Encoder batch size")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Encoder processes (default: all GPUs, else 4 CPU processes; 1 = in-process)")
+    ap.add_argument("--restart", action="store_true", help="Discard checkpoints and start over")
+    args = ap.parse_args()
+
     os.makedirs(ART_DIR, exist_ok=True)
+    total = int(count_records()["books"])
+    store, last_id = open_staging(args.restart)
+
+    # Initialize model (+ worker pool)
+    import torch
+    from sentence_transformers import SentenceTransformer
+    print(f"[INFO] Generating semantic embeddings using {MODEL_NAME} ...")
+    model = SentenceTransformer(MODEL_NAME)
+    pool = None
+    if args.workers != 1:
+        if args.workers is None:
+            devices = None
+        elif torch.cuda.is_available():
+            devices = [f"cuda:{i % torch.cuda.device_count()}" for i in range(args.workers)]
+        else:
+            devices = ["cpu"] * args.workers
+        pool = model.start_multi_process_pool(target_devices=devices)
+
+    done = resumed = len(store.live_meta()) if store is not None else 0
+    t0 = time.perf_counter()
+    try:
+        for chunk in iter_books(["title", "authors", "description"], args.chunk_size, after_id=last_id):
+            chunk["combined_text"] = combined_text(chunk)
+            chunk["text_hash"] = text_hash(chunk["combined_text"])
+            vecs = encode_chunk(model, pool, chunk["combined_text"].tolist(), args.batch_size)
+            if store is None:
+                store = EmbeddingStore.create(vecs.shape[1], STAGING_DIR)
+            store.append(vecs, chunk, replace=False)   # checkpoint; ids past last_id are new
+            done += len(chunk)
+            rate = (done - resumed) / max(time.perf_counter() - t0, 1e-9)
+            print(f"[OK] Checkpointed {done:,}/{total:,} books "
+                  f"(last book_id={int(chunk['book_id'].iloc[-1])}, {rate:,.0f} books/s)")
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+    if store is None:
+        print("[WARN] No books in the database — nothing to embed.")
+        return
+    if len(store.manifest["shards"]) > COMPACT_MAX_SHARDS:
+        store.compact()
+    swap_in(STAGING_DIR, EMB_STORE_DIR)
 
-    print("[INFO] Loading books data from database ...")
-    df = load_books(columns=["book_id", "title", "authors", "description"])
-    print(f"[OK] Loaded {len(df):,} books from DB.")
-
-    # Combine text fields (weighted toward title)
-    df["combined_text"] = (
-        df["title"].fillna("") + " " +
-        df["title"].fillna("") + " " +  # title repeated for stronger weight
-        df["authors"].fillna("") + " " +
-        df["description"].fillna("")
-    )
-
-    # Initialize model
-    print("[INFO] Generating semantic embeddings using all-MiniLM-L6-v2 ...")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    emb = model.encode(
-        df["combined_text"].tolist(),
-        convert_to_tensor=True,
-        show_progress_bar=True
-    )
-
-    # Save embeddings
-    torch.save(emb, EMB_PATH)
-    meta = df[["book_id", "title", "authors", "combined_text"]].copy()
-    meta.to_parquet(EMB_META, index=False)
-
-    print(f"[OK] Saved embeddings → {EMB_PATH}")
-    print(f"[OK] Saved metadata → {EMB_META}")
+    print(f"[OK] Saved embedding store → {EMB_STORE_DIR} ({len(store.manifest['shards'])} shards)")
+    publish(note="build_embeddings")
     print("[DONE] Semantic embedding build completed.")
 
 
@@ -0,0 +1,113 @@
+"""
+Build Item-to-item "Similar Books" Graph
+----------------------------------------
+All-pairs kNN over every embedded book, fusing two signals:
+
+    sim(a, b) = w_sem * cos(emb_a, emb_b) + w_cf * cos(als_a, als_b)
+
+(books without ALS factors only get the semantic part). Rows are processed
+in blocks: one GEMM per signal for (block x N), self-matches masked,
+per-block argpartition for the top-K, so memory stays at block x N floats
+no matter how large the catalog is. The graph is written as int32 / float16
+arrays to artifacts/similar (see backend.ml.similar_books) and published as
+a new artifact version.
+
+Run:
+  python -m backend.scripts.build_similar
+  python -m backend.scripts.build_similar --k 50 --w-sem 0.7 --w-cf 0.3
+"""
+
+import os
+import time
+import shutil
+import pickle
+import argparse
+import numpy as np
+
+from backend.core.config import ART_DIR, ALS_ITEM_FACTORS, SIMILAR_DIR
+from backend.core.artifacts import publish
+from backend.ml.embedding_store import load_embeddings
+from backend.ml.evaluation import topk_indices
+from backend.ml.similar_books import SimilarBooks
+
+K = 20
+BLOCK_SIZE = 1024
+MAX_BLOCK_BYTES = 512 * 1024 ** 2   # cap on one (block x N) float32 score matrix
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return (x / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def load_cf_vectors(book_ids):
+    """Normalized ALS item factors aligned to book_ids (zeros where unknown), or None."""
+    map_path = os.path.join(ART_DIR, "als_iid_map.pkl")
+    if not (os.path.exists(ALS_ITEM_FACTORS) and os.path.exists(map_path)):
+        print("[WARN] ALS artifacts missing — building from embeddings only.")
+        return None
+    item_factors = np.load(ALS_ITEM_FACTORS)["data"].astype(np.float32, copy=False)
+    with open(map_path, "rb") as f:
+        iid_map = pickle.load(f)
+    rows = np.array([iid_map.get(int(b), -1) for b in book_ids])
+    out = np.zeros((len(book_ids), item_factors.shape[1]), dtype=np.float32)
+    known = rows >= 0
+    out[known] = _normalize(item_factors[rows[known]])
+    print(f"[OK] ALS factors for {known.sum():,}/{len(book_ids):,} books.")
+    return out
+
+
+def knn_graph(sem, cf, k, w_sem, w_cf, block_size):
+    """Top-k neighbour rows + fused scores for every row (self excluded)."""
+    n = sem.shape[0]
+    block_size = max(1, min(block_size, MAX_BLOCK_BYTES // (4 * n)))
+    neighbors = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        sims = w_sem * (sem[start:stop] @ sem.T)
+        if cf is not None:
+            sims += w_cf * (cf[start:stop] @ cf.T)
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = topk_indices(sims, k)
+        neighbors[start:stop] = top
+        scores[start:stop] = np.take_along_axis(sims, top, axis=1)
+    return neighbors, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the similar-books kNN graph")
+    parser.add_argument("--k", type=int, default=K)
+    parser.add_argument("--w-sem", type=float, default=0.7, help="weight of embedding cosine")
+    parser.add_argument("--w-cf", type=float, default=0.3, help="weight of ALS item-factor cosine")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    emb, meta = load_embeddings(ART_DIR)
+    book_ids = meta["book_id"].to_numpy(dtype=np.int64)
+    order = np.argsort(book_ids, kind="stable")           # graph rows in book_id order
+    book_ids, sem = book_ids[order], _normalize(emb[order])
+    print(f"[OK] Loaded {len(book_ids):,} book embeddings.")
+
+    cf = load_cf_vectors(book_ids) if args.w_cf > 0 else None
+    k = min(args.k, len(book_ids) - 1)
+    neighbors, scores = knn_graph(sem, cf, k, args.w_sem, args.w_cf, args.block_size)
+    print(f"[OK] kNN graph built in {time.perf_counter() - t0:.1f}s ({len(book_ids):,} x {k}).")
+
+    tmp_dir = SIMILAR_DIR + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    SimilarBooks.save(tmp_dir, book_ids, book_ids[neighbors], scores, {
+        "k": k, "n_books": int(len(book_ids)), "w_sem": args.w_sem,
+        "w_cf": args.w_cf if cf is not None else 0.0, "sources": ["embeddings"] + (["als"] if cf is not None else []),
+    })
+    shutil.rmtree(SIMILAR_DIR, ignore_errors=True)
+    os.replace(tmp_dir, SIMILAR_DIR)
+    print(f"[OK] Saved similar-books graph → {SIMILAR_DIR}")
+
+    publish(note="build_similar")
+    print("[DONE] Similar-books build completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Build Persisted TF-IDF Index (Database-driven)
+----------------------------------------------
+Fits the TF-IDF vectorizer over title + authors + description and saves:
+ - tfidf/vectorizer.pkl            fitted TfidfVectorizer
+ - tfidf/{data,indices,indptr}.npy L2-normalized term-major CSR (memory-mappable)
+ - tfidf/meta.parquet              book_id, title, authors in column order
+ - tfidf/manifest.json             shapes
+
+Usage:
+    python -m backend.scripts.build_tfidf
+"""
+
+import os
+import shutil
+from backend.core.config import TFIDF_DIR
+from backend.core.artifacts import publish
+from backend.ml.recommender_tfidf import TFIDFRecommender
+
+
+def main():
+    tmp_dir = TFIDF_DIR + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # art_dir=tmp_dir forces a fresh fit even when an index already exists
+    model = TFIDFRecommender(art_dir=tmp_dir)
+    model.save(tmp_dir)
+
+    # Swap in the new index directory
+    shutil.rmtree(TFIDF_DIR, ignore_errors=True)
+    os.replace(tmp_dir, TFIDF_DIR)
+    print(f"[OK] Saved TF-IDF index → {TFIDF_DIR}")
+    publish(note="build_tfidf")
+    print("[DONE] TF-IDF build completed.")
+
+
+if __name__ == "__main__":
+    main()
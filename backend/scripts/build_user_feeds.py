@@ -0,0 +1,136 @@
+"""
+Materialized Per-user Feeds (ALS)
+---------------------------------
+Precomputes the top-N personalized books for every ALS user so the home
+feed is one primary-key lookup instead of a full hybrid query per view:
+
+- users scored in blocks: one GEMM (block x k) @ (k x items) per block
+- every book the user has rated is masked out, top-N via argpartition
+- blocks spread over a process pool (--jobs, default: all cores)
+- results land in the SQLite table user_feeds, one row per user with the
+  book ids (int32) and scores (float32) packed as blobs
+
+The new feeds are written to a staging table and swapped in with a rename
+inside one transaction, so readers never see a half-built feed.
+
+Run:
+  python -m backend.scripts.build_user_feeds
+  python -m backend.scripts.build_user_feeds --top-n 100 --jobs 8
+"""
+
+import os
+import time
+import argparse
+from datetime import datetime
+import numpy as np
+from sqlalchemy import text
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.core.db_utils import ENGINE
+from backend.core.ratings_snapshot import read_ratings
+from backend.core.artifacts import current_version
+from backend.core.table_versions import bump
+from backend.ml.evaluation import map_ids, interactions_csr, topk_indices, mask_seen
+from backend.scripts.eval_batched import load_artifacts
+
+TOP_N = 50
+BLOCK_SIZE = 1024
+TABLE = "user_feeds"
+STAGING = "user_feeds_new"
+
+# Per-process state (set once per worker by _init_worker)
+_STATE = {}
+
+
+def _init_worker(state):
+    _STATE.update(state)
+
+
+def _feed_block(user_rows):
+    """Top-N unseen items (+ scores) for one block of ALS user rows."""
+    scores = _STATE["user_factors"][user_rows] @ _STATE["item_factors"].T
+    mask_seen(scores, _STATE["seen"][user_rows])
+    top = topk_indices(scores, _STATE["top_n"])
+    return user_rows, top, np.take_along_axis(scores, top, axis=1)
+
+
+def _create_staging(conn):
+    conn.execute(text(f"DROP TABLE IF EXISTS {STAGING}"))
+    conn.execute(text(
+        f"CREATE TABLE {STAGING} (user_id INTEGER PRIMARY KEY, book_ids BLOB NOT NULL, "
+        f"scores BLOB NOT NULL, model_version VARCHAR, built_at DATETIME)"
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize top-N ALS feeds for all users")
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (1 = in-process)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    user_factors, item_factors, uid_map, iid_map = load_artifacts()
+    n_users, n_items = user_factors.shape[0], item_factors.shape[0]
+
+    print("[INFO] Loading ratings (snapshot, synced with the DB) ...")
+    ratings = read_ratings(["user_id", "book_id"])
+    u = map_ids(ratings["user_id"], uid_map)
+    i = map_ids(ratings["book_id"], iid_map)
+    ok = (u >= 0) & (i >= 0)
+    seen = interactions_csr(u[ok], i[ok], (n_users, n_items))
+    print(f"[OK] Seen interactions: {seen.nnz:,} | Users: {n_users:,} | Items: {n_items:,}")
+
+    # ALS row → raw id
+    row_user = np.empty(n_users, dtype=np.int64)
+    row_user[list(uid_map.values())] = list(uid_map.keys())
+    row_book = np.empty(n_items, dtype=np.int32)
+    row_book[list(iid_map.values())] = list(iid_map.keys())
+
+    state = {"user_factors": user_factors, "item_factors": item_factors, "seen": seen, "top_n": args.top_n}
+    rows = np.arange(n_users)
+    blocks = [rows[s:s + args.block_size] for s in range(0, n_users, args.block_size)]
+    version, built_at = current_version(), datetime.utcnow()
+
+    with ENGINE.begin() as conn:
+        _create_staging(conn)
+
+    def write(results):
+        written = 0
+        for user_rows, top, scores in results:
+            records = []
+            for r, items, sc in zip(user_rows, top, scores):
+                keep = np.isfinite(sc)                     # users who have seen everything
+                records.append({
+                    "user_id": int(row_user[r]),
+                    "book_ids": row_book[items[keep]].tobytes(),
+                    "scores": sc[keep].astype(np.float32).tobytes(),
+                    "model_version": version, "built_at": built_at,
+                })
+            with ENGINE.begin() as conn:
+                conn.execute(text(
+                    f"INSERT INTO {STAGING} (user_id, book_ids, scores, model_version, built_at) "
+                    f"VALUES (:user_id, :book_ids, :scores, :model_version, :built_at)"
+                ), records)
+            written += len(records)
+        return written
+
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(state,)) as pool:
+            written = write(pool.map(_feed_block, blocks))
+    else:
+        _init_worker(state)
+        written = write(map(_feed_block, blocks))
+
+    # Swap the staging table in atomically
+    with ENGINE.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(f"ALTER TABLE {STAGING} RENAME TO {TABLE}"))
+        bump(conn, TABLE)     # HTTP validators for /recommend/feed
+
+    print(f"[DONE] Materialized feeds for {written:,} users (top-{args.top_n}) "
+          f"in {time.perf_counter() - t0:.1f}s → table {TABLE}")
+
+
+if __name__ == "__main__":
+    main()
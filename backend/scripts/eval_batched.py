@@ -0,0 +1,165 @@
+"""
+Batched Offline Evaluator — Active-User ALS Metrics
+---------------------------------------------------
+Vectorized replacement for activeuser_eval_quick.py:
+- Per-user 80/20 split done with one lexsort (no groupby loop)
+- Users scored in blocks: one GEMM (block x k) @ (k x items) per block
+- Training items masked through sparse indexing, top-K via argpartition
+- Precision / Recall / NDCG / MAP @K and catalog coverage in one pass
+- Optional process pool over user blocks (--jobs)
+
+The split uses numpy's RNG, so absolute numbers differ slightly from the
+pandas .sample() split of the quick evaluator.
+
+Run:
+  python -m backend.scripts.eval_batched
+  python -m backend.scripts.eval_batched --jobs 4 --block-size 2048
+"""
+
+import os
+import json
+import time
+import pickle
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.core.config import ART_DIR
+from backend.core.ratings_snapshot import read_ratings
+from backend.ml.evaluation import (
+    split_per_user, map_ids, interactions_csr,
+    topk_indices, mask_seen, ranking_metrics, summarize,
+)
+
+# ---- Configurable parameters
+K = 10
+REL_THRESHOLD = 4.0
+MIN_RATINGS = 5
+RANDOM_SEED = 42
+BLOCK_SIZE = 1024
+
+# Per-process state (set once per worker by _init_worker)
+_STATE = {}
+
+
+def load_artifacts():
+    """Load ALS factors + ID maps. Fail fast if anything is missing."""
+    paths = {
+        "uf": os.path.join(ART_DIR, "als_user_factors.npz"),
+        "if": os.path.join(ART_DIR, "als_item_factors.npz"),
+        "uid": os.path.join(ART_DIR, "als_uid_map.pkl"),
+        "iid": os.path.join(ART_DIR, "als_iid_map.pkl"),
+    }
+    for p in paths.values():
+        if not os.path.exists(p):
+            raise FileNotFoundError(f"Missing artifact: {p}")
+
+    user_factors = np.load(paths["uf"])["data"].astype(np.float32, copy=False)
+    item_factors = np.load(paths["if"])["data"].astype(np.float32, copy=False)
+    with open(paths["uid"], "rb") as f:
+        uid_map = pickle.load(f)
+    with open(paths["iid"], "rb") as f:
+        iid_map = pickle.load(f)
+
+    print(f"[OK] ALS artifacts loaded: users={len(uid_map):,}, items={len(iid_map):,}")
+    return user_factors, item_factors, uid_map, iid_map
+
+
+def load_active_ratings():
+    """Load ratings from DB and keep only active users (>= MIN_RATINGS)."""
+    print("[INFO] Loading ratings (snapshot, synced with the DB) ...")
+    ratings = read_ratings(["user_id", "book_id", "rating"])
+    counts = ratings["user_id"].map(ratings["user_id"].value_counts())
+    ratings = ratings[counts >= MIN_RATINGS]
+    return ratings.astype({"user_id": np.int64, "book_id": np.int64, "rating": np.float32})
+
+
+def _init_worker(state):
+    _STATE.update(state)
+
+
+def _eval_block(user_rows):
+    """Score one block of ALS user rows; return per-user metrics + top-K."""
+    uf, itf = _STATE["user_factors"], _STATE["item_factors"]
+    scores = uf[user_rows] @ itf.T                       # (B x I) single GEMM
+    mask_seen(scores, _STATE["train"][user_rows])
+    topk = topk_indices(scores, _STATE["k"])
+    metrics = ranking_metrics(topk, _STATE["test"][user_rows], _STATE["k"])
+    return metrics, topk
+
+
+def evaluate(user_factors, item_factors, train_csr, test_csr, eval_rows,
+             k=K, block_size=BLOCK_SIZE, jobs=1):
+    """Evaluate the given ALS user rows block-by-block (optionally in a pool)."""
+    state = {"user_factors": user_factors, "item_factors": item_factors,
+             "train": train_csr, "test": test_csr, "k": k}
+    blocks = [eval_rows[i:i + block_size] for i in range(0, len(eval_rows), block_size)]
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(state,)) as pool:
+            results = list(pool.map(_eval_block, blocks))
+    else:
+        _init_worker(state)
+        results = [_eval_block(b) for b in blocks]
+
+    per_user = {name: np.concatenate([m[name] for m, _ in results]) if results else np.array([])
+                for name in ("precision", "recall", "ndcg", "ap")}
+    recommended = np.concatenate([t.ravel() for _, t in results]) if results else np.array([])
+    return summarize(per_user, recommended, item_factors.shape[0], k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched ALS offline evaluation")
+    parser.add_argument("--k", type=int, default=K)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (1 = in-process)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    ratings = load_active_ratings()
+    print(f"[OK] Active ratings: {len(ratings):,} rows | Users: {ratings['user_id'].nunique():,}")
+
+    train, test = split_per_user(ratings, train_frac=0.8, seed=RANDOM_SEED)
+    test_pos = test[test["rating"] >= REL_THRESHOLD]
+
+    user_factors, item_factors, uid_map, iid_map = load_artifacts()
+    n_users, n_items = user_factors.shape[0], item_factors.shape[0]
+
+    # Map to ALS indices and drop anything the model has never seen
+    def to_csr(df):
+        u = map_ids(df["user_id"], uid_map)
+        i = map_ids(df["book_id"], iid_map)
+        ok = (u >= 0) & (i >= 0)
+        return interactions_csr(u[ok], i[ok], (n_users, n_items))
+
+    train_csr = to_csr(train)
+    test_csr = to_csr(test_pos)
+
+    eval_rows = np.flatnonzero(np.diff(test_csr.indptr) > 0)
+    skipped = test_pos["user_id"].nunique() - len(eval_rows)
+    print(f"[OK] Train={len(train):,}, Test positives={len(test_pos):,}, "
+          f"Eval users={len(eval_rows):,} (skipped {skipped})")
+    if len(eval_rows) == 0:
+        print("[WARN] No users with positive items in test — nothing to evaluate.")
+        return
+
+    t1 = time.perf_counter()
+    result = evaluate(user_factors, item_factors, train_csr, test_csr, eval_rows,
+                      k=args.k, block_size=args.block_size, jobs=args.jobs)
+    t2 = time.perf_counter()
+    result.update({"skipped_users": int(skipped), "jobs": args.jobs,
+                   "load_seconds": round(t1 - t0, 3), "score_seconds": round(t2 - t1, 3)})
+
+    print(f"\n=== Active-User Metrics @{args.k} (ALS-only, batched) ===")
+    for name, val in result.items():
+        print(f"{name:>16}: {val:.4f}" if isinstance(val, float) else f"{name:>16}: {val}")
+
+    out_path = os.path.join(ART_DIR, "eval_batched.json")
+    with open(out_path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[OK] Saved result → {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Offline Hybrid Evaluation Harness (Semantic + CF + Popularity)
+--------------------------------------------------------------
+Evaluates the hybrid fusion without calling HybridRecommender per user.
+
+- Each user gets a profile vector: the mean normalized embedding of their
+  positively rated *train* books (all train books if none are positive).
+  This replaces the empty query the old evaluator sent, which made the
+  semantic side return nothing.
+- Semantic candidates for all users come from blocked profile @ emb.T
+  matmuls (seen items masked, top-C via argpartition) and are cached to
+  artifacts/hybrid_eval_cache.npz together with CF cosine and popularity
+  scores for every candidate.
+- Every (ALPHA, BETA, GAMMA) grid point is fused and ranked for all users
+  in one vectorized pass:
+      hybrid = ALPHA * semantic + BETA * cf + GAMMA * pop
+
+Run:
+  python -m backend.scripts.eval_hybrid_offline
+  python -m backend.scripts.eval_hybrid_offline --alpha 0.5,0.6,0.7 --beta 0.2,0.3,0.4 --gamma 0,0.05
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+
+from backend.core.config import (
+    ART_DIR, POPULARITY_PATH, ALS_USER_FACTORS, ALPHA, BETA, GAMMA,
+)
+from backend.ml.embedding_store import load_embeddings as load_embedding_matrix, embeddings_version
+from backend.scripts.eval_batched import load_active_ratings, load_artifacts
+from backend.ml.evaluation import (
+    split_per_user, map_ids, interactions_csr, topk_indices, mask_seen, ranking_metrics, summarize,
+)
+
+# ---- Configurable parameters
+K = 10
+N_CANDIDATES = 50          # same candidate depth as HybridRecommender (max(top_k, 50))
+REL_THRESHOLD = 4.0
+RANDOM_SEED = 42
+BLOCK_SIZE = 1024
+CACHE_PATH = os.path.join(ART_DIR, "hybrid_eval_cache.npz")
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def load_embeddings():
+    """Normalized embedding matrix (float32) + book_id per row."""
+    emb, meta = load_embedding_matrix()
+    return _normalize(emb.astype(np.float32)), meta["book_id"].to_numpy(dtype=np.int64)
+
+
+def build_candidates(emb, emb_book_ids, train, eval_user_ids, uid_map, iid_map,
+                     user_factors, item_factors, n_candidates=N_CANDIDATES, block_size=BLOCK_SIZE):
+    """Semantic top-C per user + CF / popularity scores for each candidate."""
+    n_items = len(emb_book_ids)
+    emb_row = {int(b): i for i, b in enumerate(emb_book_ids)}
+    eval_pos = {int(u): i for i, u in enumerate(eval_user_ids)}
+
+    # Train interactions in (eval user x emb row) space
+    u = train["user_id"].map(eval_pos).fillna(-1).to_numpy(dtype=np.int64)
+    i = map_ids(train["book_id"], emb_row)
+    ok = (u >= 0) & (i >= 0)
+    seen = interactions_csr(u[ok], i[ok], (len(eval_user_ids), n_items))
+    liked = train["rating"].to_numpy() >= REL_THRESHOLD
+    pos = interactions_csr(u[ok & liked], i[ok & liked], seen.shape)
+    # Users without a positive train item fall back to all their train items
+    empty = np.diff(pos.indptr) == 0
+    weights = pos + seen.multiply(empty[:, None]).tocsr()
+
+    # Profile vectors: one sparse @ dense product
+    profiles = _normalize(np.asarray(weights @ emb, dtype=np.float32))
+
+    uf = _normalize(user_factors.astype(np.float32))
+    itf = _normalize(item_factors.astype(np.float32))
+    urow = map_ids(eval_user_ids, uid_map)
+    irow_of_emb = map_ids(emb_book_ids, iid_map)
+
+    n_candidates = min(n_candidates, n_items)
+    cand = np.empty((len(eval_user_ids), n_candidates), dtype=np.int64)
+    sem = np.empty(cand.shape, dtype=np.float32)
+    cf = np.zeros(cand.shape, dtype=np.float32)
+    for s in range(0, len(eval_user_ids), block_size):
+        sl = slice(s, s + block_size)
+        block = profiles[sl] @ emb.T
+        mask_seen(block, seen[sl])
+        idx = topk_indices(block, n_candidates)
+        cand[sl] = idx
+        sem[sl] = np.take_along_axis(block, idx, axis=1)
+
+        # CF cosine(user, item) per candidate (0 when either side is unknown)
+        ub, ib = urow[sl], irow_of_emb[idx]
+        known = (ub[:, None] >= 0) & (ib >= 0)
+        dots = np.einsum("bk,bck->bc", uf[np.maximum(ub, 0)], itf[np.maximum(ib, 0)])
+        cf[sl] = np.where(known, dots, 0.0)
+    sem[~np.isfinite(sem)] = 0.0
+
+    # Popularity prior aligned to emb rows
+    pop_df = pd.read_parquet(POPULARITY_PATH)
+    pop_by_row = pop_df.set_index("book_id")["pop_score"].reindex(emb_book_ids).fillna(0.0).to_numpy(np.float32)
+    pop = pop_by_row[cand]
+
+    return cand, sem, cf, pop
+
+
+def fuse_and_score(cand, sem, cf, pop, test_csr, weights, k=K):
+    """Rank candidates with one weight triple and compute metrics for all users."""
+    a, b, g = weights
+    fused = a * sem + b * cf + g * pop
+    order = topk_indices(fused, k)
+    topk = np.take_along_axis(cand, order, axis=1)
+    per_user = ranking_metrics(topk, test_csr, k)
+    return summarize(per_user, topk.ravel(), test_csr.shape[1], k)
+
+
+def _parse_grid(text, default):
+    return [float(x) for x in text.split(",")] if text else default
+
+
+def _cache_key(*parts) -> str:
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline hybrid fusion evaluation / grid search")
+    parser.add_argument("--alpha", help="comma-separated semantic weights")
+    parser.add_argument("--beta", help="comma-separated CF weights")
+    parser.add_argument("--gamma", help="comma-separated popularity weights")
+    parser.add_argument("--k", type=int, default=K)
+    parser.add_argument("--candidates", type=int, default=N_CANDIDATES)
+    parser.add_argument("--no-cache", action="store_true", help="recompute semantic candidates")
+    args = parser.parse_args()
+
+    alphas = _parse_grid(args.alpha, sorted({ALPHA, 0.4, 0.5, 0.7, 0.8}))
+    betas = _parse_grid(args.beta, sorted({BETA, 0.0, 0.2, 0.3, 0.5}))
+    gammas = _parse_grid(args.gamma, sorted({GAMMA, 0.0, 0.1}))
+
+    t0 = time.perf_counter()
+    ratings = load_active_ratings()
+    train, test = split_per_user(ratings, train_frac=0.8, seed=RANDOM_SEED)
+    test_pos = test[test["rating"] >= REL_THRESHOLD]
+    eval_user_ids = np.sort(test_pos["user_id"].unique())
+    print(f"[OK] Train={len(train):,}, Test positives={len(test_pos):,}, Eval users={len(eval_user_ids):,}")
+    if len(eval_user_ids) == 0:
+        print("[WARN] No users with positive items in test — nothing to evaluate.")
+        return
+
+    emb, emb_book_ids = load_embeddings()
+    user_factors, item_factors, uid_map, iid_map = load_artifacts()
+
+    key = _cache_key(len(ratings), len(emb_book_ids), args.candidates, RANDOM_SEED,
+                     embeddings_version(), os.path.getmtime(ALS_USER_FACTORS))
+    cached = None
+    if not args.no_cache and os.path.exists(CACHE_PATH):
+        cached = np.load(CACHE_PATH)
+        if str(cached["key"]) != key:
+            cached = None
+    if cached is not None:
+        cand, sem, cf, pop = (cached[n] for n in ("cand", "sem", "cf", "pop"))
+        print(f"[OK] Loaded cached candidates → {CACHE_PATH}")
+    else:
+        print("[INFO] Building semantic candidates (batched) ...")
+        cand, sem, cf, pop = build_candidates(emb, emb_book_ids, train, eval_user_ids, uid_map, iid_map,
+                                              user_factors, item_factors, n_candidates=args.candidates)
+        np.savez(CACHE_PATH, key=key, cand=cand, sem=sem, cf=cf, pop=pop)
+        print(f"[OK] Cached candidates → {CACHE_PATH}")
+
+    emb_row = {int(b): i for i, b in enumerate(emb_book_ids)}
+    eval_pos = {int(u): i for i, u in enumerate(eval_user_ids)}
+    tu = test_pos["user_id"].map(eval_pos).to_numpy(dtype=np.int64)
+    ti = map_ids(test_pos["book_id"], emb_row)
+    test_csr = interactions_csr(tu[ti >= 0], ti[ti >= 0], (len(eval_user_ids), len(emb_book_ids)))
+
+    t1 = time.perf_counter()
+    rows = []
+    for w in itertools.product(alphas, betas, gammas):
+        res = fuse_and_score(cand, sem, cf, pop, test_csr, w, k=args.k)
+        rows.append({"alpha": w[0], "beta": w[1], "gamma": w[2], **res})
+    t2 = time.perf_counter()
+
+    table = pd.DataFrame(rows).sort_values(f"ndcg@{args.k}", ascending=False).reset_index(drop=True)
+    print(f"\n=== Hybrid grid search @{args.k} ({len(rows)} weight triples, {t2 - t1:.2f}s) ===")
+    print(table.head(15).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    best = table.iloc[0].to_dict()
+    out_path = os.path.join(ART_DIR, "eval_hybrid_offline.json")
+    with open(out_path, "w") as f:
+        json.dump({"best": best, "grid": table.to_dict(orient="records"),
+                   "prepare_seconds": round(t1 - t0, 3), "grid_seconds": round(t2 - t1, 3)}, f, indent=2)
+    print(f"\n[OK] Best: ALPHA={best['alpha']} BETA={best['beta']} GAMMA={best['gamma']}")
+    print(f"[OK] Saved result → {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Synthetic Catalog & Ratings Generator (scale testing)
+-----------------------------------------------------
+Writes a Goodbooks-shaped dataset at any scale:
+ - books      book_id, title, authors, description, average_rating, image_url
+ - ratings    user_id, book_id, rating  (power-law user activity & item popularity)
+
+Everything is generated and written in chunks, so memory stays bounded by
+--chunk-size rather than the total number of ratings. Optionally:
+ - --to-sqlite     load the output into bookrs.db through the seeder helpers
+ - --artifacts DIR write matching fake serving artifacts (embeddings + meta,
+                   ALS factors + id maps, popularity) so the API can be
+                   stress-tested without the real model or dataset
+
+Duplicate (user, book) pairs are removed inside each chunk, so dense
+configurations write fewer rows than --ratings; across chunks a small
+fraction of duplicates remains at very large scale.
+
+Usage:
+    python -m backend.scripts.generate_synthetic --books 100000 --ratings 10000000
+    python -m backend.scripts.generate_synthetic --books 1000000 --ratings 500000000 --format parquet
+    python -m backend.scripts.generate_synthetic --books 20000 --ratings 2000000 --to-sqlite --artifacts artifacts_synth
+"""
+
+import os
+import pickle
+import argparse
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from backend.ml.embedding_store import combined_text
+
+# ---- Configurable parameters
+OUT_DIR = os.path.join("dataset", "synthetic")
+CHUNK_SIZE = 5_000_000
+EMB_DIM = 384            # all-MiniLM-L6-v2
+ALS_FACTORS = 64
+ITEM_ZIPF = 1.1          # popularity skew of books
+USER_ZIPF = 0.9          # activity skew of users
+
+WORDS = (
+    "shadow light river king queen war peace night day love death dragon city "
+    "star ocean secret garden house storm fire ice iron glass silent lost last "
+    "first dark bright wild broken hidden golden winter summer empire song "
+    "journey memory promise truth lie blood stone crown forest mountain road "
+    "letter dream mirror clock thief witch soldier doctor detective child"
+).split()
+FIRST = "Anna Ben Clara David Elena Frank Grace Henry Iris Jack Kara Leo Maya Noah Olga Paul Rosa Sam Tara Victor".split()
+LAST = "Adams Brown Chen Diaz Evans Fischer Garcia Hughes Ito Jones Kim Lopez Miller Novak Olsen Patel Quinn Rossi Smith Tanaka".split()
+
+
+def _zipf_cdf(n: int, a: float) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** a
+    cdf = np.cumsum(w)
+    return cdf / cdf[-1]
+
+
+def _phrases(rng, n, n_words):
+    words = np.asarray(WORDS, dtype=object)[rng.integers(0, len(WORDS), size=(n, n_words))]
+    return [" ".join(row) for row in words]
+
+
+def generate_books(rng, n_books, chunk_size):
+    """Yield books DataFrames in chunks (book_id = 1..n_books)."""
+    n_authors = max(1, n_books // 8)
+    author_names = np.array([
+        f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]}"
+        + (f" {i // (len(FIRST) * len(LAST))}" if i >= len(FIRST) * len(LAST) else "")
+        for i in range(n_authors)
+    ], dtype=object)
+    author_cdf = _zipf_cdf(n_authors, 1.0)
+
+    for start in range(0, n_books, chunk_size):
+        n = min(chunk_size, n_books - start)
+        ids = np.arange(start + 1, start + n + 1)
+        titles = [t.title() for t in _phrases(rng, n, 3)]
+        authors = author_names[np.searchsorted(author_cdf, rng.random(n))]
+        yield pd.DataFrame({
+            "book_id": ids,
+            "title": titles,
+            "authors": authors,
+            "description": _phrases(rng, n, 30),
+            "average_rating": np.clip(rng.normal(3.9, 0.3, n), 1.0, 5.0).round(2),
+            "image_url": [f"https://example.invalid/covers/{i}.jpg" for i in ids],
+        })
+
+
+def generate_ratings(rng, n_ratings, n_users, book_means, chunk_size):
+    """Yield ratings DataFrames in chunks with Zipf-distributed users and books."""
+    n_books = len(book_means)
+    # Random permutations so popular ids are not simply the smallest ones
+    item_perm = rng.permutation(n_books)
+    user_perm = rng.permutation(n_users)
+    item_cdf = _zipf_cdf(n_books, ITEM_ZIPF)
+    user_cdf = _zipf_cdf(n_users, USER_ZIPF)
+
+    for start in range(0, n_ratings, chunk_size):
+        n = min(chunk_size, n_ratings - start)
+        items = item_perm[np.searchsorted(item_cdf, rng.random(n))]
+        users = user_perm[np.searchsorted(user_cdf, rng.random(n))]
+        key = users.astype(np.int64) * n_books + items
+        _, first = np.unique(key, return_index=True)
+        items, users = items[first], users[first]
+        ratings = np.clip(np.rint(rng.normal(book_means[items], 0.9)), 1, 5)
+        yield pd.DataFrame({
+            "user_id": (users + 1).astype(np.int64),
+            "book_id": (items + 1).astype(np.int64),
+            "rating": ratings.astype(np.float32),
+        })
+
+
+class ChunkWriter:
+    """Append DataFrame chunks to <out>/<name>.csv or <out>/<name>/part-XXXXX.parquet."""
+
+    def __init__(self, out_dir, name, fmt):
+        self.fmt, self.part = fmt, 0
+        if fmt == "parquet":
+            self.path = os.path.join(out_dir, name)
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            self.path = os.path.join(out_dir, f"{name}.csv")
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def write(self, df):
+        if self.fmt == "parquet":
+            df.to_parquet(os.path.join(self.path, f"part-{self.part:05d}.parquet"), index=False)
+        else:
+            df.to_csv(self.path, mode="a", header=self.part == 0, index=False)
+        self.part += 1
+
+
+def write_artifacts(art_dir, rng, books_meta, item_counts, n_users, dim=EMB_DIM, factors=ALS_FACTORS):
+    """Fake embeddings / ALS factors / popularity matching the synthetic catalog."""
+    import torch
+
+    os.makedirs(art_dir, exist_ok=True)
+    n_books = len(books_meta)
+
+    print(f"[INFO] Writing fake embeddings ({n_books:,} x {dim}) ...")
+    emb = np.empty((n_books, dim), dtype=np.float32)
+    for s in range(0, n_books, 100_000):
+        block = rng.standard_normal((min(100_000, n_books - s), dim), dtype=np.float32)
+        emb[s:s + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    torch.save(torch.from_numpy(emb), os.path.join(art_dir, "book_embeddings.pt"))
+    meta = books_meta[["book_id", "title", "authors"]].copy()
+    meta["combined_text"] = combined_text(books_meta)   # same text (and hash) update_embeddings computes
+    meta.to_parquet(os.path.join(art_dir, "emb_meta.parquet"), index=False)
+    del emb
+
+    print(f"[INFO] Writing fake ALS factors (users={n_users:,}, items={n_books:,}, k={factors}) ...")
+    # Popular items get larger factor norms so CF scores correlate with popularity
+    scale = np.log1p(item_counts).astype(np.float32)[:, None] / max(np.log1p(item_counts.max()), 1.0)
+    item_factors = rng.standard_normal((n_books, factors), dtype=np.float32) * (0.1 + scale)
+    user_factors = rng.standard_normal((n_users, factors), dtype=np.float32) * 0.1
+    np.savez_compressed(os.path.join(art_dir, "als_item_factors.npz"), data=item_factors)
+    np.savez_compressed(os.path.join(art_dir, "als_user_factors.npz"), data=user_factors)
+    with open(os.path.join(art_dir, "als_uid_map.pkl"), "wb") as f:
+        pickle.dump({u + 1: u for u in range(n_users)}, f)
+    with open(os.path.join(art_dir, "als_iid_map.pkl"), "wb") as f:
+        pickle.dump({b + 1: b for b in range(n_books)}, f)
+
+    counts = item_counts.astype(np.int64)
+    pop = pd.DataFrame({"book_id": np.arange(1, n_books + 1), "count": counts})
+    pop = pop[pop["count"] > 0].reset_index(drop=True)
+    pop["pop_score"] = (pop["count"] - pop["count"].min()) / (pop["count"].max() - pop["count"].min() + 1e-9)
+    pop.to_parquet(os.path.join(art_dir, "popularity.parquet"), index=False)
+    print(f"[OK] Artifacts written → {art_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic BookRS dataset")
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--ratings", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=None, help="default: ratings // 100")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--to-sqlite", action="store_true", help="also load into bookrs.db via the seeder")
+    parser.add_argument("--artifacts", default=None, help="directory for fake serving artifacts")
+    args = parser.parse_args()
+
+    n_users = args.users or max(1, args.ratings // 100)
+    rng = np.random.default_rng(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    print(f"=== Synthetic dataset: {args.books:,} books | {n_users:,} users | {args.ratings:,} ratings ===")
+
+    session = None
+    if args.to_sqlite:
+        from backend.core.database import SessionLocal, Base, engine
+        from backend.models import book_model, user_model, rating_model  # noqa: F401  (register tables)
+        from backend.scripts.seed_db import clear_existing_data, insert_books, insert_users, insert_ratings
+        Base.metadata.create_all(bind=engine)
+        session = SessionLocal()
+        clear_existing_data(session)
+
+    try:
+        # 1) Books
+        book_writer = ChunkWriter(args.out, "books", args.format)
+        book_means = np.empty(args.books, dtype=np.float32)
+        meta_parts = []
+        book_chunk = min(args.chunk_size, 200_000)
+        for df in tqdm(generate_books(rng, args.books, book_chunk),
+                       total=-(-args.books // book_chunk), desc="Books"):
+            book_writer.write(df)
+            book_means[df["book_id"].to_numpy() - 1] = df["average_rating"].to_numpy()
+            if args.artifacts:
+                meta_parts.append(df[["book_id", "title", "authors", "description"]])
+            if session is not None:
+                insert_books(session, df)
+
+        if session is not None:
+            insert_users(session, range(1, n_users + 1))
+
+        # 2) Ratings
+        rating_writer = ChunkWriter(args.out, "ratings", args.format)
+        item_counts = np.zeros(args.books, dtype=np.int64)
+        written = 0
+        for df in tqdm(generate_ratings(rng, args.ratings, n_users, book_means, args.chunk_size),
+                       total=-(-args.ratings // args.chunk_size), desc="Ratings"):
+            rating_writer.write(df)
+            item_counts += np.bincount(df["book_id"].to_numpy() - 1, minlength=args.books)
+            written += len(df)
+            if session is not None:
+                insert_ratings(session, df)
+        print(f"[OK] {written:,} ratings written → {rating_writer.path}")
+
+        # 3) Serving artifacts
+        if args.artifacts:
+            write_artifacts(args.artifacts, rng, pd.concat(meta_parts, ignore_index=True), item_counts, n_users)
+    finally:
+        if session is not None:
+            session.close()
+
+    print("[DONE] Synthetic dataset generation completed.")
+
+
+if __name__ == "__main__":
+    main()
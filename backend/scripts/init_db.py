@@ -1,5 +1,5 @@
 from backend.core.database import Base, engine
-from backend.models import book_model, user_model, rating_model
+from backend.models import book_model, user_model, rating_model, feed_model
 
 print("[INFO] Creating tables...")
 Base.metadata.create_all(bind=engine)
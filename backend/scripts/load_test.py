@@ -0,0 +1,269 @@
+"""
+Load Testing & Traffic Replay for the BookRS API
+------------------------------------------------
+Drives backend.main:app either in-process (ASGI transport, no sockets) or a
+running server (--url http://127.0.0.1:8000) and reports throughput,
+latency percentiles, a latency histogram and error rates per endpoint.
+
+Two modes:
+ - synthetic   closed loop: --concurrency workers issue a weighted mix of
+               /recommend/hybrid, /books/search and POST /ratings calls for
+               --duration seconds (or --requests total)
+ - replay      open loop: --replay FILE re-issues logged requests with their
+               original inter-arrival times (scaled by --speed)
+
+Replay files may be:
+ - Common/Combined Log Format (nginx, Apache):
+       127.0.0.1 - - [19/Oct/2026:10:00:01 +0000] "GET /books/search?q=war HTTP/1.1" 200 512
+ - JSON lines:  {"ts": 1760868001.25, "method": "GET", "path": "/books/search?q=war"}
+
+Usage:
+    python -m backend.scripts.load_test --concurrency 16 --duration 30
+    python -m backend.scripts.load_test --mix hybrid=0.5,search=0.4,ratings=0.1 --url http://127.0.0.1:8000
+    python -m backend.scripts.load_test --replay access.log --speed 2 --out artifacts/bench/replay.json
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+import numpy as np
+from datetime import datetime
+from collections import defaultdict
+
+import httpx
+
+# ---- Configurable parameters
+DEFAULT_MIX = "hybrid=0.6,search=0.3,ratings=0.1"
+MAX_USER_ID = 53424
+MAX_BOOK_ID = 10000
+QUERIES = [
+    "deep learning", "fantasy adventure", "leadership", "harry potter", "romance",
+    "murder mystery", "science fiction", "history of war", "self help", "poetry",
+]
+HIST_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+CLF_RE = re.compile(r'\[(?P<ts>[^\]]+)\]\s+"(?P<method>[A-Z]+)\s+(?P<path>\S+)[^"]*"')
+
+
+# -------------------------------------------------------------------
+# Request generation
+# -------------------------------------------------------------------
+def make_request(kind: str, rng: random.Random):
+    """Return (endpoint_label, method, path, params) for one synthetic call."""
+    if kind == "hybrid":
+        return ("GET /recommend/hybrid", "GET", "/recommend/hybrid", {
+            "query": rng.choice(QUERIES),
+            "user_id": rng.randint(1, MAX_USER_ID),
+            "top_k": 10,
+        })
+    if kind == "search":
+        return ("GET /books/search", "GET", "/books/search", {"q": rng.choice(QUERIES).split()[0]})
+    if kind == "ratings":
+        return ("POST /ratings", "POST", "/ratings/", {
+            "user_id": rng.randint(1, MAX_USER_ID),
+            "book_id": rng.randint(1, MAX_BOOK_ID),
+            "rating": float(rng.randint(1, 5)),
+        })
+    raise ValueError(f"Unknown request kind: {kind}")
+
+
+def parse_mix(text: str):
+    kinds, weights = [], []
+    for part in text.split(","):
+        name, _, w = part.partition("=")
+        kinds.append(name.strip())
+        weights.append(float(w or 1))
+    return kinds, weights
+
+
+def parse_replay(path: str):
+    """Load (offset_seconds, method, path) tuples from a CLF or JSON-lines log."""
+    events = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                rec = json.loads(line)
+                events.append((float(rec["ts"]), rec.get("method", "GET"), rec["path"]))
+                continue
+            m = CLF_RE.search(line)
+            if m:
+                ts = datetime.strptime(m.group("ts"), "%d/%b/%Y:%H:%M:%S %z").timestamp()
+                events.append((ts, m.group("method"), m.group("path")))
+    if not events:
+        return []
+    events.sort(key=lambda e: e[0])
+    t0 = events[0][0]
+    return [(ts - t0, method, p) for ts, method, p in events]
+
+
+def _label(method: str, path: str) -> str:
+    return f"{method} {path.split('?', 1)[0].rstrip('/') or '/'}"
+
+
+# -------------------------------------------------------------------
+# Stats
+# -------------------------------------------------------------------
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)   # label -> [ms]
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.lateness_ms = []                # replay: how far behind schedule requests were sent
+
+    def record(self, label, ms, status=None, error=None):
+        self.latencies[label].append(ms)
+        if error is not None:
+            self.errors[label] += 1
+            self.statuses[label][type(error).__name__] += 1
+        else:
+            self.statuses[label][str(status)] += 1
+            if status >= 500:
+                self.errors[label] += 1
+
+    def report(self, wall_seconds: float):
+        out = {"wall_seconds": round(wall_seconds, 3), "endpoints": {}}
+        total = 0
+        all_ms = []
+        for label, ms in sorted(self.latencies.items()):
+            arr = np.asarray(ms)
+            total += len(arr)
+            all_ms.extend(ms)
+            hist = np.histogram(arr, bins=[0] + HIST_BUCKETS_MS + [np.inf])[0]
+            out["endpoints"][label] = {
+                "requests": int(len(arr)),
+                "throughput_rps": round(len(arr) / wall_seconds, 2) if wall_seconds else 0.0,
+                "error_rate": round(self.errors[label] / len(arr), 4),
+                "p50_ms": round(float(np.percentile(arr, 50)), 2),
+                "p95_ms": round(float(np.percentile(arr, 95)), 2),
+                "p99_ms": round(float(np.percentile(arr, 99)), 2),
+                "max_ms": round(float(arr.max()), 2),
+                "statuses": dict(self.statuses[label]),
+                "histogram_ms": {f"<={b}": int(c) for b, c in zip(HIST_BUCKETS_MS + ["inf"], hist)},
+            }
+        out["requests"] = total
+        out["throughput_rps"] = round(total / wall_seconds, 2) if wall_seconds else 0.0
+        out["error_rate"] = round(sum(self.errors.values()) / total, 4) if total else 0.0
+        if all_ms:
+            out["p50_ms"] = round(float(np.percentile(all_ms, 50)), 2)
+            out["p99_ms"] = round(float(np.percentile(all_ms, 99)), 2)
+        if self.lateness_ms:
+            out["replay_lateness_p99_ms"] = round(float(np.percentile(self.lateness_ms, 99)), 2)
+        return out
+
+
+# -------------------------------------------------------------------
+# Drivers
+# -------------------------------------------------------------------
+async def _send(client, stats, label, method, path, params=None):
+    t0 = time.perf_counter()
+    try:
+        resp = await client.request(method, path, params=params)
+        await resp.aread()
+        stats.record(label, (time.perf_counter() - t0) * 1000.0, status=resp.status_code)
+    except Exception as e:  # network errors count as failures, not crashes
+        stats.record(label, (time.perf_counter() - t0) * 1000.0, error=e)
+
+
+async def run_synthetic(client, stats, kinds, weights, concurrency, duration, total, seed):
+    deadline = time.perf_counter() + duration if duration else None
+    counter = {"left": total}
+
+    async def worker(wid):
+        rng = random.Random(seed + wid)
+        while True:
+            if deadline and time.perf_counter() >= deadline:
+                return
+            if total:
+                if counter["left"] <= 0:
+                    return
+                counter["left"] -= 1
+            label, method, path, params = make_request(rng.choices(kinds, weights)[0], rng)
+            await _send(client, stats, label, method, path, params)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+
+async def run_replay(client, stats, events, speed, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    tasks = []
+
+    async def fire(method, path):
+        async with sem:
+            await _send(client, stats, _label(method, path), method, path)
+
+    for offset, method, path in events:
+        due = start + offset / speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        stats.lateness_ms.append(max(0.0, (time.perf_counter() - due) * 1000.0))
+        tasks.append(asyncio.create_task(fire(method, path)))
+    await asyncio.gather(*tasks)
+
+
+def _client(url, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60.0, limits=limits)
+    from backend.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bookrs.local",
+                             timeout=60.0, limits=limits)
+
+
+async def main_async(args):
+    stats = Stats()
+    async with _client(args.url, args.concurrency) as client:
+        t0 = time.perf_counter()
+        if args.replay:
+            events = parse_replay(args.replay)
+            print(f"[INFO] Replaying {len(events):,} requests at {args.speed}x ...")
+            await run_replay(client, stats, events, args.speed, args.concurrency)
+        else:
+            kinds, weights = parse_mix(args.mix)
+            print(f"[INFO] Synthetic load: concurrency={args.concurrency} mix={args.mix} "
+                  f"{'duration=' + str(args.duration) + 's' if not args.requests else 'requests=' + str(args.requests)}")
+            await run_synthetic(client, stats, kinds, weights, args.concurrency,
+                                None if args.requests else args.duration, args.requests, args.seed)
+        wall = time.perf_counter() - t0
+    return stats.report(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BookRS API load generator / traffic replay")
+    parser.add_argument("--url", default=None, help="target server (default: in-process ASGI app)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds (synthetic mode)")
+    parser.add_argument("--requests", type=int, default=0, help="total requests instead of --duration")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--replay", default=None, help="access log to replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+
+    print(f"\n=== Load test: {report['requests']:,} requests in {report['wall_seconds']}s "
+          f"→ {report['throughput_rps']} req/s, error rate {report['error_rate']:.2%} ===")
+    for label, ep in report["endpoints"].items():
+        print(f"{label:<28} n={ep['requests']:>7,}  {ep['throughput_rps']:>8} rps  "
+              f"p50={ep['p50_ms']:>8}ms  p95={ep['p95_ms']:>8}ms  p99={ep['p99_ms']:>8}ms  "
+              f"err={ep['error_rate']:.2%}")
+        bars = "  ".join(f"{k}:{v}" for k, v in ep["histogram_ms"].items() if v)
+        print(f"{'':<28} hist {bars}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[OK] Saved report → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Memory Report for a BookRS Worker
+---------------------------------
+Loads the same models an API worker serves (hybrid, tfidf, similar,
+suggest, popularity, feeds) and prints what each component holds, the
+process RSS split into shared and private pages, and flags for oversized
+or unneeded data. With --host-mb it estimates how many workers fit on a
+host: shared pages are counted once, private pages once per worker.
+
+The same report is served live by GET /admin/memory.
+
+Run:
+  python -m backend.scripts.memory_report
+  python -m backend.scripts.memory_report --host-mb 16384 --json
+"""
+
+import json
+import argparse
+
+from backend.core.memory import memory_report, track
+from backend.ml.registry import MODELS, load_hybrid, load_tfidf, load_similar, load_suggest
+
+LOADERS = {"hybrid": load_hybrid, "tfidf": load_tfidf, "similar": load_similar, "suggest": load_suggest}
+
+
+def _mb(n):
+    return f"{n / 1e6:10,.1f}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-component memory accounting")
+    ap.add_argument("--models", default=",".join(LOADERS), help="Registry models to load (comma-separated)")
+    ap.add_argument("--no-extras", action="store_true", help="Skip the popularity / feed models")
+    ap.add_argument("--host-mb", type=float, default=None, help="Host memory for the worker-density estimate")
+    ap.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    args = ap.parse_args()
+
+    for name in filter(None, args.models.split(",")):
+        MODELS.register(name, LOADERS[name])
+    if not args.no_extras:
+        from backend.ml.recommender_popularity import PopularityRecommender
+        from backend.ml.recommender_feed import FeedRecommender
+        track("popularity", PopularityRecommender())
+        track("feed", FeedRecommender())
+
+    report = memory_report(host_mb=args.host_mb)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{'component':<44} {'type':<18} {'MB':>10} {'mapped MB':>10}")
+    for c in report["components"]:
+        print(f"{c['name']:<44} {c['type'][:18]:<18} {_mb(c['bytes'])} {_mb(c['mapped_bytes'])}")
+    proc = report["process"]
+    print(f"\n[INFO] Accounted {_mb(report['accounted_bytes']).strip()} MB | "
+          f"RSS {_mb(proc['rss']).strip()} MB ({proc['source']})")
+    if "private" in proc:
+        print(f"[INFO] Shared {_mb(proc['shared']).strip()} MB | Private {_mb(proc['private']).strip()} MB | "
+              f"PSS {_mb(proc['pss']).strip()} MB")
+    density = report.get("density", {})
+    if "max_workers" in density:
+        print(f"[INFO] ~{density['max_workers']} workers fit in {args.host_mb:,.0f} MB")
+    for flag in report["flags"]:
+        print(f"[WARN] {flag}")
+    print("[DONE] Memory report complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Publish / Inspect Artifact Versions
+-----------------------------------
+Snapshots the current contents of ART_DIR as a new version and moves the
+CURRENT pointer (running API / Gradio processes hot-swap it). train_cf and
+the embedding / index builders publish automatically; use this after
+copying artifacts in by hand, or to roll back.
+
+Usage:
+  python -m backend.scripts.publish_artifacts [--note "..."] [--force]
+  python -m backend.scripts.publish_artifacts --list
+  python -m backend.scripts.publish_artifacts --rollback <version>
+"""
+
+import argparse
+from backend.core import artifacts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Publish artifact versions for hot reload")
+    ap.add_argument("--note", default="manual", help="Free-text note stored in the manifest")
+    ap.add_argument("--force", action="store_true", help="Publish even if nothing changed")
+    ap.add_argument("--list", action="store_true", help="List published versions")
+    ap.add_argument("--rollback", metavar="VERSION", help="Point CURRENT at an existing version")
+    args = ap.parse_args()
+
+    if args.list:
+        current = artifacts.current_version()
+        for version in artifacts.list_versions():
+            m = artifacts.read_manifest(version)
+            mark = "*" if version == current else " "
+            print(f"{mark} {version}  changed={','.join(m['changed']) or '-'}  note={m['note']}")
+        return
+
+    if args.rollback:
+        artifacts.set_current(args.rollback)
+        print(f"[OK] CURRENT → {args.rollback}")
+        return
+
+    artifacts.publish(note=args.note, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
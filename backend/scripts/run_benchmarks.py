@@ -0,0 +1,216 @@
+"""
+Micro-benchmark Suite for BookRS
+--------------------------------
+Repeatable timings for every recommender hot path and the FastAPI routes:
+ - semantic.recommend         SemanticRecommender.recommend
+ - hybrid.recommend           HybridRecommender.recommend
+ - cf.score_for_user          CFModel.score_for_user
+ - tfidf.recommend            TFIDFRecommender.recommend
+ - popularity.build           PopularityRecommender() construction
+ - api.*                      routes through an in-process ASGI client
+
+Each case reports p50 / p95 / p99 / mean latency (ms) from timed runs and
+peak traced memory from one extra tracemalloc run (kept separate so the
+tracer does not distort the timings). Results are written as JSON and can
+be compared against a saved baseline; the process exits with status 1 when
+a case regresses beyond the tolerance.
+
+Run:
+  python -m backend.scripts.run_benchmarks
+  python -m backend.scripts.run_benchmarks --only semantic,api --repeats 50
+  python -m backend.scripts.run_benchmarks --save-baseline
+  python -m backend.scripts.run_benchmarks --baseline artifacts/bench/baseline.json
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import pickle
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+from datetime import datetime
+
+from backend.core.config import ART_DIR
+
+BENCH_DIR = os.path.join(ART_DIR, "bench")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# ---- Configurable parameters
+REPEATS = 30
+WARMUP = 3
+TOLERANCE = 0.20           # 20% slower than baseline p50/p95 counts as a regression
+QUERIES = [
+    "deep learning", "fantasy adventure with dragons", "leadership",
+    "harry potter", "murder mystery in victorian london", "stephen king",
+]
+
+
+def _percentiles(samples_ms):
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "mean_ms": round(float(arr.mean()), 3),
+        "runs": int(len(arr)),
+    }
+
+
+def run_case(name, fn, repeats=REPEATS, warmup=WARMUP):
+    """Time fn() `repeats` times after `warmup` calls; fn receives the run index."""
+    for i in range(warmup):
+        fn(i)
+
+    gc.collect()
+    gc.disable()
+    samples = []
+    try:
+        for i in range(repeats):
+            t0 = time.perf_counter()
+            fn(i)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    fn(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = _percentiles(samples)
+    result["peak_traced_mb"] = round(peak / 2**20, 3)
+    print(f"[BENCH] {name:<28} p50={result['p50_ms']:>9.3f}ms  p95={result['p95_ms']:>9.3f}ms  "
+          f"p99={result['p99_ms']:>9.3f}ms  peak={result['peak_traced_mb']:.2f}MB")
+    return result
+
+
+def _load_maps():
+    with open(os.path.join(ART_DIR, "als_uid_map.pkl"), "rb") as f:
+        uid_map = pickle.load(f)
+    with open(os.path.join(ART_DIR, "als_iid_map.pkl"), "rb") as f:
+        iid_map = pickle.load(f)
+    return uid_map, iid_map
+
+
+def build_cases(selected, repeats):
+    """Yield (name, fn, repeats) lazily so unselected models are never loaded."""
+    def wanted(group):
+        return not selected or group in selected
+
+    uid_map, iid_map = _load_maps()
+    users = sorted(uid_map.keys())[:64]
+
+    def q(i):
+        return QUERIES[i % len(QUERIES)]
+
+    def u(i):
+        return int(users[i % len(users)])
+
+    hybrid = None
+    if wanted("semantic") or wanted("hybrid"):
+        from backend.ml.recommender_hybrid import HybridRecommender
+        hybrid = HybridRecommender()
+    if wanted("semantic"):
+        yield "semantic.recommend", lambda i: hybrid.semantic.recommend(q(i), top_k=10), repeats
+    if wanted("hybrid"):
+        yield "hybrid.recommend", lambda i: hybrid.recommend(q(i), user_id=u(i), top_k=10), repeats
+
+    if wanted("cf"):
+        from backend.ml.recommender_cf import CFModel
+        cf = CFModel(user_id_to_row=uid_map, book_id_to_row=iid_map)
+        yield "cf.score_for_user", lambda i: cf.score_for_user(u(i)), repeats
+
+    if wanted("tfidf"):
+        from backend.ml.recommender_tfidf import TFIDFRecommender
+        tfidf = TFIDFRecommender()
+        yield "tfidf.recommend", lambda i: tfidf.recommend(q(i), top_k=10), repeats
+
+    if wanted("popularity"):
+        from backend.ml.recommender_popularity import PopularityRecommender
+        # Construction reads the whole ratings table; a few runs are enough
+        yield "popularity.build", lambda i: PopularityRecommender(), max(3, repeats // 10)
+
+    if wanted("api"):
+        from fastapi.testclient import TestClient
+        from backend.main import app
+        client = TestClient(app)
+
+        def get(path, params=None):
+            r = client.get(path, params=params)
+            r.raise_for_status()
+
+        yield "api.root", lambda i: get("/"), repeats
+        yield "api.books.list", lambda i: get("/books/", {"limit": 20}), repeats
+        yield "api.books.search", lambda i: get("/books/search", {"q": q(i)[:6]}), repeats
+        yield "api.recommend.hybrid", lambda i: get(
+            "/recommend/hybrid", {"query": q(i), "user_id": u(i), "top_k": 10}), repeats
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return a list of human-readable regressions vs. the baseline cases."""
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if base[metric] > 0 and cur[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {cur[metric]:.3f}ms vs baseline {base[metric]:.3f}ms "
+                    f"(+{(cur[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BookRS micro-benchmarks")
+    parser.add_argument("--only", default="", help="comma-separated groups: semantic,hybrid,cf,tfidf,popularity,api")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--out", default=None, help="result JSON path (default: artifacts/bench/bench_<ts>.json)")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="also write results as the new baseline")
+    args = parser.parse_args()
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    selected = {s.strip() for s in args.only.split(",") if s.strip()}
+
+    results = {}
+    for name, fn, repeats in build_cases(selected, args.repeats):
+        results[name] = run_case(name, fn, repeats=repeats)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "cases": results,
+    }
+    out = args.out or os.path.join(BENCH_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[OK] Saved results → {out}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[OK] Saved baseline → {BASELINE_PATH}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\n[FAIL] Regressions vs. baseline:")
+            for r in regressions:
+                print("  -", r)
+            sys.exit(1)
+        print("[OK] No regressions vs. baseline.")
+
+
+if __name__ == "__main__":
+    main()
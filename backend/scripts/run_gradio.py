@@ -3,11 +3,12 @@ import gradio as gr
 import pandas as pd
 
 # === BookRS imports (DB-backed models and utilities) ===
-from backend.ml.recommender_semantic import SemanticRecommender
-from backend.ml.recommender_hybrid import HybridRecommender
+from backend.ml.registry import MODELS, load_hybrid
+from backend.ml.recommender_feed import FeedRecommender
 from backend.ml.recommender_popularity import PopularityRecommender
 from backend.core.db_utils import load_books, count_records
-from backend.core.config import EMB_PATH, EMB_META, ALS_USER_FACTORS, ALS_ITEM_FACTORS, POPULARITY_PATH
+from backend.core.memory import track
+from backend.core.config import EMB_PATH, EMB_META, EMB_STORE_DIR, ALS_USER_FACTORS, ALS_ITEM_FACTORS, POPULARITY_PATH
 CUSTOM_CSS = """
 <style>
 :root { --radius: 10px; }
@@ -37,9 +38,10 @@ textarea {
 # One-time model loads
 # -------------------------------------------------------------------
 print("[INFO] Loading Semantic / Hybrid / Popularity models ...")
-semantic_model = SemanticRecommender()
-hybrid_model   = HybridRecommender()
+MODELS.register("hybrid", load_hybrid)   # semantic model = hybrid's semantic component
 pop_model      = PopularityRecommender()
+feed_model     = FeedRecommender()            # materialized feeds (build_user_feeds)
+MODELS.start_watcher()                    # hot-swap newly published artifact versions
 print("[OK] All models ready.")
 
 # Cover image map (optional)
@@ -50,6 +52,11 @@ except Exception as e:
     print("[WARN] Could not load image URLs:", e)
     cover_map = pd.DataFrame(columns=["book_id", "image_url"])
 
+# Non-registry state, reported by backend.core.memory
+track("popularity", pop_model)
+track("feed", feed_model)
+track("cover_map", cover_map)
+
 # -------------------------------------------------------------------
 # Helpers
 # -------------------------------------------------------------------
@@ -72,7 +79,7 @@ def _cards_html(df: pd.DataFrame, score_label: str = "Score") -> str:
         img = r.get("image_url", PLACEHOLDER)
         title = str(r.get("title", "")).strip()
         authors = str(r.get("authors", "")).strip()
-        score = r.get("semantic_score", r.get("hybrid_score", r.get("tfidf_score", r.get("popularity_score", ""))))
+        score = r.get("semantic_score", r.get("hybrid_score", r.get("feed_score", r.get("tfidf_score", r.get("popularity_score", "")))))
         score_str = f"{score_label}: {round(float(score), 4)}" if score != "" and pd.notna(score) else ""
         row = f"""
         <div style="display:flex;gap:14px;align-items:center;padding:10px 12px;border-bottom:1px solid #eee;">
@@ -96,11 +103,11 @@ def search_handler(query: str, mode: str, user_id: int, k: int):
     if not query or not str(query).strip():
         return "<div style='color:#666;padding:8px;'>Please enter a query.</div>"
     if mode == "Relevant (Semantic)":
-        df = semantic_model.recommend(query, top_k=k)
+        df = MODELS.get("hybrid").semantic.recommend(query, top_k=k)
         df = _attach_covers(df)
         return _cards_html(df, score_label="Semantic")
     # For You (Hybrid)
-    df = hybrid_model.recommend(query, user_id=int(user_id or 0), top_k=k)
+    df = MODELS.get("hybrid").recommend(query, user_id=int(user_id or 0), top_k=k)
     df = _attach_covers(df)
     return _cards_html(df, score_label="Hybrid")
 
@@ -110,9 +117,13 @@ def home_feed_handler(user_id: int, k: int):
         df = pop_model.recommend(top_k=k)
         df = _attach_covers(df)
         return "Guest (Popular Now)", _cards_html(df, score_label="Popularity")
-    # Personalized: call hybrid with a neutral query.
-    # (In a v2, you can re-rank popular candidates purely by CF.)
-    df = hybrid_model.recommend(query="recommended", user_id=uid, top_k=k)
+    # Personalized: precomputed feed (one indexed lookup)
+    df = feed_model.recommend(uid, top_k=k)
+    if len(df):
+        df = _attach_covers(df)
+        return f"User {uid} (Personalized)", _cards_html(df, score_label="Feed")
+    # No materialized feed yet: call hybrid with a neutral query.
+    df = MODELS.get("hybrid").recommend(query="recommended", user_id=uid, top_k=k)
     df = _attach_covers(df)
     return f"User {uid} (Personalized)", _cards_html(df, score_label="Hybrid")
 
@@ -125,6 +136,7 @@ def model_info_handler():
     counts = count_records()
     # Artifacts present?
     art = {
+        "Embedding store (shards)": os.path.exists(os.path.join(EMB_STORE_DIR, "manifest.json")),
         "Embeddings (pt)": os.path.exists(EMB_PATH),
         "Embeddings meta (parquet)": os.path.exists(EMB_META),
         "ALS user factors (npz)": os.path.exists(ALS_USER_FACTORS),
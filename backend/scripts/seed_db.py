@@ -13,7 +13,7 @@ Usage:
 
 import pandas as pd
 from tqdm import tqdm
-from sqlalchemy import text
+from sqlalchemy import text, insert
 from sqlalchemy.orm import Session
 from backend.core.database import SessionLocal
 from backend.models.book_model import Book
@@ -37,21 +37,51 @@ def clear_existing_data(session: Session):
 
 
 
+def insert_books(session: Session, df: pd.DataFrame):
+    """Bulk-insert (or replace) a books DataFrame in one transaction."""
+    df = df.fillna("")
+    has_rating = "average_rating" in df.columns
+    records = [
+        {
+            "book_id": int(r["book_id"]),
+            "title": str(r["title"])[:255],
+            "authors": str(r["authors"])[:255],
+            "description": str(r.get("description", ""))[:2000],
+            "avg_rating": float(r["average_rating"] or 0) if has_rating else None,
+            "image_url": str(r.get("image_url", ""))[:500],
+        }
+        for r in df.to_dict(orient="records")
+    ]
+    for i in range(0, len(records), BATCH_SIZE):
+        session.execute(insert(Book).prefix_with("OR REPLACE"), records[i:i + BATCH_SIZE])
+    session.commit()
+
+
+def insert_users(session: Session, user_ids):
+    """Bulk-insert placeholder users (User-<id>) for the given ids."""
+    records = [{"id": int(u), "name": f"User-{u}"} for u in user_ids]
+    for i in range(0, len(records), BATCH_SIZE):
+        session.execute(insert(User), records[i:i + BATCH_SIZE])
+    session.commit()
+
+
+def insert_ratings(session: Session, df: pd.DataFrame):
+    """Bulk-insert a ratings DataFrame (user_id, book_id, rating) in batches."""
+    cols = df[["user_id", "book_id", "rating"]]
+    for i in range(0, len(cols), BATCH_SIZE):
+        chunk = cols.iloc[i:i + BATCH_SIZE]
+        records = [
+            {"user_id": int(u), "book_id": int(b), "rating": float(r)}
+            for u, b, r in zip(chunk["user_id"], chunk["book_id"], chunk["rating"])
+        ]
+        session.execute(insert(Rating), records)
+        session.commit()
+
+
 def seed_books(session: Session):
     print("[INFO] Loading books.csv ...")
     df = pd.read_csv(BOOKS_PATH)
-    df = df.fillna("")
-    for _, row in tqdm(df.iterrows(), total=len(df), desc="Seeding books"):
-        book = Book(
-            book_id=int(row["book_id"]),
-            title=str(row["title"])[:255],
-            authors=str(row["authors"])[:255],
-            description=str(row.get("description", ""))[:2000],
-            avg_rating=float(row.get("average_rating", 0)) if "average_rating" in df.columns else None,
-            image_url=str(row.get("image_url", ""))[:500],
-        )
-        session.merge(book)
-    session.commit()
+    insert_books(session, df)
     print(f"[OK] {len(df):,} books inserted.")
 
 
@@ -62,26 +92,12 @@ def seed_users_and_ratings(session: Session):
 
     # Create unique users
     user_ids = df["user_id"].unique()
-    users = [User(id=int(u), name=f"User-{u}") for u in user_ids]
-    session.bulk_save_objects(users)
-    session.commit()
+    insert_users(session, user_ids)
     print(f"[OK] {len(user_ids):,} users inserted.")
 
     # Insert ratings in batches
-    batch = []
-    for _, row in tqdm(df.iterrows(), total=len(df), desc="Seeding ratings"):
-        batch.append(Rating(
-            user_id=int(row["user_id"]),
-            book_id=int(row["book_id"]),
-            rating=float(row["rating"])
-        ))
-        if len(batch) >= BATCH_SIZE:
-            session.bulk_save_objects(batch)
-            session.commit()
-            batch.clear()
-    if batch:
-        session.bulk_save_objects(batch)
-        session.commit()
+    for i in tqdm(range(0, len(df), BATCH_SIZE * 100), desc="Seeding ratings"):
+        insert_ratings(session, df.iloc[i:i + BATCH_SIZE * 100])
 
     print(f"[OK] {len(df):,} ratings inserted.")
 
@@ -0,0 +1,36 @@
+"""
+Ratings Snapshot (Parquet)
+--------------------------
+Exports the ratings table to artifacts/ratings_snapshot/ and keeps it in
+sync: the first run copies everything, later runs append only rows past
+the id watermark plus rows updated since the timestamp watermark.
+train_cf, build_user_feeds, the evaluators and the popularity model sync
+and read it automatically; run this to refresh ahead of time.
+
+Run:
+  python -m backend.scripts.snapshot_ratings
+  python -m backend.scripts.snapshot_ratings --full      # rebuild from scratch
+  python -m backend.scripts.snapshot_ratings --compact   # merge delta parts
+"""
+
+import time
+import argparse
+from backend.core import ratings_snapshot
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sync the columnar ratings snapshot")
+    ap.add_argument("--full", action="store_true", help="Rebuild the snapshot from scratch")
+    ap.add_argument("--compact", action="store_true", help="Merge all parts after syncing")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    manifest = ratings_snapshot.sync(full=args.full)
+    if args.compact and len(manifest["parts"]) > 1:
+        ratings_snapshot.compact()
+    print(f"[DONE] Snapshot at id {manifest['max_id']:,} / {manifest['max_ts']} "
+          f"in {time.perf_counter() - t0:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -85,19 +85,19 @@ Trains ALS collaborative filtering (implicit feedback) and saves:
 
 import os
 import numpy as np
-import pandas as pd
 import pickle
 from scipy.sparse import coo_matrix
 from implicit.als import AlternatingLeastSquares
 from backend.core.config import ART_DIR, ALS_USER_FACTORS, ALS_ITEM_FACTORS, POPULARITY_PATH
-from backend.core.db_utils import ENGINE  # use SQLite DB connection
+from backend.core.ratings_snapshot import read_ratings
+from backend.core.artifacts import atomic_output, publish
 
 def main():
     os.makedirs(ART_DIR, exist_ok=True)
 
-    print("[INFO] Loading ratings data from database ...")
-    ratings = pd.read_sql("SELECT user_id, book_id, rating FROM ratings", ENGINE)
-    print(f"[OK] Loaded {len(ratings):,} ratings from DB.")
+    print("[INFO] Loading ratings (snapshot, synced with the DB) ...")
+    ratings = read_ratings(["user_id", "book_id", "rating"])
+    print(f"[OK] Loaded {len(ratings):,} ratings.")
 
     # Implicit feedback confidence: 1 + rating
     ratings["confidence"] = 1.0 + ratings["rating"].clip(lower=0)
@@ -133,15 +133,17 @@ def main():
     )
     model.fit(mat.T)
 
-    # Save ALS factors
-    np.savez_compressed(ALS_ITEM_FACTORS, data=model.item_factors)
-    np.savez_compressed(ALS_USER_FACTORS, data=model.user_factors)
+    # Save ALS factors (replace, never rewrite: files may be linked into published versions)
+    with atomic_output(ALS_ITEM_FACTORS) as tmp:
+        np.savez_compressed(tmp, data=model.item_factors)
+    with atomic_output(ALS_USER_FACTORS) as tmp:
+        np.savez_compressed(tmp, data=model.user_factors)
     print("[OK] Saved ALS latent factors.")
 
     # Save ID mappings for later lookup in HybridRecommender
-    with open(os.path.join(ART_DIR, "als_uid_map.pkl"), "wb") as f:
+    with atomic_output(os.path.join(ART_DIR, "als_uid_map.pkl")) as tmp, open(tmp, "wb") as f:
         pickle.dump(uid_map, f)
-    with open(os.path.join(ART_DIR, "als_iid_map.pkl"), "wb") as f:
+    with atomic_output(os.path.join(ART_DIR, "als_iid_map.pkl")) as tmp, open(tmp, "wb") as f:
         pickle.dump(iid_map, f)
     print("[OK] Saved ALS ID mapping dictionaries.")
 
@@ -150,9 +152,13 @@ def main():
     pop["pop_score"] = (pop["count"] - pop["count"].min()) / (
         pop["count"].max() - pop["count"].min() + 1e-9
     )
-    pop.to_parquet(POPULARITY_PATH, index=False)
+    with atomic_output(POPULARITY_PATH) as tmp:
+        pop.to_parquet(tmp, index=False)
     print("[OK] Popularity data saved.")
 
+    # New artifact version; running servers hot-swap it
+    publish(note="train_cf")
+
     print(
         f"[DONE] ALS model trained successfully.\n"
         f" Users: {len(uid_map):,} | Items: {len(iid_map):,}\n"
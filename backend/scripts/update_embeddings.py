@@ -1,77 +1,114 @@
 """
 Incremental Semantic Embedding Builder for BookRS
 -------------------------------------------------
-Updates existing book embeddings only for new books found in the database.
+Keeps the sharded embedding store (artifacts/emb_store) in sync with the
+books table while touching only what changed:
+
+ - every book's combined text is hashed; only new books and books whose
+   title / authors / description changed are re-encoded
+ - re-encoded vectors go into one new append-only shard; the rows they
+   replace, and rows of books deleted from the DB, are tombstoned
+ - the store is compacted once tombstones or shard count pass a threshold
+
+On first run an existing book_embeddings.pt + emb_meta.parquet pair is
+imported into the store, so nothing is re-encoded just for the migration.
+
+Usage:
+  python -m backend.scripts.update_embeddings [--compact] [--dry-run]
 """
 
 import os
-import torch
-import pandas as pd
-from sentence_transformers import SentenceTransformer
+import argparse
+import numpy as np
 from backend.core.db_utils import load_books
-from backend.core.config import ART_DIR, EMB_PATH, EMB_META
+from backend.core.config import ART_DIR, EMB_PATH, EMB_META, EMB_STORE_DIR
+from backend.core.artifacts import publish
+from backend.ml.embedding_store import EmbeddingStore, combined_text, text_hash, read_legacy_meta
 
+MODEL_NAME = "all-MiniLM-L6-v2"
 
-def main():
-    os.makedirs(ART_DIR, exist_ok=True)
 
-    print("[INFO] Checking existing embeddings...")
-    existing_emb, existing_meta = None, None
+def open_store(dim_hint=None):
+    if EmbeddingStore.exists(EMB_STORE_DIR):
+        return EmbeddingStore(EMB_STORE_DIR)
     if os.path.exists(EMB_PATH) and os.path.exists(EMB_META):
-        existing_emb = torch.load(EMB_PATH)
-        existing_meta = pd.read_parquet(EMB_META)
-        print(f"[OK] Found {len(existing_meta):,} existing embeddings.")
-    else:
-        print("[WARN] No existing embeddings found. Full build will run.")
+        print("[INFO] Migrating legacy embeddings into the sharded store ...")
+        return EmbeddingStore.import_legacy(EMB_STORE_DIR)
+    if dim_hint is None:
+        return None
+    print("[WARN] No existing embeddings found. Full build will run.")
+    return EmbeddingStore.create(dim_hint, EMB_STORE_DIR)
+
+
+def dry_run_live(db_books):
+    """Live rows without writing anything (the legacy pair is read, not migrated)."""
+    if EmbeddingStore.exists(EMB_STORE_DIR):
+        return EmbeddingStore(EMB_STORE_DIR).live_meta()
+    if os.path.exists(EMB_PATH) and os.path.exists(EMB_META):
+        return read_legacy_meta(EMB_META)
+    return db_books.iloc[:0]
 
-    # Load current books from DB
+
+def diff_books(db_books, live):
+    """Split DB books into (to_encode, deleted_ids) against the store's live rows."""
+    known = dict(zip(live["book_id"].astype(int), live["text_hash"]))
+    is_new = ~db_books["book_id"].isin(known.keys())
+    changed = db_books["book_id"].map(known).ne(db_books["text_hash"]) & ~is_new
+    deleted = sorted(set(known) - set(db_books["book_id"]))
+    return db_books[is_new | changed], int(is_new.sum()), int(changed.sum()), deleted
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-embed new / changed books into the embedding store")
+    ap.add_argument("--compact", action="store_true", help="Force compaction after the update")
+    ap.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = ap.parse_args()
+
+    # Load current books from DB and hash their encoder input
     db_books = load_books(columns=["book_id", "title", "authors", "description"])
     db_books["book_id"] = db_books["book_id"].astype(int)
+    db_books["combined_text"] = combined_text(db_books)
+    db_books["text_hash"] = text_hash(db_books["combined_text"])
 
-    # Identify new books
-    if existing_meta is not None:
-        existing_ids = set(existing_meta["book_id"].astype(int))
-        new_books = db_books[~db_books["book_id"].isin(existing_ids)]
+    print("[INFO] Checking existing embeddings...")
+    if args.dry_run:
+        store = None
+        live = dry_run_live(db_books)
     else:
-        new_books = db_books
+        store = open_store()
+        live = store.live_meta() if store is not None else db_books.iloc[:0]
+    print(f"[OK] Found {len(live):,} existing embeddings.")
 
-    if new_books.empty:
-        print("[INFO] No new books found. Embeddings are up to date.")
+    todo, n_new, n_changed, deleted = diff_books(db_books, live)
+    print(f"[INFO] New: {n_new:,}  Changed: {n_changed:,}  Deleted: {len(deleted):,}")
+    if args.dry_run:
         return
 
-    print(f"[INFO] Found {len(new_books):,} new books. Generating embeddings...")
-
-    # Combine text fields for semantic encoding
-    new_books["combined_text"] = (
-        new_books["title"].fillna("") + " " +
-        new_books["title"].fillna("") + " " +  # weighted title
-        new_books["authors"].fillna("") + " " +
-        new_books["description"].fillna("")
-    )
-
-    # Load Sentence Transformer
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    new_emb = model.encode(
-        new_books["combined_text"].tolist(),
-        convert_to_tensor=True,
-        show_progress_bar=True
-    )
-
-    # Append to existing embeddings
-    if existing_emb is not None:
-        updated_emb = torch.cat([existing_emb, new_emb], dim=0)
-        updated_meta = pd.concat([existing_meta, new_books], ignore_index=True)
-    else:
-        updated_emb = new_emb
-        updated_meta = new_books
+    os.makedirs(ART_DIR, exist_ok=True)
+    if not todo.empty:
+        from sentence_transformers import SentenceTransformer
+        print(f"[INFO] Encoding {len(todo):,} books with {MODEL_NAME} ...")
+        model = SentenceTransformer(MODEL_NAME)
+        vectors = model.encode(todo["combined_text"].tolist(), convert_to_numpy=True, show_progress_bar=True)
+        if store is None:
+            store = open_store(dim_hint=vectors.shape[1])
+        store.append(np.asarray(vectors, dtype=np.float32), todo)
+        print(f"[OK] Appended shard of {len(todo):,} vectors → {EMB_STORE_DIR}")
+
+    if deleted and store is not None:
+        store.delete(deleted)
+        print(f"[OK] Tombstoned {len(deleted):,} deleted books.")
+
+    if todo.empty and not deleted:
+        print("[INFO] No new or changed books. Embeddings are up to date.")
 
-    # Save updated files
-    torch.save(updated_emb, EMB_PATH)
-    updated_meta[["book_id", "title", "authors", "combined_text"]].to_parquet(EMB_META, index=False)
+    if store is not None and (args.compact or store.needs_compaction()):
+        store.compact()
 
-    print(f"[OK] Updated embeddings saved → {EMB_PATH}")
-    print(f"[OK] Updated metadata saved → {EMB_META}")
-    print(f"[DONE] Total books embedded: {len(updated_meta):,}")
+    if store is not None:
+        publish(note="update_embeddings")
+        print(f"[DONE] Live books embedded: {len(store.live_meta()):,} "
+              f"({len(store.manifest['shards'])} shards)")
 
 
 if __name__ == "__main__":
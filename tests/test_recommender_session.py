@@ -0,0 +1,22 @@
+import numpy as np
+
+from backend.ml.recommender_session import SessionRecommender
+
+
+def _graph():
+    # books 10, 20, 30, 40; 10 <-> 20 co-occur, 30 and 40 have no neighbours
+    book_ids = np.array([10, 20, 30, 40], dtype=np.int32)
+    indptr = np.array([0, 1, 2, 2, 2], dtype=np.int64)
+    indices = np.array([1, 0], dtype=np.int32)
+    data = np.array([0.5, 0.5], dtype=np.float32)
+    return SessionRecommender(book_ids, indptr, indices, data, {"top_m": 50}, engine=None)
+
+
+def test_session_of_neighbourless_books_is_empty():
+    ids, scores = _graph().score([30, 40])
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_session_scores_neighbours_and_excludes_viewed():
+    ids, _ = _graph().score([10, 30])
+    assert ids.tolist() == [20]